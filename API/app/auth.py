@@ -0,0 +1,86 @@
+"""
+Authentication of requests by signed access tokens.
+
+Most endpoints need only the user id and depend on ``get_principal``,
+which checks the token signature and the in-process revocation list
+without a database round trip. ``get_current_user`` also returns the
+``User`` row, read through the repository's TTL-bounded entity cache.
+Tokens are issued by ``python -m API.app.jobs.issue_token`` until sign-in
+is in place.
+"""
+
+from typing import Optional
+
+from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.users import User
+from API.app.repositories.users import revoked_token_repository
+from API.app.repositories.users import user_repository
+from API.core.auth.tokens import Principal
+from API.core.auth.tokens import Revocation
+from API.core.auth.tokens import RevocationList
+from API.core.auth.tokens import TokenSigner
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import get_session
+from API.core.exceptions.base import InvalidTokenException
+
+token_signer = TokenSigner(config.backend.secret_key, ttl=config.auth.token_ttl)
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def _load_revocations(last_id: int) -> list[Revocation]:
+    """Returns revocations stored after id"""
+    async with Session() as session:
+        return await revoked_token_repository.since(session, last_id)
+
+
+revocations = RevocationList(
+    _load_revocations, refresh_interval=config.auth.revocation_refresh
+)
+
+
+async def get_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Principal:
+    """
+    Returns principal of bearer token of request
+
+    :raises InvalidTokenException: Token is missing, invalid, expired or revoked.
+    """
+    if credentials is None:
+        raise InvalidTokenException("Missing access token")
+    principal = token_signer.verify(credentials.credentials)
+    if revocations.revoked(principal):
+        raise InvalidTokenException("Token revoked")
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+) -> User:
+    """Returns user of bearer token of request"""
+    user = await user_repository.get_by(session, "id", principal.user_id, unique=True)
+    if user is None:
+        raise InvalidTokenException("User not found")
+    return user
+
+
+async def revoke_token(session: AsyncSession, principal: Principal) -> None:
+    """Revokes token of principal"""
+    revocation = await revoked_token_repository.revoke_token(session, principal)
+    await session.commit()
+    revocations.add(revocation)
+
+
+async def revoke_user_tokens(session: AsyncSession, user_id: int) -> None:
+    """Revokes all tokens of user issued until now"""
+    revocation = await revoked_token_repository.revoke_user(
+        session, user_id, token_signer.ttl
+    )
+    await session.commit()
+    revocations.add(revocation)
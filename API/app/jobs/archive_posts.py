@@ -0,0 +1,120 @@
+"""
+Archiving of sold posts.
+
+Moves sold posts not updated for ``ARCHIVE_AFTER_DAYS`` days, with their
+reviews and favorites, to archive tables (see ``API.app.models.archive``)
+in batches of ``ARCHIVE_BATCH_SIZE`` posts. Every batch is moved and
+committed separately, so row locks are short, and locked posts are left
+for the next run.
+
+Run from the repository root: python -m API.app.jobs.archive_posts [--dry-run]
+"""
+
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from sqlalchemy import Table
+from sqlalchemy import bindparam
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import literal_column
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.archive import FavoriteArchive
+from API.app.models.archive import PostArchive
+from API.app.models.archive import ReviewArchive
+from API.app.models.posts import Post
+from API.app.models.posts import Review
+from API.app.models.users import Favorite
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import engine
+
+# Matches the partial index ix_posts_sold_updated_at
+SOLD = (Post.status == literal_column("'SOLD'"), Post.updated_at < bindparam("sold_before"))
+SELECT_BATCH = (
+    select(Post.id)
+    .where(*SOLD)
+    .limit(bindparam("batch_size"))
+    .with_for_update(skip_locked=True)
+)
+COUNT_SOLD = select(func.count()).select_from(Post).where(*SOLD)
+
+
+def _move(source: Table, archive: Table, post_id_column: str):
+    """Returns statement moving rows of posts ``post_ids`` from source to archive"""
+    names = [column.name for column in archive.columns]
+    moved = (
+        delete(source)
+        .where(source.c[post_id_column].in_(bindparam("post_ids", expanding=True)))
+        .returning(*(source.c[name] for name in names))
+        .cte("moved")
+    )
+    return insert(archive).from_select(names, select(moved))
+
+
+# Posts are copied before their reviews and favorites are moved, as aggregate
+# triggers of those update the posts, and deleted after them
+_ARCHIVED_COLUMNS = [column.name for column in PostArchive.__table__.columns]
+COPY_POSTS = insert(PostArchive.__table__).from_select(
+    _ARCHIVED_COLUMNS,
+    select(*(Post.__table__.c[name] for name in _ARCHIVED_COLUMNS)).where(
+        Post.id.in_(bindparam("post_ids", expanding=True))
+    ),
+)
+MOVE_REVIEWS = _move(Review.__table__, ReviewArchive.__table__, "post_id")
+MOVE_FAVORITES = _move(Favorite.__table__, FavoriteArchive.__table__, "post_id")
+DELETE_POSTS = delete(Post).where(Post.id.in_(bindparam("post_ids", expanding=True)))
+
+
+async def archive_sold_posts(
+    session: AsyncSession, sold_days: int = 30, batch_size: int = 1000, move: bool = True
+) -> int:
+    """
+    Moves posts sold and not updated for sold_days to the archive in batches
+
+    :param move: Only count posts to archive when False.
+    :return: Number of archived posts.
+    """
+    sold_before = datetime.now(timezone.utc) - timedelta(days=sold_days)
+    if not move:
+        return await session.scalar(COUNT_SOLD, {"sold_before": sold_before})
+    archived = 0
+    while True:
+        post_ids = list(
+            await session.scalars(
+                SELECT_BATCH, {"sold_before": sold_before, "batch_size": batch_size}
+            )
+        )
+        if not post_ids:
+            return archived
+        params = {"post_ids": post_ids}
+        for statement in (COPY_POSTS, MOVE_REVIEWS, MOVE_FAVORITES, DELETE_POSTS):
+            await session.execute(statement, params)
+        await session.commit()
+        archived += len(post_ids)
+        logging.info("Archived %s sold posts", archived)
+
+
+async def main(move: bool) -> None:
+    """Runs archiving"""
+    async with Session() as session:
+        archived = await archive_sold_posts(
+            session,
+            sold_days=config.archive.sold_days,
+            batch_size=config.archive.batch_size,
+            move=move,
+        )
+    logging.info("%s sold posts %s", archived, "archived" if move else "to archive")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(main(move="--dry-run" not in sys.argv))
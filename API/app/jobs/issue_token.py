@@ -0,0 +1,44 @@
+"""
+Issuing of access tokens.
+
+Until sign-in is in place, tokens for existing users are issued by this job
+and printed to stdout, e.g. for testing endpoints which need a bearer token.
+Tokens are valid for ``AUTH_TOKEN_TTL`` seconds, or less with ``--ttl``, and
+are revoked like any other token.
+
+Run from the repository root: python -m API.app.jobs.issue_token <user_id> [--ttl SECONDS]
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from typing import Optional
+
+from API.app.auth import token_signer
+from API.app.repositories.users import user_repository
+from API.core.database.session import Session
+from API.core.database.session import engine
+
+
+async def main(user_id: int, ttl: Optional[int]) -> int:
+    """Prints token of user and returns exit code"""
+    try:
+        async with Session() as session:
+            user = await user_repository.get_by(session, "id", user_id, unique=True)
+    finally:
+        await engine.dispose()
+    if user is None:
+        logging.error("User %s not found", user_id)
+        return 1
+    print(token_signer.issue(user_id, ttl=ttl))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Prints access token of user")
+    parser.add_argument("user_id", type=int)
+    parser.add_argument("--ttl", type=int, default=None, help="seconds, up to AUTH_TOKEN_TTL")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.user_id, args.ttl)))
@@ -0,0 +1,44 @@
+"""
+Database schema migrations.
+
+Applies pending migrations from ``API.app.migrations``. Run it before
+starting servers with STARTUP_MODE=production, which only check the version.
+
+Run from the repository root: python -m API.app.jobs.migrate [--check]
+"""
+
+import asyncio
+import logging
+import sys
+
+from API.core.database.migrations import SchemaOutdated
+from API.core.database.migrations import check_version
+from API.core.database.migrations import current_version
+from API.core.database.migrations import load_migrations
+from API.core.database.migrations import migrate
+from API.core.database.session import engine
+
+MIGRATIONS_PACKAGE = "API.app.migrations"
+
+
+async def main(check: bool) -> int:
+    """Applies or checks migrations and returns exit code"""
+    migrations = load_migrations(MIGRATIONS_PACKAGE)
+    try:
+        if check:
+            await check_version(engine, migrations)
+        else:
+            applied = await migrate(engine, migrations)
+            logging.info("Applied %s migrations", len(applied))
+        logging.info("Database schema version %s", await current_version(engine))
+    except SchemaOutdated as exc:
+        logging.error("%s", exc)
+        return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    sys.exit(asyncio.run(main(check="--check" in sys.argv)))
@@ -0,0 +1,120 @@
+"""
+Reconciliation of Post rating and popularity aggregates.
+
+Recomputes aggregates from ``reviews`` and ``favorites`` in id ranges,
+reports every post whose stored values drifted and rewrites them.
+
+Run from the repository root: python -m API.app.jobs.post_stats [--dry-run]
+"""
+
+import asyncio
+import logging
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.core.database.session import Session
+from API.core.database.session import engine
+
+ACTUAL_STATS = """
+    WITH actual AS (
+        SELECT
+            p.id,
+            COALESCE(r.review_count, 0) AS review_count,
+            COALESCE(r.rating_sum, 0) AS rating_sum,
+            COALESCE(r.rating_sum::float / NULLIF(r.review_count, 0), 0) AS rating_avg,
+            COALESCE(f.favorite_count, 0) AS favorite_count
+        FROM posts AS p
+        LEFT JOIN (
+            SELECT post_id, count(*) AS review_count, sum(rating) AS rating_sum
+            FROM reviews
+            WHERE post_id BETWEEN :first_id AND :last_id
+            GROUP BY post_id
+        ) AS r ON r.post_id = p.id
+        LEFT JOIN (
+            SELECT post_id, count(*) AS favorite_count
+            FROM favorites
+            WHERE post_id BETWEEN :first_id AND :last_id
+            GROUP BY post_id
+        ) AS f ON f.post_id = p.id
+        WHERE p.id BETWEEN :first_id AND :last_id
+    ),
+    drift AS (
+        SELECT
+            a.*,
+            p.review_count AS stored_review_count,
+            p.rating_sum AS stored_rating_sum,
+            p.favorite_count AS stored_favorite_count
+        FROM actual AS a
+        JOIN posts AS p ON p.id = a.id
+        WHERE (p.review_count, p.rating_sum, p.favorite_count)
+            IS DISTINCT FROM (a.review_count, a.rating_sum, a.favorite_count)
+            OR abs(p.rating_avg - a.rating_avg) > 1e-9
+    )
+"""
+
+SELECT_DRIFT = ACTUAL_STATS + "SELECT * FROM drift ORDER BY id"
+
+FIX_DRIFT = (
+    ACTUAL_STATS
+    + """
+    UPDATE posts AS p
+    SET review_count = d.review_count,
+        rating_sum = d.rating_sum,
+        rating_avg = d.rating_avg,
+        favorite_count = d.favorite_count
+    FROM drift AS d
+    WHERE p.id = d.id
+    RETURNING d.*
+"""
+)
+
+
+async def reconcile_post_stats(
+    session: AsyncSession, batch_size: int = 10_000, fix: bool = True
+) -> list[dict]:
+    """
+    Rebuilds post aggregates in id ranges of ``batch_size`` posts.
+
+    Every range is fixed and committed separately, so row locks are short.
+
+    :param fix: Only report drift without rewriting aggregates when False.
+    :return: Drifted posts with stored and actual values.
+    """
+    bounds = (await session.execute(text("SELECT min(id), max(id) FROM posts"))).one()
+    if bounds[0] is None:
+        return []
+    drifted = []
+    for first_id in range(bounds[0], bounds[1] + 1, batch_size):
+        params = {"first_id": first_id, "last_id": first_id + batch_size - 1}
+        result = await session.execute(text(FIX_DRIFT if fix else SELECT_DRIFT), params)
+        drifted.extend(dict(row) for row in result.mappings())
+        if fix:
+            await session.commit()
+    return drifted
+
+
+async def main(fix: bool) -> None:
+    """Runs reconciliation and logs drifted posts"""
+    async with Session() as session:
+        drifted = await reconcile_post_stats(session, fix=fix)
+    for row in drifted:
+        logging.warning(
+            "Post %s aggregates drifted: reviews %s -> %s, rating sum %s -> %s, "
+            "favorites %s -> %s",
+            row["id"],
+            row["stored_review_count"],
+            row["review_count"],
+            row["stored_rating_sum"],
+            row["rating_sum"],
+            row["stored_favorite_count"],
+            row["favorite_count"],
+        )
+    logging.info("Post aggregates reconciled, %s posts drifted", len(drifted))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(main(fix="--dry-run" not in sys.argv))
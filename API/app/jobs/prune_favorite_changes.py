@@ -0,0 +1,39 @@
+"""
+Retention of the favorite changes log.
+
+``favorite_changes`` is read by every API worker, which drops cached
+favorite sets of changed users, and by the similar posts job, which
+recomputes posts changed since its last run. Neither deletes rows: this job
+deletes rows older than ``FAVORITE_CHANGES_RETENTION`` seconds, so readers
+which fell behind by less than that still see every change.
+
+Run from the repository root: python -m API.app.jobs.prune_favorite_changes
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from API.app.repositories.favorites import favorite_repository
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import engine
+
+
+async def main() -> None:
+    """Deletes favorite changes older than the retention"""
+    before = datetime.now(timezone.utc) - timedelta(
+        seconds=config.cache.favorite_changes_retention
+    )
+    async with Session() as session:
+        deleted = await favorite_repository.prune_changes(session, before)
+        await session.commit()
+    logging.info("Deleted %s favorite changes logged before %s", deleted, before)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Test data for development databases.
+
+Inserts users, posts, reviews and favorites into a migrated database.
+
+Run from the repository root: python -m API.app.jobs.seed
+"""
+
+import asyncio
+import logging
+import random
+
+from API.app.models.posts import HandicraftCategory
+from API.app.models.posts import Post
+from API.app.models.posts import PostStatus
+from API.app.models.posts import Review
+from API.app.models.users import Favorite
+from API.app.models.users import User
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+
+
+async def create_test_data():
+    """Inserts 10 users with posts, reviews and favorites"""
+    async with Session() as session:
+        # Створюємо 10 юзерів
+        user_ids = await BaseRepository(User).create_many(session, [
+            {
+                "google_id": f"google_{i}",
+                "phone_number": f"+3805012345{i:02d}",
+                "email": f"user{i}@example.com",
+                "name": f"User {i}",
+                "avatar_url": f"https://example.com/avatar{i}.png",
+            }
+            for i in range(10)
+        ])
+
+        # Створюємо 30 постів
+        posts = []
+        for i in range(30):
+            user_id = random.choice(user_ids)
+            posts.append({
+                "user_id": user_id,
+                "title": f"Пост {i} від User {user_ids.index(user_id)}",
+                "content": "Опис виробу ручної роботи",
+                "image_url": f"https://example.com/post{i}.jpg",
+                "categories": [
+                    random.choice(list(HandicraftCategory)).name,  # <- тут .name дає 'CANDLE_MAKING'
+                    random.choice(list(HandicraftCategory)).name
+                ],
+                "credit_card_number": "1234567890123456",
+                "status": random.choice(list(PostStatus)),
+            })
+        post_ids = await BaseRepository(Post).create_many(session, posts)
+
+        # Створюємо 30 відгуків
+        await BaseRepository(Review).create_many(session, [
+            {
+                "user_id": random.choice(user_ids),
+                "post_id": random.choice(post_ids),
+                "message": random.choice([
+                    "Супер!", "Гарно зроблено", "Дуже сподобалося", "Рекомендую!", "Якість на висоті"
+                ]),
+                "rating": random.randint(3, 5),
+            }
+            for _ in range(30)
+        ])
+
+        # Додаємо 30 обраних постів (favorites)
+        favorites_set = set()
+        while len(favorites_set) < 30:
+            favorites_set.add((random.choice(user_ids), random.choice(post_ids)))
+        await BaseRepository(Favorite).create_many(session, [
+            {"user_id": user_id, "post_id": post_id}
+            for user_id, post_id in favorites_set
+        ])
+
+        await session.commit()
+        print("✅ Тестові дані успішно додано (10 юзерів, 30 постів, 30 відгуків, 30 обраних)")
+
+
+async def main() -> None:
+    """Seeds database"""
+    await create_test_data()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,282 @@
+"""
+Similar posts ("you may also like").
+
+Pairs of posts are scored by cosine similarity of the sets of users who
+favorited them (item-to-item collaborative filtering) plus a weighted
+cosine similarity of their categories. Top K posts in stock per post are
+stored in a TopKFile read by ``GET /api/posts/{post_id}/similar``. Posts
+with fewer than K co-favorited posts are filled up with the most favorited
+posts of the most similar categories.
+
+A run without ``--full`` recomputes only rows of posts affected by
+favorites logged in ``favorite_changes`` since the last run and of posts
+created since, patching them in place. The last change read is kept in the
+file's metadata; the log is shared with API workers and pruned by age, so
+the job never deletes from it. It builds the file from scratch when it is
+missing, has no rows for new posts, most posts are affected, or the last
+run is older than ``FAVORITE_CHANGES_RETENTION``.
+
+Needs NumPy and SciPy.
+
+Run from the repository root: python -m API.app.jobs.similar_posts [--full]
+"""
+
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from time import time
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import Select
+from sqlalchemy import false
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.posts import HandicraftCategory
+from API.app.models.posts import Post
+from API.app.models.posts import PostStatus
+from API.app.models.users import Favorite
+from API.app.models.users import FavoriteChange
+from API.core.cache.topk import EMPTY
+from API.core.cache.topk import TopKFile
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import engine
+
+# Bits of posts.categories_mask
+CATEGORY_COUNT = len(HandicraftCategory)
+BLOCK_ROWS = 1024
+FETCH_ROWS = 100_000
+# Changes before the last one read are read again, as ids of concurrent
+# transactions may commit out of order
+CHANGES_LOOKBACK = 1000
+
+
+@dataclass
+class Catalog:
+    """Posts and favorites as arrays, posts are indexed by position in post_ids"""
+
+    post_ids: np.ndarray
+    masks: np.ndarray
+    popularity: np.ndarray
+    in_stock: np.ndarray
+    user_ids: np.ndarray
+    # users x posts, 1 where user favorited post
+    favorites: sparse.csr_matrix
+
+    def indices(self, post_ids: np.ndarray) -> np.ndarray:
+        """Returns indices of post ids which exist"""
+        indices = np.searchsorted(self.post_ids, post_ids)
+        found = indices < len(self.post_ids)
+        found[found] = self.post_ids[indices[found]] == post_ids[found]
+        return indices[found]
+
+
+async def fetch(session: AsyncSession, query: Select, columns: int) -> np.ndarray:
+    """Returns rows of query as int64 array, fetched with a server-side cursor"""
+    result = await session.stream(query.execution_options(yield_per=FETCH_ROWS))
+    chunks = [
+        np.array(rows, dtype=np.int64).reshape(-1, columns)
+        async for rows in result.partitions()
+    ]
+    return np.concatenate(chunks) if chunks else np.empty((0, columns), np.int64)
+
+
+async def load_catalog(session: AsyncSession) -> Catalog:
+    """Loads posts and favorites"""
+    posts = await fetch(
+        session,
+        select(
+            Post.id,
+            Post.categories_mask,
+            Post.favorite_count,
+            func.coalesce(Post.status == PostStatus.IN_STOCK, false()),
+        ).order_by(Post.id),
+        4,
+    )
+    favorites = await fetch(session, select(Favorite.user_id, Favorite.post_id), 2)
+    catalog = Catalog(
+        post_ids=posts[:, 0],
+        masks=posts[:, 1],
+        popularity=posts[:, 2],
+        in_stock=posts[:, 3].astype(bool),
+        user_ids=np.empty(0, np.int64),
+        favorites=sparse.csr_matrix((0, len(posts)), dtype=np.float32),
+    )
+    post_index = np.searchsorted(catalog.post_ids, favorites[:, 1])
+    valid = post_index < len(catalog.post_ids)
+    valid[valid] = catalog.post_ids[post_index[valid]] == favorites[valid, 1]
+    catalog.user_ids, user_index = np.unique(favorites[valid, 0], return_inverse=True)
+    catalog.favorites = sparse.csr_matrix(
+        (np.ones(int(valid.sum()), np.float32), (user_index, post_index[valid])),
+        shape=(len(catalog.user_ids), len(catalog.post_ids)),
+    )
+    return catalog
+
+
+def category_similarity(masks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns index of each mask among distinct masks and their cosine similarity"""
+    distinct, mask_index = np.unique(masks, return_inverse=True)
+    bits = ((distinct[:, None] >> np.arange(CATEGORY_COUNT)) & 1).astype(np.float32)
+    norms = np.linalg.norm(bits, axis=1)
+    bits = np.divide(bits, norms[:, None], out=np.zeros_like(bits), where=norms[:, None] > 0)
+    return mask_index, bits @ bits.T
+
+
+def category_fallback(
+    catalog: Catalog, mask_index: np.ndarray, mask_similarity: np.ndarray, k: int
+) -> list[np.ndarray]:
+    """Returns k + 1 most favorited posts in stock of the most similar masks per mask"""
+    candidates = np.flatnonzero(catalog.in_stock)
+    # k + 1 most favorited posts per mask, one of them may be the post itself
+    candidates = candidates[np.lexsort((-catalog.popularity[candidates], mask_index[candidates]))]
+    groups = mask_index[candidates]
+    rank = np.arange(len(candidates)) - np.searchsorted(groups, groups)
+    candidates, groups = candidates[rank <= k], groups[rank <= k]
+    by_mask = np.split(candidates, np.searchsorted(groups, np.arange(1, len(mask_similarity))))
+    fallback = []
+    for similarity in mask_similarity:
+        posts = []
+        for other in np.argsort(-similarity, kind="stable"):
+            posts.extend(by_mask[other])
+            if len(posts) > k:
+                break
+        fallback.append(np.array(posts[: k + 1], dtype=np.int64))
+    return fallback
+
+
+def similar_posts(
+    catalog: Catalog, rows: np.ndarray, k: int, category_weight: float
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Yields indices of posts of rows by blocks with ids of their k most similar posts
+
+    Co-favorite counts of a block are one sparse product of the block's
+    columns with the user x post matrix.
+    """
+    favorites = catalog.favorites
+    by_post = favorites.T.tocsr()
+    degree = np.asarray(favorites.sum(axis=0)).ravel()
+    inverse_norm = np.divide(
+        1.0, np.sqrt(degree), out=np.zeros(len(degree)), where=degree > 0
+    )
+    mask_index, mask_similarity = category_similarity(catalog.masks)
+    fallback = category_fallback(catalog, mask_index, mask_similarity, k)
+
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block = rows[start : start + BLOCK_ROWS]
+        neighbors = np.full((len(block), k), EMPTY, np.int32)
+        shared = (by_post[block] @ favorites).tocoo()
+        keep = (shared.col != block[shared.row]) & catalog.in_stock[shared.col]
+        row, col = shared.row[keep], shared.col[keep]
+        score = shared.data[keep] * inverse_norm[block[row]] * inverse_norm[col]
+        score += category_weight * mask_similarity[mask_index[block[row]], mask_index[col]]
+
+        order = np.lexsort((-score, row))
+        row, col = row[order], col[order]
+        rank = np.arange(len(row)) - np.searchsorted(row, row)
+        top = rank < k
+        neighbors[row[top], rank[top]] = catalog.post_ids[col[top]]
+
+        counts = np.bincount(row[top], minlength=len(block))
+        for i in np.flatnonzero(counts < k):
+            taken = set(neighbors[i, : counts[i]].tolist())
+            taken.add(int(catalog.post_ids[block[i]]))
+            count = counts[i]
+            for candidate in catalog.post_ids[fallback[mask_index[block[i]]]].tolist():
+                if count == k:
+                    break
+                if candidate not in taken:
+                    neighbors[i, count] = candidate
+                    count += 1
+        yield block, neighbors
+
+
+def affected_rows(
+    catalog: Catalog, changes: np.ndarray, built_max_post_id: int
+) -> np.ndarray:
+    """
+    Returns indices of posts whose similar posts may have changed
+
+    Those are posts of changed favorites and posts sharing a user with them,
+    as their co-favorite counts or degrees changed, and posts created since
+    the last build.
+    """
+    favorites = catalog.favorites.tocsc()
+    changed_posts = catalog.indices(np.unique(changes[:, 1]))
+    users = np.union1d(
+        favorites[:, changed_posts].indices,
+        np.searchsorted(catalog.user_ids, np.intersect1d(changes[:, 0], catalog.user_ids)),
+    )
+    neighbors = np.unique(catalog.favorites[users].indices)
+    new_posts = np.flatnonzero(catalog.post_ids > built_max_post_id)
+    return np.union1d(np.union1d(changed_posts, neighbors), new_posts)
+
+
+async def main(full: bool) -> None:
+    """Builds or updates similar posts"""
+    settings = config.recommendations
+    store = TopKFile(settings.similar_posts_path)
+    k = settings.similar_posts_k
+    metadata = store.metadata()
+    started_at = time()
+    async with Session() as session:
+        last_change = await session.scalar(select(func.max(FavoriteChange.id))) or 0
+        changes = await fetch(
+            session,
+            select(FavoriteChange.user_id, FavoriteChange.post_id).where(
+                FavoriteChange.id > max(0, metadata.get("last_change", 0) - CHANGES_LOOKBACK),
+                FavoriteChange.id <= last_change,
+            ),
+            2,
+        )
+        catalog = await load_catalog(session)
+
+    max_post_id = int(catalog.post_ids[-1]) if len(catalog.post_ids) else 0
+    # Changes older than the retention may be pruned from the log already
+    incremental = (
+        not full
+        and metadata.get("k") == k
+        and max_post_id < metadata.get("rows", 0)
+        and "last_change" in metadata
+        and started_at - metadata.get("built_at", 0)
+        < config.cache.favorite_changes_retention
+    )
+    rows = None
+    if incremental:
+        rows = affected_rows(catalog, changes, metadata["max_post_id"])
+        if len(rows) > len(catalog.post_ids) // 2:
+            rows = None
+    new_metadata = {
+        "k": k,
+        "max_post_id": max_post_id,
+        "last_change": last_change,
+        "built_at": started_at,
+    }
+
+    if rows is None:
+        # Room for posts created until the next full build
+        capacity = int(max_post_id * 1.25) + 1024
+        array = store.create(capacity, k)
+        for block, neighbors in similar_posts(
+            catalog, np.arange(len(catalog.post_ids)), k, settings.category_weight
+        ):
+            array[catalog.post_ids[block]] = neighbors
+        store.commit(array, {**new_metadata, "rows": capacity})
+        logging.info("Similar posts built for %s posts", len(catalog.post_ids))
+    else:
+        array = store.open_for_update()
+        for block, neighbors in similar_posts(catalog, rows, k, settings.category_weight):
+            array[catalog.post_ids[block]] = neighbors
+        store.update(array, {**new_metadata, "rows": len(array)})
+        logging.info("Similar posts updated for %s posts", len(rows))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    asyncio.run(main(full="--full" in sys.argv))
@@ -0,0 +1,12 @@
+"""
+Schema migrations of the application.
+
+Every migration holds its DDL as literal SQL, the schema as it was when it
+was written, and never imports models or jobs, so a version means the same
+schema whatever the current models are. Migrations are idempotent
+(``IF NOT EXISTS``, ``CREATE OR REPLACE``, ``recreate_triggers``), as
+databases created by ``create_all`` before migrations existed already have
+some of their changes.
+
+Apply with: python -m API.app.jobs.migrate
+"""
@@ -0,0 +1,87 @@
+"""
+Initial schema.
+
+Schema of the first release, as it was when this migration was written, not
+as in current models. Later migrations add everything since. On databases
+created by ``create_all`` before migrations existed it changes nothing.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+STATEMENTS = (
+    """
+    DO $$ BEGIN
+        CREATE TYPE category AS ENUM (
+            'KNITTING', 'CROCHET', 'JEWELRY', 'SEWING', 'EMBROIDERY', 'PAINTING',
+            'WOODWORK', 'LEATHER_CRAFT', 'CERAMICS', 'CANDLE_MAKING', 'SOAP_MAKING',
+            'PAPER_CRAFT', 'GLASS_ART', 'METAL_CRAFT', 'RESIN_ART', 'BASKETRY',
+            'DOLL_MAKING', 'MACRAME', 'OTHER'
+        );
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    DO $$ BEGIN
+        CREATE TYPE status AS ENUM ('SOLD', 'IN_STOCK');
+    EXCEPTION WHEN duplicate_object THEN NULL;
+    END $$
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL NOT NULL,
+        google_id VARCHAR NOT NULL,
+        phone_number VARCHAR NOT NULL,
+        email VARCHAR NOT NULL,
+        name VARCHAR,
+        avatar_url VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (google_id),
+        UNIQUE (phone_number),
+        UNIQUE (email)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS posts (
+        id SERIAL NOT NULL,
+        user_id INTEGER NOT NULL,
+        title VARCHAR(50) NOT NULL,
+        content TEXT NOT NULL,
+        image_url VARCHAR(100),
+        categories category[],
+        credit_card_number VARCHAR(16),
+        status status,
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reviews (
+        id SERIAL NOT NULL,
+        user_id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        message TEXT,
+        rating INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (post_id) REFERENCES posts (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS favorites (
+        user_id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, post_id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (post_id) REFERENCES posts (id)
+    )
+    """,
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Creates types and tables missing in database"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
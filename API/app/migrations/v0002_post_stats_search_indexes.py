@@ -0,0 +1,213 @@
+"""
+Post aggregates, search vector, category mask and keyset indexes.
+
+Schema as it was when this migration was written, not as in current models.
+Existing posts get their categories mask and aggregates filled in.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from API.core.database.migrations import recreate_triggers
+
+STATEMENTS = (
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS categories_mask INTEGER DEFAULT '0' NOT NULL",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS review_count INTEGER DEFAULT '0' NOT NULL",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS rating_sum INTEGER DEFAULT '0' NOT NULL",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS rating_avg FLOAT DEFAULT '0' NOT NULL",
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS favorite_count INTEGER DEFAULT '0' NOT NULL",
+    """
+    ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple'::regconfig, coalesce(content, '')), 'B')
+        || setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "ALTER TABLE users ALTER COLUMN created_at SET DEFAULT now()",
+    "ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT now()",
+)
+# Functions and triggers of categories mask and aggregates
+TRIGGERS = (
+    """
+CREATE OR REPLACE FUNCTION posts_categories_mask() RETURNS trigger AS $$
+BEGIN
+    NEW.categories_mask := COALESCE((
+        SELECT bit_or(1 << (array_position(enum_range(NULL::category), category) - 1))
+        FROM unnest(NEW.categories) AS category
+    ), 0);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE TRIGGER posts_categories_mask BEFORE INSERT OR UPDATE OF categories ON posts
+FOR EACH ROW EXECUTE FUNCTION posts_categories_mask()
+""",
+    """
+CREATE OR REPLACE FUNCTION reviews_post_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+
+        UPDATE posts AS p
+        SET review_count = p.review_count + d.delta_count,
+            rating_sum = p.rating_sum + d.delta_total,
+            rating_avg = COALESCE(
+                (p.rating_sum + d.delta_total)::float / NULLIF(p.review_count + d.delta_count, 0), 0
+            )
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count, sum(delta_total) AS delta_total
+            FROM (SELECT post_id, 1 AS delta_count, rating AS delta_total FROM new_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND (d.delta_count <> 0 OR d.delta_total <> 0);
+
+    ELSIF TG_OP = 'DELETE' THEN
+
+        UPDATE posts AS p
+        SET review_count = p.review_count + d.delta_count,
+            rating_sum = p.rating_sum + d.delta_total,
+            rating_avg = COALESCE(
+                (p.rating_sum + d.delta_total)::float / NULLIF(p.review_count + d.delta_count, 0), 0
+            )
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count, sum(delta_total) AS delta_total
+            FROM (SELECT post_id, -1 AS delta_count, -rating AS delta_total FROM old_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND (d.delta_count <> 0 OR d.delta_total <> 0);
+
+    ELSE
+
+        UPDATE posts AS p
+        SET review_count = p.review_count + d.delta_count,
+            rating_sum = p.rating_sum + d.delta_total,
+            rating_avg = COALESCE(
+                (p.rating_sum + d.delta_total)::float / NULLIF(p.review_count + d.delta_count, 0), 0
+            )
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count, sum(delta_total) AS delta_total
+            FROM (SELECT post_id, 1 AS delta_count, rating AS delta_total FROM new_rows UNION ALL SELECT post_id, -1 AS delta_count, -rating AS delta_total FROM old_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND (d.delta_count <> 0 OR d.delta_total <> 0);
+
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE TRIGGER reviews_post_stats_insert AFTER INSERT ON reviews
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION reviews_post_stats()
+""",
+    """
+CREATE TRIGGER reviews_post_stats_update AFTER UPDATE ON reviews
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION reviews_post_stats()
+""",
+    """
+CREATE TRIGGER reviews_post_stats_delete AFTER DELETE ON reviews
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION reviews_post_stats()
+""",
+    """
+CREATE OR REPLACE FUNCTION favorites_post_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+
+        UPDATE posts AS p
+        SET favorite_count = p.favorite_count + d.delta_count
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count
+            FROM (SELECT post_id, 1 AS delta_count FROM new_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND d.delta_count <> 0;
+
+    ELSIF TG_OP = 'DELETE' THEN
+
+        UPDATE posts AS p
+        SET favorite_count = p.favorite_count + d.delta_count
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count
+            FROM (SELECT post_id, -1 AS delta_count FROM old_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND d.delta_count <> 0;
+
+    ELSE
+
+        UPDATE posts AS p
+        SET favorite_count = p.favorite_count + d.delta_count
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count
+            FROM (SELECT post_id, 1 AS delta_count FROM new_rows UNION ALL SELECT post_id, -1 AS delta_count FROM old_rows) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND d.delta_count <> 0;
+
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""",
+    """
+CREATE TRIGGER favorites_post_stats_insert AFTER INSERT ON favorites
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION favorites_post_stats()
+""",
+    """
+CREATE TRIGGER favorites_post_stats_update AFTER UPDATE ON favorites
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION favorites_post_stats()
+""",
+    """
+CREATE TRIGGER favorites_post_stats_delete AFTER DELETE ON favorites
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION favorites_post_stats()
+""",
+)
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_posts_user_id_id ON posts (user_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_rating_avg_id ON posts (rating_avg, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_favorite_count_id ON posts (favorite_count, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_categories_in_stock ON posts "
+    "USING gin (categories) WHERE status = 'IN_STOCK'",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_post_id_id ON reviews (post_id, id)",
+    "CREATE INDEX IF NOT EXISTS ix_reviews_rating_id ON reviews (rating, id)",
+    "CREATE INDEX IF NOT EXISTS ix_users_created_at_id ON users (created_at, id)",
+)
+# Fires posts_categories_mask for posts written before the trigger existed
+FILL_CATEGORIES_MASK = (
+    "UPDATE posts SET categories = categories "
+    "WHERE categories IS NOT NULL AND categories_mask = 0"
+)
+FILL_STATS = """
+    UPDATE posts AS p
+    SET review_count = COALESCE(r.review_count, 0),
+        rating_sum = COALESCE(r.rating_sum, 0),
+        rating_avg = COALESCE(r.rating_sum::float / NULLIF(r.review_count, 0), 0),
+        favorite_count = COALESCE(f.favorite_count, 0)
+    FROM posts AS q
+    LEFT JOIN (
+        SELECT post_id, count(*) AS review_count, sum(rating) AS rating_sum
+        FROM reviews
+        GROUP BY post_id
+    ) AS r ON r.post_id = q.id
+    LEFT JOIN (
+        SELECT post_id, count(*) AS favorite_count FROM favorites GROUP BY post_id
+    ) AS f ON f.post_id = q.id
+    WHERE p.id = q.id
+"""
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Adds missing columns, triggers and indexes and fills new columns"""
+    for statement in (*STATEMENTS, *INDEXES):
+        await conn.execute(text(statement))
+    await recreate_triggers(conn, TRIGGERS)
+    await conn.execute(text(FILL_CATEGORIES_MASK))
+    await conn.execute(text(FILL_STATS))
@@ -0,0 +1,42 @@
+"""
+Timestamps of posts and reviews.
+
+Existing rows get the time of the migration as ``created_at`` and
+``updated_at``. Schema as it was when this migration was written, not as in
+current models.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from API.core.database.migrations import recreate_triggers
+
+STATEMENTS = tuple(
+    f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} "
+    "TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL"
+    for table in ("posts", "reviews")
+    for column in ("created_at", "updated_at")
+)
+TRIGGERS = (
+    """
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+    "CREATE TRIGGER posts_touch_updated_at BEFORE UPDATE ON posts "
+    "FOR EACH ROW EXECUTE FUNCTION touch_updated_at()",
+    "CREATE TRIGGER reviews_touch_updated_at BEFORE UPDATE ON reviews "
+    "FOR EACH ROW EXECUTE FUNCTION touch_updated_at()",
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Adds created_at and updated_at with triggers moving updated_at"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
+    await recreate_triggers(conn, TRIGGERS)
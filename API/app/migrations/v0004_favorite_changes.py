@@ -0,0 +1,49 @@
+"""Log of changed favorites for the similar posts job"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from API.core.database.migrations import recreate_triggers
+
+# Schema as it was when this migration was written, not as in current models
+STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS favorite_changes (
+        id BIGSERIAL NOT NULL,
+        user_id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+)
+TRIGGERS = (
+    """
+CREATE OR REPLACE FUNCTION favorites_log_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO favorite_changes (user_id, post_id) SELECT user_id, post_id FROM new_rows;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO favorite_changes (user_id, post_id) SELECT user_id, post_id FROM old_rows;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""",
+    "CREATE TRIGGER favorites_log_changes_insert AFTER INSERT ON favorites "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()",
+    "CREATE TRIGGER favorites_log_changes_update AFTER UPDATE ON favorites "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()",
+    "CREATE TRIGGER favorites_log_changes_delete AFTER DELETE ON favorites "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()",
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Creates favorite_changes and triggers filling it"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
+    await recreate_triggers(conn, TRIGGERS)
@@ -0,0 +1,25 @@
+"""Revoked access tokens"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Schema as it was when this migration was written, not as in current models
+STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        id BIGSERIAL NOT NULL,
+        token_id VARCHAR,
+        user_id INTEGER,
+        issued_until TIMESTAMP WITH TIME ZONE,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at ON revoked_tokens (expires_at)",
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Creates revoked_tokens"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
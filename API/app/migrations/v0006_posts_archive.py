@@ -0,0 +1,66 @@
+"""Archive of sold posts and partial indexes of posts in stock"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Schema as it was when this migration was written, not as in current models
+STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS posts_archive (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        title VARCHAR(50) NOT NULL,
+        content TEXT NOT NULL,
+        image_url VARCHAR(100),
+        categories category[],
+        credit_card_number VARCHAR(16),
+        status status,
+        categories_mask INTEGER NOT NULL,
+        review_count INTEGER NOT NULL,
+        rating_sum INTEGER NOT NULL,
+        rating_avg FLOAT NOT NULL,
+        favorite_count INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_posts_archive_user_id_id ON posts_archive (user_id, id)",
+    """
+    CREATE TABLE IF NOT EXISTS reviews_archive (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        message TEXT,
+        rating INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_reviews_archive_post_id_id ON reviews_archive (post_id, id)",
+    """
+    CREATE TABLE IF NOT EXISTS favorites_archive (
+        user_id INTEGER NOT NULL,
+        post_id INTEGER NOT NULL,
+        PRIMARY KEY (user_id, post_id)
+    )
+    """,
+    # Sort indexes of the catalog, restricted to posts in stock
+    "CREATE INDEX IF NOT EXISTS ix_posts_in_stock_id ON posts (id) WHERE status = 'IN_STOCK'",
+    "CREATE INDEX IF NOT EXISTS ix_posts_in_stock_rating_avg_id ON posts "
+    "(rating_avg, id) WHERE status = 'IN_STOCK'",
+    "CREATE INDEX IF NOT EXISTS ix_posts_in_stock_favorite_count_id ON posts "
+    "(favorite_count, id) WHERE status = 'IN_STOCK'",
+    "CREATE INDEX IF NOT EXISTS ix_posts_sold_updated_at ON posts (updated_at) "
+    "WHERE status = 'SOLD'",
+    # Replaced by the partial indexes above
+    "DROP INDEX IF EXISTS ix_posts_rating_avg_id",
+    "DROP INDEX IF EXISTS ix_posts_favorite_count_id",
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Creates archive tables and replaces sort indexes of posts with partial ones"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
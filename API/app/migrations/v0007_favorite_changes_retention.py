@@ -0,0 +1,17 @@
+"""Creation time of favorite_changes rows, pruned by age"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+STATEMENTS = (
+    "ALTER TABLE favorite_changes "
+    "ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_favorite_changes_created_at "
+    "ON favorite_changes (created_at)",
+)
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    """Adds created_at to favorite_changes"""
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -1,2 +1,7 @@
 from . import posts
-from . import users
\ No newline at end of file
+from . import users
+from . import aggregates
+from . import category_mask
+from . import timestamps
+from . import favorite_changes
+from . import archive
@@ -0,0 +1,103 @@
+"""
+Triggers maintaining Post rating and popularity aggregates.
+
+``posts.review_count``, ``rating_sum``, ``rating_avg`` and ``favorite_count``
+are updated by statement level triggers on ``reviews`` and ``favorites`` in
+the same transaction as the change, so ORM writes, bulk INSERTs and COPY all
+keep them in sync. Drift is repaired by ``API.app.jobs.post_stats``.
+"""
+
+from sqlalchemy import DDL
+from sqlalchemy import event
+
+from API.app.models.posts import Review
+from API.app.models.users import Favorite
+
+REVIEW_DELTA_UPDATE = """
+        UPDATE posts AS p
+        SET review_count = p.review_count + d.delta_count,
+            rating_sum = p.rating_sum + d.delta_total,
+            rating_avg = COALESCE(
+                (p.rating_sum + d.delta_total)::float / NULLIF(p.review_count + d.delta_count, 0), 0
+            )
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count, sum(delta_total) AS delta_total
+            FROM ({rows}) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND (d.delta_count <> 0 OR d.delta_total <> 0);
+"""
+
+FAVORITE_DELTA_UPDATE = """
+        UPDATE posts AS p
+        SET favorite_count = p.favorite_count + d.delta_count
+        FROM (
+            SELECT post_id, sum(delta_count) AS delta_count
+            FROM ({rows}) AS changes
+            GROUP BY post_id
+        ) AS d
+        WHERE p.id = d.post_id AND d.delta_count <> 0;
+"""
+
+NEW_REVIEWS = "SELECT post_id, 1 AS delta_count, rating AS delta_total FROM new_rows"
+OLD_REVIEWS = "SELECT post_id, -1 AS delta_count, -rating AS delta_total FROM old_rows"
+NEW_FAVORITES = "SELECT post_id, 1 AS delta_count FROM new_rows"
+OLD_FAVORITES = "SELECT post_id, -1 AS delta_count FROM old_rows"
+
+
+def _trigger_function(name: str, update: str, new_rows: str, old_rows: str) -> DDL:
+    """Returns DDL of trigger function applying per-post deltas of changed rows"""
+    return DDL(
+        f"""
+CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+{update.format(rows=new_rows)}
+    ELSIF TG_OP = 'DELETE' THEN
+{update.format(rows=old_rows)}
+    ELSE
+{update.format(rows=f"{new_rows} UNION ALL {old_rows}")}
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+    )
+
+
+def _triggers(table: str, function: str) -> list[DDL]:
+    """Returns DDL of statement level triggers with transition tables"""
+    return [
+        DDL(
+            f"CREATE TRIGGER {table}_post_stats_insert AFTER INSERT ON {table} "
+            f"REFERENCING NEW TABLE AS new_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        ),
+        DDL(
+            f"CREATE TRIGGER {table}_post_stats_update AFTER UPDATE ON {table} "
+            f"REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        ),
+        DDL(
+            f"CREATE TRIGGER {table}_post_stats_delete AFTER DELETE ON {table} "
+            f"REFERENCING OLD TABLE AS old_rows "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+        ),
+    ]
+
+
+REVIEW_STATS_DDL = [
+    _trigger_function("reviews_post_stats", REVIEW_DELTA_UPDATE, NEW_REVIEWS, OLD_REVIEWS),
+    *_triggers("reviews", "reviews_post_stats"),
+]
+FAVORITE_STATS_DDL = [
+    _trigger_function(
+        "favorites_post_stats", FAVORITE_DELTA_UPDATE, NEW_FAVORITES, OLD_FAVORITES
+    ),
+    *_triggers("favorites", "favorites_post_stats"),
+]
+
+for ddl in REVIEW_STATS_DDL:
+    event.listen(Review.__table__, "after_create", ddl)
+for ddl in FAVORITE_STATS_DDL:
+    event.listen(Favorite.__table__, "after_create", ddl)
@@ -0,0 +1,58 @@
+"""
+Archive of sold posts.
+
+Sold posts leave the catalog for good but keep piling up, so the
+``archive_posts`` job moves them, with their reviews and favorites, to
+tables of the same columns. ``posts`` and its indexes then hold mostly
+posts in stock and stay in memory as the catalog grows. Archive tables
+have no foreign keys and are read only when asked for.
+"""
+
+from sqlalchemy import Column
+from sqlalchemy import Index
+from sqlalchemy import Table
+
+from API.app.models.posts import Post
+from API.app.models.posts import Review
+from API.app.models.users import Favorite
+from API.core.database.base import Base
+
+
+def _archive_columns(model, skip=()) -> list[Column]:
+    """Returns copies of columns of model without keys to other tables and defaults"""
+    return [
+        Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            autoincrement=False,
+            nullable=column.nullable,
+        )
+        for column in model.__table__.columns
+        if column.name not in skip
+    ]
+
+
+class PostArchive(Base):
+    # Архівні пости, search_vector не переноситься: архів не шукається
+    __table__ = Table(
+        "posts_archive",
+        Base.metadata,
+        *_archive_columns(Post, skip=("search_vector",)),
+        Index("ix_posts_archive_user_id_id", "user_id", "id"),  # Продані пости автора
+    )
+
+
+class ReviewArchive(Base):
+    # Відгуки архівних постів
+    __table__ = Table(
+        "reviews_archive",
+        Base.metadata,
+        *_archive_columns(Review),
+        Index("ix_reviews_archive_post_id_id", "post_id", "id"),  # Відгуки архівного поста
+    )
+
+
+class FavoriteArchive(Base):
+    # Обране з архівними постами
+    __table__ = Table("favorites_archive", Base.metadata, *_archive_columns(Favorite))
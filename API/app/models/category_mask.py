@@ -0,0 +1,35 @@
+"""
+Trigger maintaining ``posts.categories_mask``.
+
+Bit ``i`` of the mask is set when the post has the ``i``-th value of the
+``category`` enum, the same order as ``HandicraftCategory`` and
+``CATEGORY_BITS``. Being a trigger, it covers ORM writes, bulk INSERTs and COPY.
+"""
+
+from sqlalchemy import DDL
+from sqlalchemy import event
+
+from API.app.models.posts import Post
+
+CATEGORIES_MASK_DDL = [
+    DDL(
+        """
+CREATE OR REPLACE FUNCTION posts_categories_mask() RETURNS trigger AS $$
+BEGIN
+    NEW.categories_mask := COALESCE((
+        SELECT bit_or(1 << (array_position(enum_range(NULL::category), category) - 1))
+        FROM unnest(NEW.categories) AS category
+    ), 0);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+    ),
+    DDL(
+        "CREATE TRIGGER posts_categories_mask BEFORE INSERT OR UPDATE OF categories "
+        "ON posts FOR EACH ROW EXECUTE FUNCTION posts_categories_mask()"
+    ),
+]
+
+for ddl in CATEGORIES_MASK_DDL:
+    event.listen(Post.__table__, "after_create", ddl)
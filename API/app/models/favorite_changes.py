@@ -0,0 +1,50 @@
+"""
+Trigger logging changed favorites into ``favorite_changes``.
+
+API workers read the log to drop cached favorite sets changed by other
+workers, and the similar posts job (``API.app.jobs.similar_posts``) to
+recompute only posts affected by favorites added or removed since its last
+run. Readers keep their own position in the log, rows are deleted by age
+only (``API.app.jobs.prune_favorite_changes``).
+"""
+
+from sqlalchemy import DDL
+from sqlalchemy import event
+
+from API.app.models.users import Favorite
+
+FAVORITE_CHANGES_DDL = [
+    DDL(
+        """
+CREATE OR REPLACE FUNCTION favorites_log_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO favorite_changes (user_id, post_id) SELECT user_id, post_id FROM new_rows;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        INSERT INTO favorite_changes (user_id, post_id) SELECT user_id, post_id FROM old_rows;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+    ),
+    DDL(
+        "CREATE TRIGGER favorites_log_changes_insert AFTER INSERT ON favorites "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()"
+    ),
+    DDL(
+        "CREATE TRIGGER favorites_log_changes_update AFTER UPDATE ON favorites "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()"
+    ),
+    DDL(
+        "CREATE TRIGGER favorites_log_changes_delete AFTER DELETE ON favorites "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION favorites_log_changes()"
+    ),
+]
+
+for ddl in FAVORITE_CHANGES_DDL:
+    event.listen(Favorite.__table__, "after_create", ddl)
@@ -1,9 +1,13 @@
 import enum
+from typing import Iterable, Union
 
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, ARRAY, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, Enum, Index, Float, Computed, literal_column, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
+from API.core.config import config
 from API.core.database.base import Base
+from API.core.database.mixins.timestamp import TimestampMixin
 
 
 class HandicraftCategory(enum.Enum):
@@ -26,12 +30,69 @@ class HandicraftCategory(enum.Enum):
     DOLL_MAKING = "doll_making"          # Ляльки ручної роботи
     MACRAME = "macrame"                  # Макраме (вузлове плетіння)
     OTHER = "other"                      # Інше\
+
+# Біт кожної категорії в posts.categories_mask, у порядку оголошення enum
+CATEGORY_BITS = {category: 1 << index for index, category in enumerate(HandicraftCategory)}
+
+
+def category_mask(categories: Iterable[Union[HandicraftCategory, str]]) -> int:
+    """Returns bitmask of categories given as members or member names"""
+    mask = 0
+    for category in categories or ():
+        if isinstance(category, str):
+            category = HandicraftCategory[category]
+        mask |= CATEGORY_BITS[category]
+    return mask
+
+
+def search_vector_expression() -> str:
+    """Returns tsvector expression of title (weight A) and content (weight B)"""
+    configs = (config.search.ukrainian_config, config.search.english_config)
+    return " || ".join(
+        f"setweight(to_tsvector('{config_name}'::regconfig, coalesce({column}, '')), '{weight}')"
+        for column, weight in (("title", "A"), ("content", "B"))
+        for config_name in configs
+    )
+
+
 class PostStatus(enum.Enum):
     SOLD = "sold"
     IN_STOCK = "in_stock"
 
-class Post(Base):
+# Умова часткових індексів гарячих запитів. Запити пишуть її літералом (in_stock()),
+# бо з параметром замість 'IN_STOCK' планувальник не може використати такі індекси
+IN_STOCK_PREDICATE = "status = 'IN_STOCK'"
+
+class Post(Base, TimestampMixin):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_user_id_id", "user_id", "id"),  # Keyset пагінація постів автора
+        Index(  # Нові пости в каталозі
+            "ix_posts_in_stock_id", "id", postgresql_where=text(IN_STOCK_PREDICATE)
+        ),
+        Index(  # Сортування за рейтингом
+            "ix_posts_in_stock_rating_avg_id",
+            "rating_avg",
+            "id",
+            postgresql_where=text(IN_STOCK_PREDICATE),
+        ),
+        Index(  # Сортування за популярністю
+            "ix_posts_in_stock_favorite_count_id",
+            "favorite_count",
+            "id",
+            postgresql_where=text(IN_STOCK_PREDICATE),
+        ),
+        Index(  # Пошук проданих постів для архівації (див. jobs/archive_posts.py)
+            "ix_posts_sold_updated_at", "updated_at", postgresql_where=text("status = 'SOLD'")
+        ),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),  # Повнотекстовий пошук
+        Index(  # Фільтр за категоріями на сторінках каталогу
+            "ix_posts_categories_in_stock",
+            "categories",
+            postgresql_using="gin",
+            postgresql_where=text(IN_STOCK_PREDICATE),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Автор поста
@@ -41,14 +102,37 @@ class Post(Base):
     categories = Column(ARRAY(Enum(HandicraftCategory, name="category")), nullable=True)
     credit_card_number = Column(String(16), nullable=True)
     status = Column(Enum(PostStatus, name="status"), nullable=True)
+    # Бітова маска categories, заповнюється тригером (див. category_mask.py)
+    categories_mask = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Агрегати оновлюються тригерами в тій самій транзакції (див. aggregates.py)
+    review_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_avg = Column(Float, nullable=False, default=0, server_default="0")
+    favorite_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Генерована колонка для повнотекстового пошуку, не завантажується разом з постом
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(search_vector_expression(), persisted=True)),
+        raiseload=True,
+    )
 
     user = relationship("User",back_populates="posts")
     reviews = relationship("Review", back_populates="post", cascade="all, delete-orphan")
     favorites = relationship("Favorite", back_populates="post", cascade="all, delete-orphan")
 
 
-class Review(Base):
+def in_stock(model=Post):
+    """Returns condition of posts in stock matching partial indexes"""
+    return model.status == literal_column("'IN_STOCK'")
+
+
+class Review(Base, TimestampMixin):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_post_id_id", "post_id", "id"),  # Keyset пагінація відгуків поста
+        Index("ix_reviews_rating_id", "rating", "id"),  # Сортування відгуків за оцінкою
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Хто залишив відгук
@@ -0,0 +1,21 @@
+"""
+Triggers keeping ``updated_at`` of posts and reviews current.
+
+Post aggregates are updated by triggers (see aggregates.py), which the ORM's
+``onupdate`` does not see. ETags and Last-Modified of posts are derived from
+``updated_at``, so every UPDATE has to move it.
+"""
+
+from sqlalchemy import event
+
+from API.app.models.posts import Post
+from API.app.models.posts import Review
+from API.core.database.mixins.timestamp import touch_updated_at_ddl
+
+POST_TIMESTAMP_DDL = touch_updated_at_ddl("posts")
+REVIEW_TIMESTAMP_DDL = touch_updated_at_ddl("reviews")
+
+for ddl in POST_TIMESTAMP_DDL:
+    event.listen(Post.__table__, "after_create", ddl)
+for ddl in REVIEW_TIMESTAMP_DDL:
+    event.listen(Review.__table__, "after_create", ddl)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
 from API.core.database.base import Base
@@ -7,6 +7,9 @@ from API.core.database.mixins.timestamp import TimestampMixin
 
 class User(Base,TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),  # Keyset пагінація нових юзерів
+    )
 
     id = Column(Integer, primary_key=True)
     google_id = Column(String, unique=True, nullable=False)  # ID від Google
@@ -28,4 +31,33 @@ class Favorite(Base):
     post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
 
     user = relationship("User", back_populates="favorites")
-    post = relationship("Post", back_populates="favorites")
\ No newline at end of file
+    post = relationship("Post", back_populates="favorites")
+
+
+class FavoriteChange(Base):
+    __tablename__ = "favorite_changes"
+    __table_args__ = (
+        Index("ix_favorite_changes_created_at", "created_at"),  # Видалення застарілих записів
+    )
+
+    # Журнал змін обраного для схожих постів і кешів обраного у воркерах,
+    # заповнюється тригером (див. favorite_changes.py)
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, nullable=False)  # Без FK: запис лишається після видалення юзера
+    post_id = Column(Integer, nullable=False)
+    # Записи старші за FAVORITE_CHANGES_RETENTION видаляє prune_favorite_changes
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),  # Видалення застарілих записів
+    )
+
+    # Відкликані токени доступу, процеси підвантажують нові записи за id
+    id = Column(BigInteger, primary_key=True)
+    token_id = Column(String, nullable=True)  # jti одного токена
+    user_id = Column(Integer, nullable=True)  # Або всі токени юзера...
+    issued_until = Column(DateTime(timezone=True), nullable=True)  # ...видані до цього часу
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Після цього токени прострочені
@@ -0,0 +1,193 @@
+"""Favorite repository"""
+
+from datetime import datetime
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy import bindparam
+from sqlalchemy import delete
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from API.app.models.posts import Post
+from API.app.models.users import Favorite
+from API.app.models.users import FavoriteChange
+from API.core.cache.entity import invalidate_rows
+from API.core.cache.idset import IdSetCache
+from API.core.config import config
+from API.core.repository.base import BaseRepository
+
+_PENDING_KEY = "favorite_set_changes"
+
+
+class FavoriteRepository(BaseRepository[Favorite]):
+    """
+    Favorite repository answering "is favorited" for pages of posts.
+
+    Ids of posts favorited by recently active users are kept in an IdSetCache,
+    so hearts of a page cost no query once the user's set is loaded. Without
+    the cache, or for users with more favorites than it keeps, a page costs
+    one query on the primary key. Favorites are read from primary, so a user
+    sees their own changes and replica lag is never cached. Sets changed by
+    other workers are dropped by ``favorite_set_refresher`` of the favorites
+    router, which reads ``favorite_changes``.
+    """
+
+    def __init__(self, favorite_sets: Optional[IdSetCache] = None):
+        super().__init__(Favorite)
+        self.favorite_sets = favorite_sets
+
+    async def favorited(
+        self, session: AsyncSession, user_id: int, post_ids: Iterable[int]
+    ) -> set[int]:
+        """Returns ids among post_ids of posts favorited by user"""
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return set()
+        if self.favorite_sets is not None:
+            found = self.favorite_sets.contains(user_id, post_ids)
+            if found is not None:
+                return found
+        # Sets marked oversized are answered by the batched query alone
+        if self.favorite_sets is not None and not self.favorite_sets.oversized(user_id):
+            generation = self.favorite_sets.generation
+            limit = self.favorite_sets.max_ids + 1
+            ids = await self._scalars(
+                session,
+                self._statement(
+                    ("favorite_set",),
+                    lambda: select(Favorite.post_id)
+                    .where(Favorite.user_id == bindparam("user_id"))
+                    .limit(bindparam("limit")),
+                ),
+                {"user_id": user_id, "limit": limit},
+            )
+            if self.favorite_sets.set(user_id, ids, generation) or len(ids) < limit:
+                return set(ids).intersection(post_ids)
+        return set(
+            await self._scalars(
+                session,
+                self._statement(
+                    ("favorited",),
+                    lambda: select(Favorite.post_id).where(
+                        Favorite.user_id == bindparam("user_id"),
+                        Favorite.post_id.in_(bindparam("post_ids", expanding=True)),
+                    ),
+                ),
+                {"user_id": user_id, "post_ids": post_ids},
+            )
+        )
+
+    async def add(self, session: AsyncSession, user_id: int, post_id: int) -> bool:
+        """
+        Adds post to favorites of user, cached set is updated on commit
+
+        :return: Whether post was not favorited before.
+        """
+        query = self._statement(
+            ("add",),
+            lambda: insert(Favorite)
+            .values(user_id=bindparam("user_id"), post_id=bindparam("post_id"))
+            .on_conflict_do_nothing()
+            .returning(Favorite.post_id),
+        )
+        return await self._change(session, query, user_id, post_id, added=True)
+
+    async def remove(self, session: AsyncSession, user_id: int, post_id: int) -> bool:
+        """
+        Removes post from favorites of user, cached set is updated on commit
+
+        :return: Whether post was favorited before.
+        """
+        query = self._statement(
+            ("remove",),
+            lambda: delete(Favorite)
+            .where(
+                Favorite.user_id == bindparam("user_id"),
+                Favorite.post_id == bindparam("post_id"),
+            )
+            .returning(Favorite.post_id),
+        )
+        return await self._change(session, query, user_id, post_id, added=False)
+
+    async def _change(
+        self, session: AsyncSession, query, user_id: int, post_id: int, added: bool
+    ) -> bool:
+        """Executes add or remove and remembers it until commit"""
+        result = await session.execute(query, {"user_id": user_id, "post_id": post_id})
+        changed = result.scalar() is not None
+        if changed:
+            # Triggers update favorite_count and updated_at of the post
+            invalidate_rows(session.sync_session, Post, "id", [post_id])
+        if changed and self.favorite_sets is not None:
+            pending = session.sync_session.info.setdefault(_PENDING_KEY, [])
+            pending.append((self.favorite_sets, user_id, post_id, added))
+        return changed
+
+    async def changes_since(
+        self, session: AsyncSession, last_id: int
+    ) -> list[tuple[int, int]]:
+        """Returns (id, user_id) of favorite changes logged after id"""
+        query = self._statement(
+            ("changes_since",),
+            lambda: select(FavoriteChange.id, FavoriteChange.user_id)
+            .where(FavoriteChange.id > bindparam("last_id"))
+            .order_by(FavoriteChange.id),
+        )
+        return [tuple(row) for row in await session.execute(query, {"last_id": last_id})]
+
+    async def prune_changes(self, session: AsyncSession, before: datetime) -> int:
+        """Deletes favorite changes logged before time and returns their number"""
+        query = self._statement(
+            ("prune_changes",),
+            lambda: delete(FavoriteChange).where(
+                FavoriteChange.created_at < bindparam("before")
+            ),
+        )
+        result = await session.execute(query, {"before": before})
+        return result.rowcount
+
+    async def last_change(self, session: AsyncSession) -> int:
+        """Returns id of the newest favorite change or 0"""
+        query = self._statement(
+            ("last_change",), lambda: select(func.max(FavoriteChange.id))
+        )
+        return await session.scalar(query) or 0
+
+    @staticmethod
+    async def _scalars(session: AsyncSession, query, params: dict) -> list[int]:
+        """Returns first column of rows read from primary"""
+        return list((await session.scalars(query, params)).all())
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    """Applies committed favorite changes to cached sets"""
+    for favorite_sets, user_id, post_id, added in session.info.pop(_PENDING_KEY, []):
+        if added:
+            favorite_sets.add(user_id, post_id)
+        else:
+            favorite_sets.discard(user_id, post_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:  # pylint: disable=W0613
+    """Drops favorite changes of rolled back transaction"""
+    session.info.pop(_PENDING_KEY, None)
+
+
+favorite_repository = FavoriteRepository(
+    IdSetCache(
+        "favorites",
+        maxsize=config.cache.favorite_set_cache_size,
+        ttl=config.cache.favorite_set_ttl,
+        max_ids=config.cache.favorite_set_max_ids,
+    )
+    if config.cache.favorite_set_cache_size
+    else None
+)
+
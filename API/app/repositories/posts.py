@@ -0,0 +1,169 @@
+"""Post repository"""
+
+from collections import Counter
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy import Select
+from sqlalchemy import bindparam
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.archive import PostArchive
+from API.app.models.posts import CATEGORY_BITS
+from API.app.models.posts import HandicraftCategory
+from API.app.models.posts import Post
+from API.app.models.posts import Review
+from API.app.models.posts import in_stock
+from API.app.models.users import Favorite
+from API.core.cache.entity import EntityCache
+from API.core.config import config
+from API.core.database.routing import REPLICA
+from API.core.repository.base import BaseRepository
+from API.core.repository.cursor import decode_cursor
+from API.core.repository.cursor import encode_cursor
+from API.core.repository.loading import LoadPlan
+from API.core.repository.loading import load_options
+
+
+class PostRepository(BaseRepository[Post]):
+    """Post repository with cached lookups by id and archive of sold posts"""
+
+    def __init__(self):
+        super().__init__(
+            Post,
+            cache=EntityCache(
+                Post,
+                fields=("id",),
+                maxsize=config.cache.entity_cache_size,
+                ttl=config.cache.entity_cache_ttl,
+            ),
+            archive=PostArchive,
+        )
+        # Aggregates and updated_at of posts are written by triggers
+        self.cache.invalidated_by(Review, "post_id")
+        self.cache.invalidated_by(Favorite, "post_id")
+
+    async def search(
+        self,
+        session: AsyncSession,
+        text: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        load: Optional[LoadPlan] = None,
+    ) -> tuple[list[Post], Optional[str]]:
+        """
+        Returns posts matching web search query ordered by rank.
+
+        The query is parsed with both Ukrainian and English configurations and
+        matched against GIN indexed ``search_vector``. Pages are keyset
+        paginated by (rank, id).
+
+        :return: Page of posts and cursor of next page or None.
+        """
+        ts_query = func.websearch_to_tsquery(
+            config.search.ukrainian_config, text
+        ).op("||")(func.websearch_to_tsquery(config.search.english_config, text))
+        rank = func.ts_rank_cd(Post.search_vector, ts_query)
+        query = (
+            select(Post, rank)
+            .options(*load_options(Post, load))
+            .where(Post.search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), Post.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.where(tuple_(rank, Post.id) < decode_cursor(cursor, 2))
+        rows = (await session.execute(query, bind_arguments=REPLICA)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor((rows[-1][1], rows[-1][0].id))
+        return [row[0] for row in rows], next_cursor
+
+    async def in_stock_by_ids(
+        self,
+        session: AsyncSession,
+        ids: list[int],
+        load: Optional[LoadPlan] = None,
+    ) -> list[Post]:
+        """Returns posts in stock of ids in order of ids"""
+        if not ids:
+            return []
+        query = self._statement(
+            ("in_stock_by_ids", self._plan_key(load)),
+            lambda: self.query(load=load).where(
+                Post.id.in_(bindparam("ids", expanding=True)),
+                in_stock(),
+            ),
+        )
+        posts = {post.id: post for post in await self.all(session, query, {"ids": ids})}
+        return [posts[id_] for id_ in ids if id_ in posts]
+
+    async def browse(
+        self,
+        session: AsyncSession,
+        any_of: Optional[list[HandicraftCategory]] = None,
+        all_of: Optional[list[HandicraftCategory]] = None,
+        order_: Optional[dict] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        load: Optional[LoadPlan] = None,
+    ) -> tuple[list[Post], Optional[str]]:
+        """
+        Returns page of posts in stock filtered by categories.
+
+        :param any_of: Post has at least one of categories (``&&``).
+        :param all_of: Post has every category (``@>``).
+        """
+        query = self._in_categories(self.query(order_, load), any_of, all_of)
+        return await self.get_page(session, order_, cursor, limit, query=query)
+
+    async def category_facets(
+        self,
+        session: AsyncSession,
+        any_of: Optional[list[HandicraftCategory]] = None,
+        all_of: Optional[list[HandicraftCategory]] = None,
+    ) -> dict[HandicraftCategory, int]:
+        """
+        Returns number of posts in stock per category for given filters.
+
+        Database groups posts by ``categories_mask``, which has only a few
+        distinct values, and bits of each mask are counted in process.
+        """
+        query = self._in_categories(
+            select(Post.categories_mask, func.count()).group_by(Post.categories_mask),
+            any_of,
+            all_of,
+        )
+        result = await session.execute(query, bind_arguments=REPLICA)
+        return facet_counts(result.tuples())
+
+    @staticmethod
+    def _in_categories(
+        query: Select,
+        any_of: Optional[list[HandicraftCategory]] = None,
+        all_of: Optional[list[HandicraftCategory]] = None,
+    ) -> Select:
+        """Returns query of posts in stock filtered by categories"""
+        query = query.where(in_stock())
+        if any_of:
+            query = query.where(Post.categories.overlap(any_of))
+        if all_of:
+            query = query.where(Post.categories.contains(all_of))
+        return query
+
+
+def facet_counts(mask_counts: Iterable[tuple[int, int]]) -> dict[HandicraftCategory, int]:
+    """Returns number of posts per category from (categories_mask, posts) pairs"""
+    counts = Counter()
+    for mask, posts in mask_counts:
+        for category, bit in CATEGORY_BITS.items():
+            if mask & bit:
+                counts[category] += posts
+    return {category: counts[category] for category in HandicraftCategory}
+
+
+post_repository = PostRepository()
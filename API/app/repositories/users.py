@@ -0,0 +1,98 @@
+"""User repository"""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from sqlalchemy import bindparam
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.users import RevokedToken
+from API.app.models.users import User
+from API.core.auth.tokens import Principal
+from API.core.auth.tokens import Revocation
+from API.core.cache.entity import EntityCache
+from API.core.config import config
+from API.core.repository.base import BaseRepository
+
+
+class UserRepository(BaseRepository[User]):
+    """User repository with cached lookups by id, google_id and email"""
+
+    def __init__(self):
+        super().__init__(
+            User,
+            cache=EntityCache(
+                User,
+                fields=("id", "google_id", "email"),
+                maxsize=config.cache.entity_cache_size,
+                ttl=config.cache.entity_cache_ttl,
+            ),
+        )
+
+
+class RevokedTokenRepository(BaseRepository[RevokedToken]):
+    """Revoked access tokens, read by RevocationList of every process"""
+
+    def __init__(self):
+        super().__init__(RevokedToken)
+
+    async def since(self, session: AsyncSession, last_id: int) -> list[Revocation]:
+        """Returns revocations after id which cover tokens not expired yet"""
+        query = self._statement(
+            ("since",),
+            lambda: select(RevokedToken)
+            .where(RevokedToken.id > bindparam("last_id"), RevokedToken.expires_at > func.now())
+            .order_by(RevokedToken.id),
+        )
+        return [
+            _revocation(row)
+            for row in await self.all(session, query, {"last_id": last_id}, replica=False)
+        ]
+
+    async def revoke_token(self, session: AsyncSession, principal: Principal) -> Revocation:
+        """Revokes token of principal"""
+        return await self._revoke(
+            session,
+            token_id=principal.token_id,
+            expires_at=datetime.fromtimestamp(principal.expires_at, timezone.utc),
+        )
+
+    async def revoke_user(
+        self, session: AsyncSession, user_id: int, token_ttl: int
+    ) -> Revocation:
+        """Revokes all tokens of user issued until now"""
+        now = datetime.now(timezone.utc)
+        return await self._revoke(
+            session,
+            user_id=user_id,
+            issued_until=now,
+            expires_at=now + timedelta(seconds=token_ttl),
+        )
+
+    async def _revoke(self, session: AsyncSession, **values) -> Revocation:
+        """Stores revocation and deletes ones of expired tokens"""
+        await session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+        )
+        row = await session.scalar(insert(RevokedToken).values(**values).returning(RevokedToken))
+        return _revocation(row)
+
+
+def _revocation(row: RevokedToken) -> Revocation:
+    """Returns revocation of row"""
+    return Revocation(
+        id=row.id,
+        expires_at=row.expires_at.timestamp(),
+        token_id=row.token_id,
+        user_id=row.user_id,
+        issued_until=int(row.issued_until.timestamp()) if row.issued_until else None,
+    )
+
+
+user_repository = UserRepository()
+revoked_token_repository = RevokedTokenRepository()
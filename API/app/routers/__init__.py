@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from . import auth
+from . import favorites
+from . import images
+from . import posts
+
+router = APIRouter()
+router.include_router(posts.router)
+router.include_router(images.router)
+router.include_router(favorites.router)
+router.include_router(auth.router)
@@ -0,0 +1,43 @@
+"""Authentication endpoints"""
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.auth import get_current_user
+from API.app.auth import get_principal
+from API.app.auth import revoke_token
+from API.app.auth import revoke_user_tokens
+from API.app.models.users import User
+from API.app.schemas.users import UserResponse
+from API.core.auth.tokens import Principal
+from API.core.database.session import get_session
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.get("/me", response_model=UserResponse)
+async def me(user: User = Depends(get_current_user)):
+    """User of token of request"""
+    return UserResponse.model_validate(user)
+
+
+@router.post("/logout", status_code=204)
+async def logout(
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    """Revokes token of request"""
+    await revoke_token(session, principal)
+    return Response(status_code=204)
+
+
+@router.post("/logout-all", status_code=204)
+async def logout_all(
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    """Revokes all tokens of user issued until now"""
+    await revoke_user_tokens(session, principal.user_id)
+    return Response(status_code=204)
@@ -0,0 +1,20 @@
+"""Development endpoints"""
+
+from fastapi import APIRouter
+from fastapi import Query
+
+from API.core.config import config
+from API.core.database.session import slow_query_log
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/slow-queries")
+async def slow_queries(
+    limit: int = Query(config.profiling.top_queries, ge=1, le=1000),
+):
+    """Slowest SQL statement shapes seen by this process"""
+    return {
+        "threshold_ms": config.profiling.slow_query_ms,
+        "queries": slow_query_log.top(limit),
+    }
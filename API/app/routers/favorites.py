@@ -0,0 +1,88 @@
+"""Favorite endpoints"""
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi import Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.auth import get_principal
+from API.app.repositories.favorites import favorite_repository
+from API.core.auth.tokens import Principal
+from API.core.cache.idset import IdSetRefresher
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import get_session
+from API.core.exceptions.base import NotFoundException
+from API.core.serialization import SerializedJSONResponse
+
+router = APIRouter(prefix="/users/me/favorites", tags=["favorites"])
+
+
+async def _load_changes(last_id: int) -> list[tuple[int, int]]:
+    """Returns (id, user_id) of favorite changes logged after id"""
+    async with Session() as session:
+        return await favorite_repository.changes_since(session, last_id)
+
+
+async def _last_change() -> int:
+    """Returns id of the newest favorite change"""
+    async with Session() as session:
+        return await favorite_repository.last_change(session)
+
+
+favorite_set_refresher = (
+    IdSetRefresher(
+        favorite_repository.favorite_sets,
+        _load_changes,
+        _last_change,
+        refresh_interval=config.cache.favorite_set_refresh,
+    )
+    if favorite_repository.favorite_sets is not None
+    else None
+)
+
+
+@router.get("", response_model=list[int])
+async def favorited(
+    post_ids: list[int] = Query(..., max_length=100),
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Ids among post_ids of posts favorited by user
+
+    Listing pages are shared by all users, so hearts of a page are asked for
+    with one call carrying ids of its posts.
+    """
+    return SerializedJSONResponse(
+        sorted(await favorite_repository.favorited(session, principal.user_id, post_ids))
+    )
+
+
+@router.put("/{post_id}", status_code=204)
+async def add_favorite(
+    post_id: int,
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    """Adds post to favorites of user"""
+    try:
+        await favorite_repository.add(session, principal.user_id, post_id)
+        await session.commit()
+    except IntegrityError as exc:
+        raise NotFoundException("Post not found") from exc
+    return Response(status_code=204)
+
+
+@router.delete("/{post_id}", status_code=204)
+async def remove_favorite(
+    post_id: int,
+    principal: Principal = Depends(get_principal),
+    session: AsyncSession = Depends(get_session),
+):
+    """Removes post from favorites of user"""
+    await favorite_repository.remove(session, principal.user_id, post_id)
+    await session.commit()
+    return Response(status_code=204)
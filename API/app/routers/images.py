@@ -0,0 +1,74 @@
+"""Image endpoints"""
+
+import os
+
+import anyio
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Request
+
+from API.app.auth import get_principal
+from API.app.schemas.images import ImageResponse
+from API.core.config import config
+from API.core.exceptions.base import BadRequestException
+from API.core.exceptions.base import NotFoundException
+from API.core.exceptions.base import PayloadTooLargeException
+from API.core.media.images import image_store
+from API.core.media.images import image_variants
+from API.core.media.render import FORMAT
+from API.core.media.responses import PathSendFileResponse
+
+router = APIRouter(prefix="/images", tags=["images"])
+media_router = APIRouter(prefix="/media", include_in_schema=False)
+
+
+@router.post(
+    "", response_model=ImageResponse, status_code=201, dependencies=[Depends(get_principal)]
+)
+async def upload_image(request: Request):
+    """
+    Stores image sent as request body with an ``image/*`` content type.
+
+    Only signed-in users may upload. Returns ``image_url`` to save as post
+    image or avatar and URLs of its resized variants. Uploading the same
+    image again returns the same URLs.
+    """
+    if not request.headers.get("content-type", "").startswith("image/"):
+        raise BadRequestException("Content-Type must be an image type")
+    limit = config.media.max_image_upload
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise PayloadTooLargeException(f"Image is larger than {limit} bytes")
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > limit:
+            raise PayloadTooLargeException(f"Image is larger than {limit} bytes")
+    if not data:
+        raise BadRequestException("Image is empty")
+    digest = await image_store.ingest(bytes(data))
+    image_url = image_store.url(digest)
+    return ImageResponse(image_url=image_url, variants=image_variants(image_url))
+
+
+@media_router.get("/images/{digest}/{variant}")
+async def image_variant(digest: str, variant: str):
+    """
+    Variant file of uploaded image.
+
+    Paths never change content, so clients and proxies may keep them forever.
+    Servers supporting the ASGI pathsend extension send the file without
+    copying it through the app.
+    """
+    path = image_store.path(digest, variant)
+    if path is None:
+        raise NotFoundException("Image not found")
+    try:
+        stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    except FileNotFoundError as exc:
+        raise NotFoundException("Image not found") from exc
+    return PathSendFileResponse(
+        path,
+        stat_result=stat_result,
+        media_type=f"image/{FORMAT}",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -0,0 +1,16 @@
+"""Prometheus metrics endpoint"""
+
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from API.core.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Metrics of this process in Prometheus text format"""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
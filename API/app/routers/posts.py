@@ -0,0 +1,218 @@
+"""Post endpoints"""
+
+from functools import partial
+from typing import AsyncIterator
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app.models.posts import HandicraftCategory
+from API.app.repositories.posts import post_repository
+from API.app.schemas.posts import ExportFormat
+from API.app.schemas.posts import PostPage
+from API.app.schemas.posts import PostResponse
+from API.app.schemas.posts import PostSort
+from API.core.cache.response import CachedResponse
+from API.core.cache.response import ResponseCache
+from API.core.cache.topk import TopKFile
+from API.core.config import config
+from API.core.database.session import Session
+from API.core.database.session import get_session
+from API.core.exceptions.base import NotFoundException
+from API.core.serialization import SerializedJSONResponse
+from API.core.streaming import csv_chunks
+from API.core.streaming import gzip_chunks
+from API.core.streaming import ndjson_chunks
+
+router = APIRouter(prefix="/posts", tags=["posts"])
+# Concurrent identical reads share one database call and its serialized result
+post_responses = ResponseCache(
+    "posts",
+    maxsize=config.cache.response_cache_size,
+    ttl=config.cache.response_cache_ttl,
+    max_body_size=config.cache.response_cache_max_body,
+    timeout=config.cache.singleflight_timeout,
+)
+# Built by API.app.jobs.similar_posts
+similar_posts = TopKFile(config.recommendations.similar_posts_path)
+
+
+@router.get("", response_model=PostPage)
+async def browse_posts(
+    request: Request,
+    any_: Optional[list[HandicraftCategory]] = Query(None, alias="any"),
+    all_: Optional[list[HandicraftCategory]] = Query(None, alias="all"),
+    sort: PostSort = PostSort.NEW,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Posts in stock filtered by any of or all of categories"""
+    any_, all_ = _categories(any_), _categories(all_)
+    return await post_responses.respond(
+        request,
+        ("browse", any_, all_, sort, cursor, limit),
+        partial(_browse, any_, all_, sort, cursor, limit),
+    )
+
+
+@router.get("/facets", response_model=dict[HandicraftCategory, int])
+async def category_facets(
+    request: Request,
+    any_: Optional[list[HandicraftCategory]] = Query(None, alias="any"),
+    all_: Optional[list[HandicraftCategory]] = Query(None, alias="all"),
+):
+    """Number of posts in stock per category"""
+    any_, all_ = _categories(any_), _categories(all_)
+    return await post_responses.respond(
+        request, ("facets", any_, all_), partial(_category_facets, any_, all_)
+    )
+
+
+@router.get("/search", response_model=PostPage)
+async def search_posts(
+    q: str = Query(min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+):
+    """Full-text search over post titles and content"""
+    posts, next_cursor = await post_repository.search(session, q, cursor, limit)
+    # Model straight to bytes, skipping FastAPI's response_model encoding
+    return SerializedJSONResponse(PostPage(items=posts, next_cursor=next_cursor))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_posts(
+    format_: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    gzip: bool = False,
+    include_archived: bool = False,
+):
+    """All posts as NDJSON or CSV, streamed from a server-side cursor"""
+    posts = _exported_posts(include_archived)
+    if format_ is ExportFormat.CSV:
+        body = csv_chunks(posts, list(PostResponse.model_fields))
+    else:
+        body = ndjson_chunks(posts)
+    filename = f"posts.{format_.value}"
+    media_type = format_.media_type
+    if gzip:
+        # A gzip file to save, not Content-Encoding which clients undo
+        body = gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+async def _exported_posts(include_archived: bool) -> AsyncIterator[PostResponse]:
+    """
+    Yields all posts ordered by id, archived ones after the others
+
+    The response is sent after dependencies are closed, so the stream opens
+    its own session, held until the last row is sent.
+    """
+    async with Session() as session:
+        async for post in post_repository.stream(
+            session,
+            yield_per=config.db.stream_yield_per,
+            include_archived=include_archived,
+        ):
+            yield PostResponse.model_validate(post)
+
+
+@router.get("/{post_id}", response_model=PostResponse)
+async def get_post(request: Request, post_id: int):
+    """Post by id"""
+    return await post_responses.respond(
+        request, ("post", post_id), partial(_get_post, post_id)
+    )
+
+
+@router.get("/{post_id}/similar", response_model=list[PostResponse])
+async def get_similar_posts(
+    request: Request,
+    post_id: int,
+    limit: int = Query(10, ge=1, le=config.recommendations.similar_posts_k),
+):
+    """
+    Posts in stock similar to post, most similar first
+
+    Similar posts are precomputed from co-favorites and categories and may be
+    up to a build behind; posts no longer in stock are skipped.
+    """
+    return await post_responses.respond(
+        request, ("similar", post_id, limit), partial(_similar_posts, post_id, limit)
+    )
+
+
+def _categories(
+    categories: Optional[list[HandicraftCategory]],
+) -> tuple[HandicraftCategory, ...]:
+    """Returns categories in canonical order, so equal filters share a read"""
+    return tuple(sorted(set(categories or ()), key=lambda category: category.value))
+
+
+# Reads shared by post_responses open their own session, as the request which
+# started a read may finish or be cancelled before the others get its result.
+
+
+async def _browse(
+    any_: tuple[HandicraftCategory, ...],
+    all_: tuple[HandicraftCategory, ...],
+    sort: PostSort,
+    cursor: Optional[str],
+    limit: int,
+) -> CachedResponse:
+    """Returns page of posts in stock"""
+    async with Session() as session:
+        posts, next_cursor = await post_repository.browse(
+            session, list(any_), list(all_), sort.order, cursor, limit
+        )
+    page = PostPage(items=posts, next_cursor=next_cursor)
+    return CachedResponse.json(
+        page,
+        version=(tuple((post.id, post.updated_at) for post in page.items), next_cursor),
+    )
+
+
+async def _category_facets(
+    any_: tuple[HandicraftCategory, ...],
+    all_: tuple[HandicraftCategory, ...],
+) -> CachedResponse:
+    """Returns number of posts in stock per category"""
+    async with Session() as session:
+        facets = await post_repository.category_facets(session, list(any_), list(all_))
+    return CachedResponse.json(facets)
+
+
+async def _get_post(post_id: int) -> CachedResponse:
+    """Returns post by id, sold posts stay available once archived"""
+    async with Session() as session:
+        post = await post_repository.get_by(
+            session, "id", post_id, unique=True, include_archived=True
+        )
+    if post is None:
+        raise NotFoundException("Post not found")
+    post = PostResponse.model_validate(post)
+    return CachedResponse.json(
+        post, version=(post.id, post.updated_at), last_modified=post.updated_at
+    )
+
+
+async def _similar_posts(post_id: int, limit: int) -> CachedResponse:
+    """Returns posts in stock similar to post"""
+    ids = similar_posts.get(post_id)
+    posts = []
+    if ids:
+        async with Session() as session:
+            posts = await post_repository.in_stock_by_ids(session, ids)
+    posts = [PostResponse.model_validate(post) for post in posts[:limit]]
+    return CachedResponse.json(
+        posts,
+        version=tuple((post.id, post.updated_at) for post in posts),
+    )
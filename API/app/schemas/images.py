@@ -0,0 +1,10 @@
+"""Image schemas"""
+
+from pydantic import BaseModel
+
+
+class ImageResponse(BaseModel):
+    """Uploaded image, ``image_url`` is stored in posts and avatars"""
+
+    image_url: str
+    variants: dict[str, str]
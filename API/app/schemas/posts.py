@@ -0,0 +1,77 @@
+"""Post schemas"""
+
+import enum
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import computed_field
+
+from API.app.models.posts import HandicraftCategory
+from API.app.models.posts import PostStatus
+from API.core.media.images import image_variants
+
+
+class PostSort(str, enum.Enum):
+    """Sort order of post listings"""
+
+    NEW = "new"
+    RATING = "rating"
+    POPULAR = "popular"
+
+    @property
+    def order(self) -> dict:
+        """Returns repository order for sort"""
+        return {
+            PostSort.NEW: {"asc": [], "desc": []},
+            PostSort.RATING: {"asc": [], "desc": ["rating_avg"]},
+            PostSort.POPULAR: {"asc": [], "desc": ["favorite_count"]},
+        }[self]
+
+
+class ExportFormat(str, enum.Enum):
+    """Format of post export"""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """Returns media type of format"""
+        return {
+            ExportFormat.NDJSON: "application/x-ndjson",
+            ExportFormat.CSV: "text/csv; charset=utf-8",
+        }[self]
+
+
+class PostResponse(BaseModel):
+    """Post returned by API"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: str
+    content: str
+    image_url: Optional[str] = None
+    categories: Optional[list[HandicraftCategory]] = None
+    status: Optional[PostStatus] = None
+    review_count: int = 0
+    rating_avg: float = 0
+    favorite_count: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[dict[str, str]]:
+        """URLs of resized variants of uploaded image by size, e.g. ``small`` for feeds"""
+        return image_variants(self.image_url)
+
+
+class PostPage(BaseModel):
+    """Page of posts with cursor of next page"""
+
+    items: list[PostResponse]
+    next_cursor: Optional[str] = None
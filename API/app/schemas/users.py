@@ -0,0 +1,20 @@
+"""User schemas"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+
+
+class UserResponse(BaseModel):
+    """User returned to themselves"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    phone_number: str
+    name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,72 @@
+"""
+Benchmark of row-by-row inserts against create_many and COPY.
+
+Every case runs in a transaction which is rolled back afterwards.
+Needs the database from .env.
+
+Run from the repository root: python -m API.benchmarks.bulk_insert
+"""
+
+import asyncio
+from time import perf_counter
+
+from sqlalchemy import text
+
+from API.app import models  # pylint: disable=W0611
+from API.app.models.posts import Post
+from API.core.database.base import Base
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+
+
+def post_rows(user_id: int, count: int) -> list[dict]:
+    """Returns generated post rows"""
+    return [
+        {"user_id": user_id, "title": f"Post {i}", "content": "Benchmark post"}
+        for i in range(count)
+    ]
+
+
+async def row_by_row(session, rows: list[dict]) -> None:
+    """Adds rows one by one with flush in between as seeding used to do"""
+    repository = BaseRepository(Post)
+    for row in rows:
+        await repository.create(session, row)
+        await session.flush()
+
+
+async def multi_row(session, rows: list[dict]) -> None:
+    """Inserts rows with multi-row INSERT"""
+    await BaseRepository(Post, copy_threshold=len(rows) + 1).create_many(session, rows)
+
+
+async def copy(session, rows: list[dict]) -> None:
+    """Inserts rows with binary COPY"""
+    await BaseRepository(Post, copy_threshold=1).create_many(session, rows)
+
+
+async def main() -> None:
+    """Runs benchmark"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    cases = ((row_by_row, 2_000), (multi_row, 50_000), (copy, 200_000))
+    for case, count in cases:
+        async with Session() as session:
+            user_id = await session.scalar(
+                text(
+                    "INSERT INTO users (google_id, phone_number, email) "
+                    "VALUES ('bulk', 'bulk', 'bulk@example.com') RETURNING id"
+                )
+            )
+            rows = post_rows(user_id, count)
+            start = perf_counter()
+            await case(session, rows)
+            elapsed = perf_counter() - start
+            await session.rollback()
+        print(f"{case.__name__:>10}: {count / elapsed:12,.0f} rows/s ({count} rows)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
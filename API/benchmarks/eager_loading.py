@@ -0,0 +1,81 @@
+"""
+Benchmark of a 100 post listing with authors and reviews.
+
+Seeds 100 posts with 3 reviews each inside a transaction which is rolled
+back afterwards and times listing them through BaseRepository with a load
+plan. The number of statements is checked by
+``API/tests/test_eager_loading.py``. Needs the database from .env.
+
+Run from the repository root: python -m API.benchmarks.eager_loading
+"""
+
+import asyncio
+from statistics import median
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.app import models  # pylint: disable=W0611
+from API.app.models.posts import Post
+from API.app.models.posts import Review
+from API.app.models.users import User
+from API.core.database.base import Base
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+
+POSTS = 100
+REPEAT = 20
+PLAN = {"user": "joined", "reviews": "selectin"}
+
+
+async def seed(session: AsyncSession, posts: int) -> list[int]:
+    """Creates posts with 3 reviews each in the session's transaction and returns their ids"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    user_ids = await BaseRepository(User).create_many(
+        session,
+        [
+            {"google_id": f"loading_{i}", "phone_number": f"loading_{i}",
+             "email": f"loading_{i}@example.com"}
+            for i in range(10)
+        ],
+    )
+    post_ids = await BaseRepository(Post).create_many(
+        session,
+        [
+            {"user_id": user_ids[i % 10], "title": f"Post {i}", "content": "Post"}
+            for i in range(posts)
+        ],
+    )
+    await BaseRepository(Review).create_many(
+        session,
+        [
+            {"user_id": user_ids[i % 10], "post_id": post_id, "rating": 5}
+            for post_id in post_ids
+            for i in range(3)
+        ],
+    )
+    return post_ids
+
+
+async def main() -> None:
+    """Runs the benchmark"""
+    async with Session() as session:
+        post_ids = await seed(session, POSTS)
+        repository = BaseRepository(Post)
+        query = repository.query(load=PLAN).where(Post.id.in_(post_ids))
+        timings = []
+        for _ in range(REPEAT):
+            started = perf_counter()
+            posts = await repository.all(session, query)
+            _ = [(post.user.name, [r.rating for r in post.reviews]) for post in posts]
+            timings.append(perf_counter() - started)
+            session.expunge_all()
+        print(f"{POSTS} posts with authors and reviews: {median(timings) * 1000:.2f} ms median")
+        await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+Memory check of the streaming post export.
+
+Inserts ``--rows`` posts with COPY, downloads /api/posts/export through the
+ASGI app and samples RSS of the process while the body is received. Fails
+when RSS grows by more than ``--ceiling-mb`` over the value before export.
+Inserted rows are deleted afterwards. Needs the database from .env.
+That rows are pulled lazily in bounded chunks is checked without a database
+by ``API/tests/test_streaming.py``.
+
+Run from the repository root: python -m API.benchmarks.export --rows 1000000
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+from time import perf_counter
+
+from sqlalchemy import text
+
+from API.app.models.posts import Post
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+from API.server.app import app
+
+BATCH = 100_000
+
+
+def rss_mb() -> float:
+    """Returns resident set size of process"""
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def seed(rows: int) -> int:
+    """Inserts posts of a new user and returns its id"""
+    repository = BaseRepository(Post, copy_threshold=1)
+    async with Session() as session:
+        user_id = await session.scalar(
+            text(
+                "INSERT INTO users (google_id, phone_number, email) "
+                "VALUES ('export', 'export', 'export@example.com') RETURNING id"
+            )
+        )
+        for start in range(0, rows, BATCH):
+            await repository.create_many(
+                session,
+                [
+                    {"user_id": user_id, "title": f"Post {i}", "content": "Export post"}
+                    for i in range(start, min(start + BATCH, rows))
+                ],
+            )
+        await session.commit()
+    return user_id
+
+
+async def cleanup(user_id: int) -> None:
+    """Deletes inserted posts and their user"""
+    async with Session() as session:
+        await session.execute(
+            text("DELETE FROM posts WHERE user_id = :user_id"), {"user_id": user_id}
+        )
+        await session.execute(
+            text("DELETE FROM users WHERE id = :user_id"), {"user_id": user_id}
+        )
+        await session.commit()
+
+
+async def download(query_string: bytes) -> tuple[int, float]:
+    """Receives export through the app, returns body size and peak RSS"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/posts/export",
+        "raw_path": b"/api/posts/export",
+        "query_string": query_string,
+        "headers": [],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    size = 0
+    peak = rss_mb()
+    chunks = 0
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Client never disconnects
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size, peak, chunks
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            chunks += 1
+            if chunks % 16 == 0:
+                peak = max(peak, rss_mb())
+
+    await app(scope, receive, send)
+    return size, max(peak, rss_mb())
+
+
+async def main() -> None:
+    """Runs check"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--ceiling-mb", type=float, default=64.0)
+    parser.add_argument("--query", default="format=ndjson&gzip=true")
+    args = parser.parse_args()
+
+    user_id = await seed(args.rows)
+    try:
+        gc.collect()
+        baseline = rss_mb()
+        start = perf_counter()
+        size, peak = await download(args.query.encode())
+        elapsed = perf_counter() - start
+    finally:
+        await cleanup(user_id)
+        await engine.dispose()
+    growth = peak - baseline
+    print(
+        f"{args.rows} rows, {size / 2**20:.1f} MiB in {elapsed:.1f} s, "
+        f"RSS {baseline:.1f} -> {peak:.1f} MiB (+{growth:.1f}, "
+        f"ceiling {args.ceiling_mb:.0f})"
+    )
+    if growth > args.ceiling_mb:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Benchmark of the process time middleware.
+
+Compares the old buffering ``add_process_time_header`` middleware with
+ProcessTimeMiddleware on 1 KB, 1 MB and 50 MB responses. Every case runs
+in its own subprocess, so peak RSS is not shared between cases.
+
+Run from the repository root: python -m API.benchmarks.middleware
+"""
+
+import asyncio
+import logging
+import resource
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+from time import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+from API.core.middlewares.process_time import ProcessTimeMiddleware
+
+SIZES = {"1KB": 1024, "1MB": 1024**2, "50MB": 50 * 1024**2}
+CHUNK_SIZE = 64 * 1024
+
+
+def build_app(middleware: str, size: int) -> Starlette:
+    """Builds app which streams ``size`` bytes wrapped into given middleware"""
+
+    async def payload(request: Request):  # pylint: disable=W0613
+        async def body():
+            chunk = b"x" * CHUNK_SIZE
+            for offset in range(0, size, CHUNK_SIZE):
+                yield chunk[: size - offset]
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    app = Starlette(routes=[Route("/", payload)])
+    if middleware == "legacy":
+
+        @app.middleware("http")
+        async def add_process_time_header(request: Request, call_next):
+            start_time = time()
+            response = await call_next(request)
+            response_body = b""
+            async for chunk in response.body_iterator:
+                response_body += chunk
+            logging.log(20, "Response body: %s", response_body.decode("utf-8"))
+            new_response = Response(
+                content=response_body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+            )
+            new_response.headers["X-Process-Time"] = str(time() - start_time)
+            return new_response
+
+    else:
+        app.add_middleware(ProcessTimeMiddleware)
+    return app
+
+
+async def request(app: Starlette) -> int:
+    """Sends one GET request directly through ASGI and returns body size"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8080),
+    }
+    received = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+def run_case(middleware: str, size_name: str, repeat: int) -> None:
+    """Runs one benchmark case and prints the result"""
+    app = build_app(middleware, SIZES[size_name])
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        asyncio.run(request(app))
+        timings.append(perf_counter() - start)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{middleware:>8} {size_name:>5} "
+        f"median {median(timings) * 1000:10.2f} ms  peak RSS {peak_rss_mb:8.1f} MB"
+    )
+
+
+def main() -> None:
+    """Runs every case in a separate interpreter"""
+    for size_name in SIZES:
+        repeat = 3 if size_name == "50MB" else 50
+        for middleware in ("legacy", "asgi"):
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "API.benchmarks.middleware",
+                    middleware,
+                    size_name,
+                    str(repeat),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4:
+        run_case(sys.argv[1], sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
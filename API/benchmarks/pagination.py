@@ -0,0 +1,109 @@
+"""
+Benchmark of offset pagination against keyset pagination.
+
+Seeds ``posts`` up to the required amount of rows and compares
+``get_all(skip=...)`` with ``get_page(cursor=...)`` on page 1 and page 10,000.
+Needs the database from .env.
+
+Run from the repository root: python -m API.benchmarks.pagination
+"""
+
+import asyncio
+from statistics import median
+from time import perf_counter
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import text
+
+from API.app import models  # pylint: disable=W0611
+from API.app.models.posts import Post
+from API.core.database.base import Base
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+from API.core.repository.cursor import encode_cursor
+
+PAGE_SIZE = 20
+PAGES = (1, 10_000)
+REPEAT = 20
+ORDER = {"asc": ["user_id"], "desc": []}
+
+
+async def seed(rows: int) -> None:
+    """Inserts generated posts until table has ``rows`` rows"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with Session() as session:
+        existing = await session.scalar(select(func.count()).select_from(Post))
+        if existing >= rows:
+            return
+        user_id = await session.scalar(text("SELECT min(id) FROM users"))
+        if user_id is None:
+            user_id = await session.scalar(
+                text(
+                    "INSERT INTO users (google_id, phone_number, email, created_at, "
+                    "updated_at) VALUES ('bench', 'bench', 'bench@example.com', "
+                    "now(), now()) RETURNING id"
+                )
+            )
+        await session.execute(
+            text(
+                "INSERT INTO posts (user_id, title, content) "
+                "SELECT :user_id, 'Post ' || n, 'Benchmark post' "
+                "FROM generate_series(1, :rows) AS n"
+            ),
+            {"user_id": user_id, "rows": rows - existing},
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE posts"))
+
+
+async def timed(coro_factory) -> float:
+    """Returns median time of coroutine in milliseconds"""
+    timings = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        await coro_factory()
+        timings.append(perf_counter() - start)
+    return median(timings) * 1000
+
+
+async def main() -> None:
+    """Runs benchmark"""
+    await seed(max(PAGES) * PAGE_SIZE)
+    repository = BaseRepository(Post)
+    async with Session() as session:
+        for page in PAGES:
+            skip = (page - 1) * PAGE_SIZE
+            cursor = None
+            if skip:
+                previous = await session.execute(
+                    repository.query(ORDER)
+                    .order_by(Post.id)
+                    .offset(skip - 1)
+                    .limit(1)
+                )
+                previous = previous.scalars().one()
+                cursor = encode_cursor((previous.user_id, previous.id))
+
+            def offset_page(skip_=skip):
+                return session.execute(
+                    repository.query(ORDER).order_by(Post.id).offset(skip_).limit(PAGE_SIZE)
+                )
+
+            def keyset_page(cursor_=cursor):
+                return repository.get_page(
+                    session, order_=ORDER, cursor=cursor_, limit=PAGE_SIZE
+                )
+
+            offset_ms = await timed(offset_page)
+            keyset_ms = await timed(keyset_page)
+            print(
+                f"page {page:>6}: offset {offset_ms:8.2f} ms  keyset {keyset_ms:8.2f} ms"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Check of read replica routing.
+
+Prints state of replicas from DB_REPLICA_HOSTS and the server which answered
+repository reads before and after a write in the same session. Without
+replicas every read is answered by primary.
+
+Locally DB_REPLICA_HOSTS may point to a second Postgres instance streaming
+from primary, or to primary itself (e.g. DB_REPLICA_HOSTS=localhost:5432)
+to exercise routing with a single server.
+
+Run from the repository root: python -m API.benchmarks.replicas
+"""
+
+import asyncio
+
+from sqlalchemy import func
+from sqlalchemy import select
+
+from API.app.models.users import User
+from API.core.database.routing import REPLICA
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.database.session import replica_set
+from API.core.repository.base import BaseRepository
+
+SERVER = select(func.inet_server_port(), func.pg_is_in_recovery())
+
+
+async def server(session) -> str:
+    """Returns server which answers a replica read of session"""
+    port, in_recovery = (await session.execute(SERVER, bind_arguments=REPLICA)).one()
+    return f"port {port} ({'replica' if in_recovery else 'primary'})"
+
+
+async def main() -> None:
+    """Runs check"""
+    await replica_set.start()
+    for replica in replica_set.replicas:
+        print(f"{replica.name}: healthy={replica.healthy} lag={replica.lag}")
+    repository = BaseRepository(User)
+    async with Session() as session:
+        await repository.get_all(session, limit=1)
+        print("read before write:", await server(session))
+        await repository.create_many(
+            session,
+            [
+                {
+                    "google_id": "replica-check",
+                    "phone_number": "replica-check",
+                    "email": "replica-check@example.com",
+                }
+            ],
+        )
+        print("read after write: ", await server(session))
+        await session.rollback()
+    await replica_set.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
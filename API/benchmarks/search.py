@@ -0,0 +1,109 @@
+"""
+Benchmark of full-text post search against ILIKE.
+
+Seeds ``posts`` up to 1M generated rows with binary COPY and compares
+PostRepository.search with ILIKE over title and content.
+Needs the database from .env.
+
+Run from the repository root: python -m API.benchmarks.search
+"""
+
+import asyncio
+import random
+from statistics import median
+from time import perf_counter
+
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import text
+
+from API.app import models  # pylint: disable=W0611
+from API.app.models.posts import Post
+from API.app.models.users import User
+from API.app.repositories.posts import post_repository
+from API.core.database.base import Base
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+
+ROWS = 1_000_000
+BATCH = 100_000
+REPEAT = 10
+WORDS = (
+    "в'язана шапка светр шарф прикраси кераміка чашка свічка мило дерев'яна "
+    "ложка handmade knitted scarf ceramic mug wooden spoon candle soap necklace "
+    "leather wallet embroidery вишиванка сумка кошик лялька макраме"
+).split()
+QUERIES = ("кераміка чашка", "knitted scarf", "вишиванка", "leather wallet")
+
+
+def generated_posts(user_id: int, count: int) -> list[dict]:
+    """Returns posts with random titles and content"""
+    return [
+        {
+            "user_id": user_id,
+            "title": " ".join(random.choices(WORDS, k=4)),
+            "content": " ".join(random.choices(WORDS, k=30)),
+        }
+        for _ in range(count)
+    ]
+
+
+async def seed() -> None:
+    """Inserts generated posts until table has ROWS rows"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with Session() as session:
+        existing = await session.scalar(select(func.count()).select_from(Post))
+        user_id = await session.scalar(select(func.min(User.id)))
+        if user_id is None:
+            (user_id,) = await BaseRepository(User).create_many(
+                session,
+                [{"google_id": "search", "phone_number": "search", "email": "search@example.com"}],
+            )
+        repository = BaseRepository(Post, copy_threshold=1)
+        while existing < ROWS:
+            count = min(BATCH, ROWS - existing)
+            await repository.create_many(session, generated_posts(user_id, count))
+            await session.commit()
+            existing += count
+        await session.execute(text("ANALYZE posts"))
+
+
+async def timed(coro_factory) -> float:
+    """Returns median time of coroutine in milliseconds"""
+    timings = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        await coro_factory()
+        timings.append(perf_counter() - start)
+    return median(timings) * 1000
+
+
+async def main() -> None:
+    """Runs benchmark"""
+    await seed()
+    async with Session() as session:
+        for query in QUERIES:
+            pattern = f"%{query}%"
+
+            def ilike(pattern_=pattern):
+                return session.execute(
+                    select(Post.id)
+                    .where(or_(Post.title.ilike(pattern_), Post.content.ilike(pattern_)))
+                    .limit(20)
+                )
+
+            def search(query_=query):
+                return post_repository.search(session, query_, limit=20)
+
+            print(
+                f"{query!r:>18}: ILIKE {await timed(ilike):9.2f} ms  "
+                f"full-text {await timed(search):9.2f} ms"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark of JSON serialization against the previous encoder.
+
+The previous encoder ran stdlib ``json.dumps`` with a JSONEncoder calling
+``model_dump()`` per model, wrote datetimes and enums inside models as null
+and escaped non-ASCII text, so output sizes are not comparable. Each backend
+serializes a page of posts given as a pydantic model and as plain dicts, the
+shape of a JSON column value. Needs no database.
+
+Run from the repository root: python -m API.benchmarks.serialization
+"""
+
+from datetime import datetime
+from datetime import timezone
+from json import JSONEncoder
+from json import dumps as json_dumps
+from timeit import timeit
+
+from pydantic import BaseModel
+
+from API.app.models.posts import HandicraftCategory
+from API.app.models.posts import PostStatus
+from API.app.schemas.posts import PostPage
+from API.app.schemas.posts import PostResponse
+from API.core.serialization import BACKENDS
+from API.core.serialization import dumps
+
+ROUNDS = 2_000
+
+
+class PydanticJSONEncoder(JSONEncoder):
+    """Previous encoder of API.core.database.jsonencoder"""
+
+    def default(self, o: object):
+        if isinstance(o, BaseModel):
+            return o.model_dump()
+        return None
+
+
+def previous(obj) -> bytes:
+    """Previous custom_serializer"""
+    return json_dumps(obj, cls=PydanticJSONEncoder).encode()
+
+
+def page(size: int = 100) -> PostPage:
+    """Returns page of generated posts"""
+    now = datetime.now(timezone.utc)
+    return PostPage(
+        items=[
+            PostResponse(
+                id=i,
+                user_id=i % 50,
+                title=f"Post {i}",
+                content="В'язана шапка ручної роботи. " * 10,
+                categories=[HandicraftCategory.KNITTING, HandicraftCategory.CROCHET],
+                status=PostStatus.IN_STOCK,
+                review_count=i % 7,
+                rating_avg=4.5,
+                favorite_count=i * 3,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(size)
+        ],
+        next_cursor="WzEwMF0",
+    )
+
+
+def main() -> None:
+    """Runs benchmark"""
+    model = page()
+    rows = [item.model_dump() for item in model.items]
+    cases = {"previous": previous, **BACKENDS, "dumps": dumps}
+    for payload_name, payload in (("model", model), ("dicts", rows)):
+        baseline = None
+        for name, serializer in cases.items():
+            size = len(serializer(payload))
+            seconds = timeit(lambda: serializer(payload), number=ROUNDS)  # pylint: disable=W0640
+            rate = ROUNDS / seconds
+            baseline = baseline or rate
+            print(
+                f"{payload_name:>5} {name:>8}: {rate:10,.0f} pages/s "
+                f"{rate * size / 2**20:8,.1f} MiB/s  x{rate / baseline:5.1f}  "
+                f"({size} bytes)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Microbenchmark of Python-side CPU time per BaseRepository.get_by call.
+
+Compares building the statement on every call, as get_by did before, with
+cached statement shapes. The first part only builds statements and their
+cache keys and needs no database. The second part runs get_by against the
+database from .env and reports process CPU time per call, which includes
+result processing on top of statement preparation.
+
+Run from the repository root: python -m API.benchmarks.statement_cache
+"""
+
+import asyncio
+from time import process_time
+
+from sqlalchemy import select
+
+from API.app import models  # pylint: disable=W0611
+from API.app.models.users import User
+from API.core.database.base import Base
+from API.core.database.session import Session
+from API.core.database.session import engine
+from API.core.repository.base import BaseRepository
+from API.core.repository.loading import load_options
+
+CALLS = 20_000
+QUERIES = 5_000
+
+
+def uncached_get_by(field: str, value):
+    """Returns get_by statement built like before statement caching"""
+    query = select(User).options(*load_options(User, None))
+    return query.where(getattr(User, field) == value)
+
+
+def per_call(timings: float, calls: int) -> str:
+    """Returns microseconds per call"""
+    return f"{timings / calls * 1_000_000:8.1f} us"
+
+
+def build_only(repository: BaseRepository) -> None:
+    """Times building statement and its cache key"""
+    start = process_time()
+    for i in range(CALLS):
+        uncached_get_by("id", i)._generate_cache_key()
+    before = process_time() - start
+
+    start = process_time()
+    for i in range(CALLS):
+        repository._get_by("id")._generate_cache_key()  # pylint: disable=W0212
+    after = process_time() - start
+    print(f"statement + cache key: before {per_call(before, CALLS)}  "
+          f"after {per_call(after, CALLS)}")
+
+
+async def with_database(repository: BaseRepository) -> None:
+    """Times get_by calls against database"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with Session() as session:
+        (user_id,) = await repository.create_many(
+            session,
+            [{"google_id": "statement", "phone_number": "statement",
+              "email": "statement@example.com"}],
+        )
+        await repository.get_by(session, "id", user_id)
+
+        start = process_time()
+        for _ in range(QUERIES):
+            result = await session.execute(uncached_get_by("id", user_id))
+            list(result.unique().scalars().all())
+        before = process_time() - start
+
+        start = process_time()
+        for _ in range(QUERIES):
+            await repository.get_by(session, "id", user_id)
+        after = process_time() - start
+        await session.rollback()
+    print(f"get_by CPU time:       before {per_call(before, QUERIES)}  "
+          f"after {per_call(after, QUERIES)}")
+    await engine.dispose()
+
+
+def main() -> None:
+    """Runs benchmark"""
+    repository = BaseRepository(User)
+    build_only(repository)
+    asyncio.run(with_database(repository))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of access token verification per request.
+
+Measures issuing a token, verifying its signature and claims, checking it
+against a revocation list holding ``--revoked`` tokens, and the whole
+``get_principal`` dependency. Needs no database.
+
+Run from the repository root: python -m API.benchmarks.tokens
+"""
+
+import argparse
+import asyncio
+import secrets
+from time import time
+from timeit import timeit
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from API.app.auth import get_principal
+from API.app.auth import revocations
+from API.app.auth import token_signer
+from API.core.auth.tokens import Revocation
+
+ROUNDS = 100_000
+
+
+def report(name: str, seconds: float, rounds: int) -> None:
+    """Prints time per operation"""
+    print(f"{name:>16}: {seconds / rounds * 1e6:7.2f} us  {rounds / seconds:12,.0f} /s")
+
+
+def main() -> None:
+    """Runs benchmark"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revoked", type=int, default=100_000)
+    args = parser.parse_args()
+    expires_at = time() + 3600
+    for id_ in range(args.revoked):
+        revocations.add(
+            Revocation(id=id_ + 1, expires_at=expires_at, token_id=secrets.token_urlsafe(12))
+        )
+
+    token = token_signer.issue(42, {"role": "user"})
+    principal = token_signer.verify(token)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    print(f"token: {len(token)} bytes, revocation list: {len(revocations)} entries")
+    issue = timeit(lambda: token_signer.issue(42, {"role": "user"}), number=ROUNDS)
+    report("issue", issue, ROUNDS)
+    report("verify", timeit(lambda: token_signer.verify(token), number=ROUNDS), ROUNDS)
+    report("revoked", timeit(lambda: revocations.revoked(principal), number=ROUNDS), ROUNDS)
+
+    async def dependency() -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(ROUNDS):
+            await get_principal(credentials)
+        return loop.time() - started
+
+    report("get_principal", asyncio.run(dependency()), ROUNDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Stateless signed access tokens"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from dataclasses import dataclass
+from dataclasses import field
+from time import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+
+from API.core.exceptions.base import InvalidTokenException
+
+# Claims set by the signer, extra claims can not override them
+RESERVED_CLAIMS = frozenset({"sub", "iat", "exp", "jti"})
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as told by a verified token"""
+
+    user_id: int
+    token_id: str
+    issued_at: int
+    expires_at: int
+    claims: dict[str, Any] = field(default_factory=dict)
+
+
+def _encode(data: bytes) -> str:
+    """Returns unpadded base64url of data"""
+    return urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _decode(data: str) -> bytes:
+    """Returns bytes of unpadded base64url"""
+    return urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """
+    Issues and verifies tokens signed with HMAC-SHA256.
+
+    A token is ``<base64url JSON claims>.<base64url signature>`` and carries
+    the user id (``sub``), issue and expiry times, a random id (``jti``) used
+    for revocation, and extra claims. Verification needs no database: one
+    HMAC over the claims, a constant-time comparison and a JSON decode.
+    """
+
+    def __init__(self, secret_key: str, ttl: int = 7 * 24 * 3600):
+        if not secret_key:
+            raise ValueError("Token signer needs a secret key")
+        # Derived key, so tokens can not be replayed as other signed values
+        self._key = hmac.new(
+            secret_key.encode(), b"access-token", hashlib.sha256
+        ).digest()
+        self.ttl = ttl
+
+    def issue(
+        self,
+        user_id: int,
+        claims: Optional[dict[str, Any]] = None,
+        ttl: Optional[int] = None,
+    ) -> str:
+        """Returns token of user with extra claims, valid for ttl seconds up to ``self.ttl``"""
+        if claims and RESERVED_CLAIMS.intersection(claims):
+            raise ValueError(f"Claims {sorted(RESERVED_CLAIMS)} are set by the signer")
+        now = int(time())
+        payload = {
+            **(claims or {}),
+            "sub": user_id,
+            "iat": now,
+            "exp": now + (self.ttl if ttl is None else min(ttl, self.ttl)),
+            "jti": secrets.token_urlsafe(12),
+        }
+        body = _encode(json.dumps(payload, separators=(",", ":")).encode())
+        return f"{body}.{self._sign(body)}"
+
+    def verify(self, token: str) -> Principal:
+        """
+        Returns principal of token
+
+        :raises InvalidTokenException: Token is malformed, forged or expired.
+        """
+        body, _, signature = token.partition(".")
+        if not body or not signature or not hmac.compare_digest(
+            signature, self._sign(body)
+        ):
+            raise InvalidTokenException("Invalid token")
+        try:
+            payload = json.loads(_decode(body))
+            principal = Principal(
+                user_id=int(payload.pop("sub")),
+                token_id=str(payload.pop("jti")),
+                issued_at=int(payload.pop("iat")),
+                expires_at=int(payload.pop("exp")),
+                claims=payload,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise InvalidTokenException("Invalid token") from exc
+        if principal.expires_at <= time():
+            raise InvalidTokenException("Token expired")
+        return principal
+
+    def _sign(self, body: str) -> str:
+        """Returns signature of encoded claims"""
+        return _encode(hmac.new(self._key, body.encode(), hashlib.sha256).digest())
+
+
+@dataclass(frozen=True)
+class Revocation:
+    """Revoked token, or all tokens of a user issued until ``issued_until``"""
+
+    id: int
+    expires_at: float
+    token_id: Optional[str] = None
+    user_id: Optional[int] = None
+    issued_until: Optional[int] = None
+
+
+class RevocationList:
+    """
+    Revoked tokens kept in process.
+
+    Checking a principal is two dict lookups. Revocations made by this
+    process apply at once; those of other processes are loaded by id every
+    ``refresh_interval`` seconds once ``start()`` has been awaited, which
+    bounds how long a revoked token may still be accepted. The last
+    ``lookback`` ids are loaded again, as ids of concurrent transactions may
+    commit out of order. Revocations are forgotten when tokens they cover
+    have expired anyway.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[int], Awaitable[list[Revocation]]],
+        refresh_interval: float = 5.0,
+        lookback: int = 100,
+    ):
+        self.load = load
+        self.refresh_interval = refresh_interval
+        self.lookback = lookback
+        self.last_id = 0
+        self._tokens: dict[str, float] = {}
+        self._users: dict[int, tuple[int, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def revoked(self, principal: Principal) -> bool:
+        """Returns whether token of principal is revoked"""
+        if principal.token_id in self._tokens:
+            return True
+        user = self._users.get(principal.user_id)
+        return user is not None and principal.issued_at <= user[0]
+
+    def add(self, revocation: Revocation) -> None:
+        """Applies revocation"""
+        self.last_id = max(self.last_id, revocation.id)
+        if revocation.token_id is not None:
+            self._tokens[revocation.token_id] = revocation.expires_at
+        if revocation.user_id is not None and revocation.issued_until is not None:
+            previous = self._users.get(revocation.user_id)
+            if previous is None or previous[0] < revocation.issued_until:
+                self._users[revocation.user_id] = (
+                    revocation.issued_until,
+                    revocation.expires_at,
+                )
+
+    async def refresh(self) -> None:
+        """Loads revocations made since the last refresh"""
+        for revocation in await self.load(max(0, self.last_id - self.lookback)):
+            self.add(revocation)
+        now = time()
+        self._tokens = {
+            token_id: expires_at
+            for token_id, expires_at in self._tokens.items()
+            if expires_at > now
+        }
+        self._users = {
+            user_id: user for user_id, user in self._users.items() if user[1] > now
+        }
+
+    async def start(self) -> None:
+        """Loads revocations and starts refreshing them"""
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Stops refreshing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self) -> None:
+        """Refreshes revocations periodically"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:  # pylint: disable=W0718
+                logging.warning("Token revocations refresh failed", exc_info=True)
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._users)
@@ -0,0 +1,219 @@
+"""Read-through entity cache for repositories"""
+
+import asyncio
+import logging
+from itertools import chain
+from typing import Any
+from typing import Iterable
+from typing import Optional
+from typing import Type
+
+from sqlalchemy import event
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import make_transient_to_detached
+
+from API.core.cache.lru import LRUTTLCache
+from API.core.cache.shared import SharedCache
+from API.core.database.base import Base
+
+_PENDING_KEY = "entity_cache_invalidations"
+_caches: dict[type, "EntityCache"] = {}
+# Model -> (cache, cached field, attribute of model) of rows which database
+# triggers change when instances of model are written
+_dependents: dict[type, list[tuple["EntityCache", str, str]]] = {}
+
+
+class EntityCache:
+    """
+    Two-tier cache of model rows by unique fields.
+
+    The in-process tier is a bounded LRU with TTL, the optional shared tier
+    is any SharedCache. Rows are stored as dicts of column values and are
+    invalidated on flush and commit of sessions which changed or deleted them.
+    """
+
+    def __init__(
+        self,
+        model: Type[Base],
+        fields: Iterable[str] = ("id",),
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.model_class = model
+        self.fields = tuple(fields)
+        self.ttl = ttl
+        self.local = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._columns = [
+            attribute.key
+            for attribute in inspect(model).column_attrs
+            if not attribute.deferred
+        ]
+        self._prefix = f"{model.__tablename__}:"
+        _caches[model] = self
+
+    @property
+    def evictions(self) -> int:
+        """Number of entries evicted from in-process tier because it was full"""
+        return self.local.evictions
+
+    def stats(self) -> dict[str, int]:
+        """Returns cache counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "size": len(self.local),
+        }
+
+    def key(self, field: str, value: Any) -> str:
+        """Returns cache key of row by field value"""
+        return f"{self._prefix}{field}:{value}"
+
+    async def get(self, field: str, value: Any) -> Optional[dict[str, Any]]:
+        """Returns cached column values of row or None"""
+        key = self.key(field, value)
+        values = self.local.get(key)
+        if values is None and self.shared is not None:
+            values = await self.shared.get(key)
+            if values is not None:
+                self.local.set(key, values)
+        if values is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return values
+
+    async def store(self, instance: Base, generation: int) -> None:
+        """
+        Caches row under every cached field.
+
+        Skipped when anything was invalidated since ``generation`` was taken,
+        so a row read before a concurrent write can not be cached after it.
+        """
+        if generation != self.generation:
+            return
+        loaded = inspect(instance).dict
+        if any(column not in loaded for column in self._columns):
+            return
+        values = {column: loaded[column] for column in self._columns}
+        keys = [self.key(field, values[field]) for field in self.fields]
+        for key in keys:
+            self.local.set(key, values)
+        if self.shared is not None:
+            for key in keys:
+                await self.shared.set(key, values, self.ttl)
+
+    async def attach(self, session: AsyncSession, values: dict[str, Any]) -> Base:
+        """Returns instance built from cached values attached to session without SQL"""
+        instance = self.model_class(**values)
+        make_transient_to_detached(instance)
+        existing = session.sync_session.identity_map.get(inspect(instance).key)
+        if existing is not None:
+            return existing
+        return await session.merge(instance, load=False)
+
+    def keys_for(self, instance: Base) -> set[str]:
+        """Returns keys of instance for current and previous values of cached fields"""
+        state = inspect(instance)
+        keys = set()
+        for field in self.fields:
+            history = state.attrs[field].history
+            for value in chain(history.added, history.unchanged, history.deleted):
+                keys.add(self.key(field, value))
+        return keys
+
+    def invalidated_by(self, model: Type[Base], attribute: str, field: str = "id") -> None:
+        """
+        Invalidates rows whose field equals attribute of flushed instances of model
+
+        For columns written by triggers, e.g. aggregates of a post updated
+        when one of its reviews is inserted.
+        """
+        _dependents.setdefault(model, []).append((self, field, attribute))
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Removes keys from in-process tier and schedules removal from shared tier"""
+        keys = list(keys)
+        self.generation += 1
+        for key in keys:
+            self.local.delete(key)
+        if self.shared is not None and keys:
+            _schedule(self.shared.delete(keys))
+
+    def clear(self) -> None:
+        """Removes every row of model from both tiers"""
+        self.generation += 1
+        self.local.clear()
+        if self.shared is not None:
+            _schedule(self.shared.clear(self._prefix))
+
+
+def _schedule(coro) -> None:
+    """Runs shared tier coroutine in background of running event loop"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        logging.warning("Shared cache invalidation skipped: no running event loop")
+        return
+    loop.create_task(coro)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context) -> None:  # pylint: disable=W0613
+    """Invalidates rows changed by flush and remembers them until commit"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for instance in chain(session.dirty, session.deleted):
+        cache = _caches.get(type(instance))
+        if cache is None:
+            continue
+        keys = cache.keys_for(instance)
+        cache.invalidate(keys)
+        pending.setdefault(cache, set()).update(keys)
+    for instance in chain(session.new, session.dirty, session.deleted):
+        for cache, field, attribute in _dependents.get(type(instance), ()):
+            history = inspect(instance).attrs[attribute].history
+            keys = {
+                cache.key(field, value)
+                for value in chain(history.added, history.unchanged, history.deleted)
+            }
+            cache.invalidate(keys)
+            pending.setdefault(cache, set()).update(keys)
+
+
+def invalidate_rows(
+    session: Session, model: Type[Base], field: str, values: Iterable[Any]
+) -> None:
+    """
+    Invalidates cached rows of model changed by Core statements of session
+
+    Rows are invalidated now and once more on commit, like rows changed by
+    flush. Does nothing when model has no cache.
+    """
+    cache = _caches.get(model)
+    if cache is None:
+        return
+    keys = {cache.key(field, value) for value in values}
+    cache.invalidate(keys)
+    session.info.setdefault(_PENDING_KEY, {}).setdefault(cache, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Invalidates rows changed by committed transaction once more"""
+    for cache, keys in session.info.pop(_PENDING_KEY, {}).items():
+        cache.invalidate(keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:  # pylint: disable=W0613
+    """Drops pending invalidations of rolled back transaction"""
+    session.info.pop(_PENDING_KEY, None)
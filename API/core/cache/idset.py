@@ -0,0 +1,184 @@
+"""In-process cache of sets of int ids by key"""
+
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Iterable
+from typing import Optional
+
+from API.core.cache.lru import LRUTTLCache
+from API.core.metrics import ID_SET_CACHE_REQUESTS
+
+# Cached in place of sets larger than max_ids
+_OVERSIZED = object()
+
+
+class IdSetCache:
+    """
+    Sets of int ids by key, e.g. ids of posts favorited by a user.
+
+    A set is a sorted ``array("i")``, 4 bytes per id, and membership is a
+    binary search. Sets larger than ``max_ids`` are not cached, only marked
+    as oversized, so callers answer those from the database without loading
+    them again. Sets are kept for recently used keys only and expire after
+    ``ttl``, which bounds how long changes made by other processes stay
+    unseen unless an IdSetRefresher drops them sooner.
+
+    Changes are applied with ``add``/``discard`` after they are committed.
+    A set loaded by a read which raced with a change is not stored, as it
+    may miss the change. Not thread-safe: meant to be used from the event
+    loop thread only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 10_000,
+        ttl: Optional[float] = 300.0,
+        max_ids: int = 10_000,
+    ):
+        self.name = name
+        self.max_ids = max_ids
+        self.generation = 0
+        self._sets = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def contains(self, key: Hashable, ids: Iterable[int]) -> Optional[set[int]]:
+        """Returns ids which are in set of key or None when it is not cached"""
+        values = self._sets.get(key)
+        if values is None or values is _OVERSIZED:
+            ID_SET_CACHE_REQUESTS.inc(self.name, "miss" if values is None else "oversized")
+            return None
+        ID_SET_CACHE_REQUESTS.inc(self.name, "hit")
+        return {id_ for id_ in ids if _index(values, id_) is not None}
+
+    def set(self, key: Hashable, ids: Iterable[int], generation: int) -> bool:
+        """
+        Caches set of key loaded when ``self.generation`` was ``generation``
+
+        A set larger than ``max_ids``, which may be given truncated to
+        ``max_ids + 1`` ids, is marked as oversized instead.
+
+        :return: Whether the set was cached.
+        """
+        if generation != self.generation:
+            return False
+        values = array("i", sorted(set(ids)))
+        if len(values) > self.max_ids:
+            self._sets.set(key, _OVERSIZED)
+            return False
+        self._sets.set(key, values)
+        return True
+
+    def oversized(self, key: Hashable) -> bool:
+        """Returns whether set of key is known to be larger than ``max_ids``"""
+        return self._sets.get(key) is _OVERSIZED
+
+    def add(self, key: Hashable, id_: int) -> None:
+        """Adds id to set of key if it is cached"""
+        self.generation += 1
+        values = self._sets.get(key)
+        if values is None or values is _OVERSIZED or _index(values, id_) is not None:
+            return
+        if len(values) >= self.max_ids:
+            self._sets.delete(key)
+            return
+        values.insert(bisect_left(values, id_), id_)
+
+    def discard(self, key: Hashable, id_: int) -> None:
+        """Removes id from set of key if it is cached"""
+        self.generation += 1
+        values = self._sets.get(key)
+        if values is _OVERSIZED:
+            # May fit now
+            self._sets.delete(key)
+        elif values is not None:
+            index = _index(values, id_)
+            if index is not None:
+                del values[index]
+
+    def delete(self, key: Hashable) -> None:
+        """Forgets set of key"""
+        self.generation += 1
+        self._sets.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+
+class IdSetRefresher:
+    """
+    Drops cached sets of keys changed by other processes.
+
+    Changes are read from a log by id: ``load(last_id)`` returns
+    ``(id, key)`` of changes logged after ``last_id``, ``last()`` the id of
+    the newest change. Once ``start()`` has been awaited, changes are loaded
+    every ``refresh_interval`` seconds, which bounds how long a change made
+    by another process stays unseen. The last ``lookback`` ids are loaded
+    again, as ids of concurrent transactions may commit out of order; each
+    change drops its set once.
+    """
+
+    def __init__(
+        self,
+        sets: IdSetCache,
+        load: Callable[[int], Awaitable[list[tuple[int, Hashable]]]],
+        last: Callable[[], Awaitable[int]],
+        refresh_interval: float = 1.0,
+        lookback: int = 100,
+    ):
+        self.sets = sets
+        self.load = load
+        self.last = last
+        self.refresh_interval = refresh_interval
+        self.lookback = lookback
+        self.last_id = 0
+        self._seen: set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        """Drops sets of keys changed since the last refresh"""
+        for id_, key in await self.load(max(0, self.last_id - self.lookback)):
+            if id_ not in self._seen:
+                self._seen.add(id_)
+                self.sets.delete(key)
+            self.last_id = max(self.last_id, id_)
+        oldest = self.last_id - self.lookback
+        self._seen = {id_ for id_ in self._seen if id_ > oldest}
+
+    async def start(self) -> None:
+        """Starts refreshing from the newest change"""
+        if self._task is not None:
+            return
+        self.last_id = await self.last()
+        self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Stops refreshing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self) -> None:
+        """Refreshes sets periodically"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:  # pylint: disable=W0718
+                logging.warning("Id set %s refresh failed", self.sets.name, exc_info=True)
+
+
+def _index(values: array, id_: int) -> Optional[int]:
+    """Returns index of id in sorted array or None"""
+    index = bisect_left(values, id_)
+    if index < len(values) and values[index] == id_:
+        return index
+    return None
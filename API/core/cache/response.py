@@ -0,0 +1,164 @@
+"""Cache of serialized GET responses with conditional requests"""
+
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timezone
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
+from hashlib import blake2b
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Hashable
+from typing import Mapping
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from API.core.cache.lru import LRUTTLCache
+from API.core.cache.singleflight import SingleFlight
+from API.core.metrics import RESPONSE_CACHE_REQUESTS
+from API.core.metrics import RESPONSES_NOT_MODIFIED
+from API.core.serialization import dumps
+
+
+def _etag(source: bytes) -> str:
+    """Returns strong ETag of source"""
+    return f'"{blake2b(source, digest_size=12).hexdigest()}"'
+
+
+@dataclass
+class CachedResponse:
+    """
+    JSON response with its validators
+
+    The body is serialized on first use, so a response whose ETag comes from
+    a version is not serialized for requests answered with 304.
+    """
+
+    etag: str
+    content: Any = field(default=None, repr=False)
+    last_modified: Optional[datetime] = None
+    _body: Optional[bytes] = field(default=None, repr=False)
+
+    @classmethod
+    def json(
+        cls,
+        content: Any,
+        version: Optional[Hashable] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> "CachedResponse":
+        """
+        Returns response of content serialized to JSON
+
+        :param version: Value which changes whenever content does, e.g. ids
+            and ``updated_at`` of items. ETag is a hash of body without it.
+        :param last_modified: Only for single resources. Newest ``updated_at``
+            of a list does not change when items leave it, so listings get
+            no Last-Modified and are validated by ETag alone.
+        """
+        if version is None:
+            body = dumps(content)
+            return cls(_etag(body), last_modified=last_modified, _body=body)
+        return cls(
+            _etag(repr((type(content).__name__, version)).encode()), content, last_modified
+        )
+
+    @property
+    def body(self) -> bytes:
+        """Returns serialized content, serializing it on first use"""
+        if self._body is None:
+            self._body = dumps(self.content)
+            self.content = None
+        return self._body
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Returns validator headers, clients revalidate on every use"""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+    def not_modified(self, headers: Mapping[str, str]) -> bool:
+        """
+        Returns whether client's copy is current
+
+        If-Modified-Since is only used without If-None-Match, as in RFC 9110.
+        """
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTP dates have whole seconds
+        return self.last_modified.replace(microsecond=0) <= since
+
+
+class ResponseCache:
+    """
+    Bounded cache of serialized responses by request key.
+
+    Concurrent misses of a key share one load through SingleFlight, so the
+    load must open its own session (see SingleFlight). Entries live for
+    ``ttl`` seconds, which bounds how stale a response can be. Requests with
+    a matching If-None-Match or If-Modified-Since get 304 without a body.
+    Entries whose body turns out larger than ``max_body_size`` are dropped
+    once serialized.
+    Not thread-safe: meant to be used from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 256,
+        ttl: float = 1.0,
+        max_body_size: int = 256 * 1024,
+        timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.max_body_size = max_body_size
+        self.local = LRUTTLCache(maxsize=maxsize, ttl=ttl)
+        self.flight = SingleFlight(name, timeout=timeout)
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        load: Callable[[], Awaitable[CachedResponse]],
+    ) -> Response:
+        """Returns cached response of key, loading it on miss"""
+        entry = self.local.get(key)
+        if entry is None:
+            RESPONSE_CACHE_REQUESTS.inc(self.name, "miss")
+            entry = await self.flight.do(key, partial(self._load, key, load))
+        else:
+            RESPONSE_CACHE_REQUESTS.inc(self.name, "hit")
+        if entry.not_modified(request.headers):
+            RESPONSES_NOT_MODIFIED.inc(self.name)
+            return Response(status_code=304, headers=entry.headers)
+        body = entry.body
+        if len(body) > self.max_body_size:
+            self.local.delete(key)
+        return Response(body, media_type="application/json", headers=entry.headers)
+
+    async def _load(
+        self, key: Hashable, load: Callable[[], Awaitable[CachedResponse]]
+    ) -> CachedResponse:
+        """Loads entry and caches it"""
+        entry = await load()
+        self.local.set(key, entry)
+        return entry
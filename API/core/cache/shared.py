@@ -0,0 +1,62 @@
+"""Shared cache tier interface"""
+
+from abc import ABC
+from abc import abstractmethod
+from time import monotonic
+from typing import Any
+from typing import Iterable
+from typing import Optional
+
+
+class SharedCache(ABC):
+    """
+    Cache shared between processes, e.g. Redis or Memcached.
+
+    Values are plain dicts of column values, so backends are free to
+    serialize them in any format.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Returns cached value or None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Caches value"""
+
+    @abstractmethod
+    async def delete(self, keys: Iterable[str]) -> None:
+        """Removes values from cache"""
+
+    @abstractmethod
+    async def clear(self, prefix: str) -> None:
+        """Removes all values with keys starting with prefix"""
+
+
+class InMemorySharedCache(SharedCache):
+    """In-memory stand-in for shared cache used in tests and local runs"""
+
+    def __init__(self):
+        self.data: dict[str, tuple[float, Any]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = monotonic() + ttl if ttl is not None else float("inf")
+        self.data[key] = (expires_at, value)
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def clear(self, prefix: str) -> None:
+        for key in [key for key in self.data if key.startswith(prefix)]:
+            del self.data[key]
@@ -0,0 +1,71 @@
+"""Coalescing of concurrent identical calls"""
+
+import asyncio
+from typing import Awaitable
+from typing import Callable
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import TypeVar
+
+from API.core.exceptions.base import ReadTimeoutException
+from API.core.metrics import SINGLEFLIGHT_CALLS
+from API.core.metrics import SINGLEFLIGHT_COALESCED
+from API.core.metrics import SINGLEFLIGHT_IN_FLIGHT
+
+T = TypeVar("T")  # pylint: disable=C0103
+
+
+class SingleFlight(Generic[T]):
+    """
+    Group of calls where concurrent callers with equal keys share one call.
+
+    The first caller of a key starts the call as a task, callers arriving
+    while it runs await the same task and get the same result or exception.
+    The key is forgotten as soon as the call finishes, so results are never
+    served after that. Not thread-safe: meant to be used from the event loop
+    thread only.
+
+    The call outlives any single caller, so it must not use the session or
+    other state of the request which started it: it should open its own
+    session and return data detached from it, e.g. pydantic schemas. A
+    cancelled caller does not cancel the call for the others.
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self.calls: dict[Hashable, asyncio.Task] = {}
+        SINGLEFLIGHT_IN_FLIGHT.set_function(lambda: len(self.calls), name)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns result of call, shared with concurrent callers of key
+
+        :raises ReadTimeoutException: Call did not finish in ``timeout`` seconds.
+        """
+        task = self.calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.inc(self.name)
+            task = asyncio.ensure_future(self._run(call))
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            SINGLEFLIGHT_COALESCED.inc(self.name)
+        return await asyncio.shield(task)
+
+    async def _run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Runs call with timeout"""
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await call()
+        except TimeoutError as exc:
+            raise ReadTimeoutException() from exc
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Removes finished call"""
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Marks exception as retrieved when every caller was cancelled
+            task.exception()
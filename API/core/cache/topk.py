@@ -0,0 +1,106 @@
+"""Top-K id lists in a memory-mapped file"""
+
+import json
+import logging
+import os
+from time import monotonic
+from typing import Any
+from typing import Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EMPTY = -1
+
+
+class TopKFile:
+    """
+    Lists of up to K int ids by int key in a memory-mapped ``.npy`` file.
+
+    Row ``key`` of an int32 array holds ids ordered from best, padded with
+    -1, so a lookup is one index into the mapping. Worker processes share the
+    pages through the page cache. Rows patched in place are seen at once; a
+    rebuilt file replaces the old one by rename and is picked up within
+    ``reload_interval`` seconds. Metadata of the build is kept next to it in
+    ``<path>.json``.
+
+    Lookups return no ids while the file or NumPy is missing.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 30.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._array = None
+        self._identity: Optional[tuple[int, int]] = None
+        self._checked_at = float("-inf")
+
+    def get(self, key: int) -> list[int]:
+        """Returns ids of key"""
+        array = self._mapped()
+        if array is None or not 0 <= key < len(array):
+            return []
+        return [int(id_) for id_ in array[key] if id_ != EMPTY]
+
+    def metadata(self) -> dict[str, Any]:
+        """Returns metadata of the current build or empty dict"""
+        try:
+            with open(f"{self.path}.json", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def create(self, rows: int, k: int):
+        """Returns writable array of a new file filled with -1, see ``commit``"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        array = numpy.lib.format.open_memmap(
+            f"{self.path}.tmp", mode="w+", dtype=numpy.int32, shape=(rows, k)
+        )
+        array[:] = EMPTY
+        return array
+
+    def commit(self, array, metadata: dict[str, Any]) -> None:
+        """Replaces the file with a new one returned by ``create``"""
+        array.flush()
+        self._write_metadata(metadata, f"{self.path}.tmp.json")
+        os.replace(f"{self.path}.tmp", self.path)
+        os.replace(f"{self.path}.tmp.json", f"{self.path}.json")
+
+    def open_for_update(self):
+        """Returns writable mapping of the current file"""
+        return numpy.load(self.path, mmap_mode="r+")
+
+    def update(self, array, metadata: dict[str, Any]) -> None:
+        """Flushes rows patched through ``open_for_update``"""
+        array.flush()
+        self._write_metadata(metadata, f"{self.path}.tmp.json")
+        os.replace(f"{self.path}.tmp.json", f"{self.path}.json")
+
+    def _mapped(self):
+        """Returns mapped array, reopening it when the file was replaced"""
+        if numpy is None:
+            return None
+        now = monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return self._array
+        self._checked_at = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._array = self._identity = None
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity != self._identity:
+            try:
+                self._array = numpy.load(self.path, mmap_mode="r")
+                self._identity = identity
+            except (OSError, ValueError):
+                logging.exception("Could not map %s", self.path)
+        return self._array
+
+    @staticmethod
+    def _write_metadata(metadata: dict[str, Any], path: str) -> None:
+        """Writes metadata as JSON"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(metadata, file)
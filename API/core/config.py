@@ -3,6 +3,7 @@
 import json
 from dataclasses import dataclass
 from os import getenv
+from typing import Optional
 
 from dotenv import load_dotenv
 
@@ -20,12 +21,22 @@ class DatabaseConfig:
     host: str = None
     port: int = None
     name: str = None
+    replica_hosts: tuple[str, ...] = ()
+    replica_max_lag: float = 5.0
+    replica_check_interval: float = 5.0
+    prepared_statement_cache_size: int = 100
+    query_cache_size: int = 500
+    stream_yield_per: int = 1000
+    pool_size: int = 25
+    max_overflow: int = 15
+    pool_timeout: float = 30.0
+    max_connections: Optional[int] = None
 
 
 class DbConfig:
     """Database config"""
 
-    def __init__(self, db_config: DatabaseConfig):
+    def __init__(self, db_config: DatabaseConfig, workers: int = 1):
         self.user = db_config.user
         self.password = db_config.password
         self.host = db_config.host
@@ -36,6 +47,49 @@ class DbConfig:
             f"{db_config.password}@{db_config.host}:"
             f"{db_config.port}/{db_config.name}"
         )
+        # Replicas share credentials and database name with primary
+        self.replica_urls = [
+            f"postgresql+asyncpg://{db_config.user}:"
+            f"{db_config.password}@{host}/{db_config.name}"
+            for host in db_config.replica_hosts
+        ]
+        self.replica_hosts = db_config.replica_hosts
+        self.replica_max_lag = db_config.replica_max_lag
+        self.replica_check_interval = db_config.replica_check_interval
+        # Prepared statements kept per asyncpg connection, 0 disables them
+        # (e.g. behind PgBouncer in transaction mode)
+        self.prepared_statement_cache_size = db_config.prepared_statement_cache_size
+        # Compiled statements kept per engine
+        self.query_cache_size = db_config.query_cache_size
+        # Rows fetched at a time by server-side cursors of streamed reads
+        self.stream_yield_per = db_config.stream_yield_per
+        self.pool_timeout = db_config.pool_timeout
+        self.pool_size, self.max_overflow = self.worker_pool(db_config, workers)
+
+    @staticmethod
+    def worker_pool(db_config: DatabaseConfig, workers: int) -> tuple[int, int]:
+        """
+        Returns pool_size and max_overflow of one worker process.
+
+        ``max_connections`` is the number of connections all workers together
+        may open to one database server. Every worker gets an equal share, so
+        workers * (pool_size + max_overflow) never exceeds it; configured pool
+        sizes are scaled down keeping their ratio when they do not fit.
+        """
+        if db_config.max_connections is None:
+            return db_config.pool_size, db_config.max_overflow
+        share = db_config.max_connections // workers
+        if share < 1:
+            raise ValueError(
+                f"DB_MAX_CONNECTIONS={db_config.max_connections} "
+                f"is less than one connection per worker for {workers} workers"
+            )
+        total = db_config.pool_size + db_config.max_overflow
+        if total <= share:
+            return db_config.pool_size, db_config.max_overflow
+        # pool_size=0 would mean an unlimited pool
+        pool_size = max(1, share * db_config.pool_size // total)
+        return pool_size, share - pool_size
 
 
 @dataclass
@@ -44,9 +98,117 @@ class BackendConfig:
 
     host: str = None
     port: int = None
+    workers: int = 1
+    graceful_shutdown_timeout: float = 30.0
     secret_key: str = None
     web_domain: str = None
     logging_level: str = None
+    log_format: str = "json"
+    # "auto" uses orjson when it is installed, "orjson" or "stdlib" force one
+    json_backend: str = "auto"
+    log_queue_size: int = 10_000
+    # e.g. "DEBUG=0.01,INFO=0.1", levels not listed are kept
+    log_sample_rates: str = ""
+    # "dev" applies migrations on startup, "production" only checks schema version
+    startup_mode: str = "dev"
+    log_response_body: bool = False
+    log_body_limit: int = 1024
+    log_body_sample_rate: float = 1.0
+
+
+@dataclass
+class CacheConfig:
+    """Cache config"""
+
+    entity_cache_size: int = 10_000
+    entity_cache_ttl: float = 60.0
+    # Seconds a read shared by concurrent identical requests may take
+    singleflight_timeout: float = 5.0
+    # Serialized responses of hot pages, ttl bounds how stale they can be
+    response_cache_size: int = 256
+    response_cache_ttl: float = 1.0
+    response_cache_max_body: int = 256 * 1024
+    # Sets of favorited post ids of recently active users, 0 disables them
+    favorite_set_cache_size: int = 10_000
+    favorite_set_ttl: float = 300.0
+    favorite_set_max_ids: int = 10_000
+    # Seconds between reads of favorite_changes dropping sets changed elsewhere
+    favorite_set_refresh: float = 1.0
+    # Seconds rows of favorite_changes are kept, much longer than the refresh
+    # interval and than the interval between runs of the similar posts job
+    favorite_changes_retention: float = 86_400.0
+
+
+@dataclass
+class SearchConfig:
+    """Full-text search config"""
+
+    # Postgres has no built-in Ukrainian configuration, "simple" only lowercases
+    # words. Switch to a hunspell based one (e.g. "ukrainian") if it is installed.
+    ukrainian_config: str = "simple"
+    english_config: str = "english"
+
+
+@dataclass
+class ArchiveConfig:
+    """Archive of sold posts config"""
+
+    # Sold posts not updated for that many days are moved to the archive
+    sold_days: int = 30
+    batch_size: int = 1000
+
+
+@dataclass
+class AuthConfig:
+    """Access token config"""
+
+    token_ttl: int = 7 * 24 * 3600
+    # Seconds a token revoked by another process may still be accepted
+    revocation_refresh: float = 5.0
+
+
+@dataclass
+class MediaConfig:
+    """Uploaded media config"""
+
+    root: str = "media"
+    image_workers: int = 2
+    max_image_upload: int = 10 * 1024 * 1024
+    max_image_pixels: int = 40_000_000
+
+
+@dataclass
+class RecommendationConfig:
+    """Similar posts config"""
+
+    similar_posts_path: str = "data/similar_posts.npy"
+    # Stored per post, more than shown, as posts sold since the build are skipped
+    similar_posts_k: int = 40
+    # Weight of category similarity next to co-favorite similarity
+    category_weight: float = 0.3
+
+
+@dataclass
+class AdmissionConfig:
+    """Admission control config, limits are per worker"""
+
+    enabled: bool = True
+    read_limit: int = None
+    write_limit: int = None
+    search_limit: int = None
+    export_limit: int = None
+    queue_deadline_ms: float = 200.0
+    retry_after: int = 1
+    max_pool_waiting: int = None
+
+
+@dataclass
+class ProfilingConfig:
+    """SQL profiling config"""
+
+    slow_query_ms: float = 200.0
+    explain_slow_queries: bool = False
+    top_queries: int = 20
 
 
 class Config:
@@ -54,6 +216,8 @@ class Config:
 
     def __init__(self):
         load_dotenv()
+        # Same variable uvicorn reads for the number of workers
+        workers = int(getenv("WEB_CONCURRENCY")) if getenv("WEB_CONCURRENCY") else 1
         self.db = DbConfig(
             db_config=DatabaseConfig(
                 user=self.get_var("DB_USER"),
@@ -61,19 +225,232 @@ class Config:
                 host=self.get_var("DB_HOST"),
                 port=int(self.get_var("DB_PORT")),
                 name=self.get_var("DB_NAME"),
-            )
+                replica_hosts=tuple(
+                    host.strip()
+                    for host in getenv("DB_REPLICA_HOSTS", "").split(",")
+                    if host.strip()
+                ),
+                replica_max_lag=(
+                    float(getenv("DB_REPLICA_MAX_LAG"))
+                    if getenv("DB_REPLICA_MAX_LAG")
+                    else 5.0
+                ),
+                replica_check_interval=(
+                    float(getenv("DB_REPLICA_CHECK_INTERVAL"))
+                    if getenv("DB_REPLICA_CHECK_INTERVAL")
+                    else 5.0
+                ),
+                prepared_statement_cache_size=(
+                    int(getenv("DB_PREPARED_STATEMENT_CACHE_SIZE"))
+                    if getenv("DB_PREPARED_STATEMENT_CACHE_SIZE")
+                    else 100
+                ),
+                query_cache_size=(
+                    int(getenv("DB_QUERY_CACHE_SIZE"))
+                    if getenv("DB_QUERY_CACHE_SIZE")
+                    else 500
+                ),
+                stream_yield_per=(
+                    int(getenv("DB_STREAM_YIELD_PER"))
+                    if getenv("DB_STREAM_YIELD_PER")
+                    else 1000
+                ),
+                pool_size=int(getenv("DB_POOL_SIZE")) if getenv("DB_POOL_SIZE") else 25,
+                max_overflow=(
+                    int(getenv("DB_MAX_OVERFLOW")) if getenv("DB_MAX_OVERFLOW") else 15
+                ),
+                pool_timeout=(
+                    float(getenv("DB_POOL_TIMEOUT")) if getenv("DB_POOL_TIMEOUT") else 30.0
+                ),
+                max_connections=(
+                    int(getenv("DB_MAX_CONNECTIONS"))
+                    if getenv("DB_MAX_CONNECTIONS")
+                    else None
+                ),
+            ),
+            workers=workers,
         )
 
         self.backend = BackendConfig(
             host=getenv("HOST") if getenv("HOST") else "0.0.0.0",
             port=int(getenv("PORT")) if getenv("PORT") else 8080,
+            workers=workers,
+            graceful_shutdown_timeout=(
+                float(getenv("GRACEFUL_SHUTDOWN_TIMEOUT"))
+                if getenv("GRACEFUL_SHUTDOWN_TIMEOUT")
+                else 30.0
+            ),
             secret_key=self.get_var("SECRET_KEY"),
             web_domain=self.get_var("WEB_DOMAIN"),
             logging_level=(
                 getenv("LOGGING_LEVEL") if getenv("LOGGING_LEVEL") else "INFO"
             ),
+            log_format=getenv("LOG_FORMAT") if getenv("LOG_FORMAT") else "json",
+            json_backend=getenv("JSON_BACKEND") if getenv("JSON_BACKEND") else "auto",
+            log_queue_size=(
+                int(getenv("LOG_QUEUE_SIZE")) if getenv("LOG_QUEUE_SIZE") else 10_000
+            ),
+            log_sample_rates=getenv("LOG_SAMPLE_RATES", ""),
+            startup_mode=getenv("STARTUP_MODE") if getenv("STARTUP_MODE") else "dev",
+            log_response_body=getenv("LOG_RESPONSE_BODY", "").lower() == "true",
+            log_body_limit=(
+                int(getenv("LOG_BODY_LIMIT")) if getenv("LOG_BODY_LIMIT") else 1024
+            ),
+            log_body_sample_rate=(
+                float(getenv("LOG_BODY_SAMPLE_RATE"))
+                if getenv("LOG_BODY_SAMPLE_RATE")
+                else 1.0
+            ),
         )
 
+        self.cache = CacheConfig(
+            entity_cache_size=(
+                int(getenv("ENTITY_CACHE_SIZE")) if getenv("ENTITY_CACHE_SIZE") else 10_000
+            ),
+            entity_cache_ttl=(
+                float(getenv("ENTITY_CACHE_TTL")) if getenv("ENTITY_CACHE_TTL") else 60.0
+            ),
+            singleflight_timeout=(
+                float(getenv("SINGLEFLIGHT_TIMEOUT"))
+                if getenv("SINGLEFLIGHT_TIMEOUT")
+                else 5.0
+            ),
+            response_cache_size=(
+                int(getenv("RESPONSE_CACHE_SIZE")) if getenv("RESPONSE_CACHE_SIZE") else 256
+            ),
+            response_cache_ttl=(
+                float(getenv("RESPONSE_CACHE_TTL")) if getenv("RESPONSE_CACHE_TTL") else 1.0
+            ),
+            response_cache_max_body=(
+                int(getenv("RESPONSE_CACHE_MAX_BODY"))
+                if getenv("RESPONSE_CACHE_MAX_BODY")
+                else 256 * 1024
+            ),
+            favorite_set_cache_size=(
+                int(getenv("FAVORITE_SET_CACHE_SIZE"))
+                if getenv("FAVORITE_SET_CACHE_SIZE")
+                else 10_000
+            ),
+            favorite_set_ttl=(
+                float(getenv("FAVORITE_SET_TTL")) if getenv("FAVORITE_SET_TTL") else 300.0
+            ),
+            favorite_set_max_ids=(
+                int(getenv("FAVORITE_SET_MAX_IDS"))
+                if getenv("FAVORITE_SET_MAX_IDS")
+                else 10_000
+            ),
+            favorite_set_refresh=(
+                float(getenv("FAVORITE_SET_REFRESH"))
+                if getenv("FAVORITE_SET_REFRESH")
+                else 1.0
+            ),
+            favorite_changes_retention=(
+                float(getenv("FAVORITE_CHANGES_RETENTION"))
+                if getenv("FAVORITE_CHANGES_RETENTION")
+                else 86_400.0
+            ),
+        )
+        self.search = SearchConfig(
+            ukrainian_config=(
+                getenv("SEARCH_UKRAINIAN_CONFIG")
+                if getenv("SEARCH_UKRAINIAN_CONFIG")
+                else "simple"
+            ),
+        )
+        self.archive = ArchiveConfig(
+            sold_days=(
+                int(getenv("ARCHIVE_AFTER_DAYS")) if getenv("ARCHIVE_AFTER_DAYS") else 30
+            ),
+            batch_size=(
+                int(getenv("ARCHIVE_BATCH_SIZE")) if getenv("ARCHIVE_BATCH_SIZE") else 1000
+            ),
+        )
+        self.auth = AuthConfig(
+            token_ttl=(
+                int(getenv("AUTH_TOKEN_TTL")) if getenv("AUTH_TOKEN_TTL") else 7 * 24 * 3600
+            ),
+            revocation_refresh=(
+                float(getenv("AUTH_REVOCATION_REFRESH"))
+                if getenv("AUTH_REVOCATION_REFRESH")
+                else 5.0
+            ),
+        )
+        self.media = MediaConfig(
+            root=getenv("MEDIA_ROOT") if getenv("MEDIA_ROOT") else "media",
+            image_workers=(
+                int(getenv("IMAGE_WORKERS")) if getenv("IMAGE_WORKERS") else 2
+            ),
+            max_image_upload=(
+                int(getenv("MAX_IMAGE_UPLOAD"))
+                if getenv("MAX_IMAGE_UPLOAD")
+                else 10 * 1024 * 1024
+            ),
+            max_image_pixels=(
+                int(getenv("MAX_IMAGE_PIXELS"))
+                if getenv("MAX_IMAGE_PIXELS")
+                else 40_000_000
+            ),
+        )
+        self.recommendations = RecommendationConfig(
+            similar_posts_path=(
+                getenv("SIMILAR_POSTS_PATH")
+                if getenv("SIMILAR_POSTS_PATH")
+                else "data/similar_posts.npy"
+            ),
+            similar_posts_k=(
+                int(getenv("SIMILAR_POSTS_K")) if getenv("SIMILAR_POSTS_K") else 40
+            ),
+            category_weight=(
+                float(getenv("SIMILAR_POSTS_CATEGORY_WEIGHT"))
+                if getenv("SIMILAR_POSTS_CATEGORY_WEIGHT")
+                else 0.3
+            ),
+        )
+        # Default limits keep concurrent requests around the size of the pool
+        pool_capacity = self.db.pool_size + self.db.max_overflow
+        self.admission = AdmissionConfig(
+            enabled=getenv("ADMISSION_ENABLED", "true").lower() == "true",
+            read_limit=(
+                int(getenv("ADMISSION_READ_LIMIT"))
+                if getenv("ADMISSION_READ_LIMIT")
+                else pool_capacity
+            ),
+            write_limit=(
+                int(getenv("ADMISSION_WRITE_LIMIT"))
+                if getenv("ADMISSION_WRITE_LIMIT")
+                else max(1, pool_capacity // 2)
+            ),
+            search_limit=(
+                int(getenv("ADMISSION_SEARCH_LIMIT"))
+                if getenv("ADMISSION_SEARCH_LIMIT")
+                else max(1, pool_capacity // 4)
+            ),
+            export_limit=(
+                int(getenv("ADMISSION_EXPORT_LIMIT"))
+                if getenv("ADMISSION_EXPORT_LIMIT")
+                else max(1, pool_capacity // 4)
+            ),
+            queue_deadline_ms=(
+                float(getenv("ADMISSION_QUEUE_DEADLINE_MS"))
+                if getenv("ADMISSION_QUEUE_DEADLINE_MS")
+                else 200.0
+            ),
+            retry_after=(
+                int(getenv("ADMISSION_RETRY_AFTER")) if getenv("ADMISSION_RETRY_AFTER") else 1
+            ),
+            max_pool_waiting=(
+                int(getenv("ADMISSION_MAX_POOL_WAITING"))
+                if getenv("ADMISSION_MAX_POOL_WAITING")
+                else pool_capacity
+            ),
+        )
+        self.profiling = ProfilingConfig(
+            slow_query_ms=(
+                float(getenv("SLOW_QUERY_MS")) if getenv("SLOW_QUERY_MS") else 200.0
+            ),
+            explain_slow_queries=getenv("EXPLAIN_SLOW_QUERIES", "").lower() == "true",
+            top_queries=int(getenv("TOP_QUERIES")) if getenv("TOP_QUERIES") else 20,
+        )
 
     @staticmethod
     def get_var(item: str):
@@ -0,0 +1,130 @@
+"""
+Versioned schema migrations.
+
+Migrations are modules named ``v<version>_<name>.py`` in a package, each
+with ``async def upgrade(conn: AsyncConnection)``. Applied versions are kept
+in ``schema_version``. Every migration runs in its own transaction and an
+advisory lock keeps concurrent runners from applying the same migration twice.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_MODULE_NAME = re.compile(r"^v(\d+)_(\w+)$")
+_TRIGGER = re.compile(r"CREATE TRIGGER (\w+)\b.*?\bON (\w+)", re.DOTALL)
+# Arbitrary key of the advisory lock held while migrating
+_LOCK_KEY = 718_300_001
+
+CREATE_VERSION_TABLE = text(
+    "CREATE TABLE IF NOT EXISTS schema_version ("
+    "version INTEGER PRIMARY KEY, "
+    "name TEXT NOT NULL, "
+    "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+)
+VERSION_TABLE_EXISTS = text("SELECT to_regclass('schema_version') IS NOT NULL")
+CURRENT_VERSION = text("SELECT max(version) FROM schema_version")
+
+
+class SchemaOutdated(Exception):
+    """Database schema is older than the code expects"""
+
+
+@dataclass
+class Migration:
+    """Schema migration"""
+
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def load_migrations(package: str) -> list[Migration]:
+    """Returns migrations of package ordered by version"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(importlib.import_module(package).__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if match is None:
+            continue
+        module = importlib.import_module(f"{package}.{module_info.name}")
+        migrations.append(Migration(int(match[1]), match[2], module.upgrade))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in {package}: {versions}")
+    return migrations
+
+
+async def recreate_triggers(conn: AsyncConnection, statements: Iterable[str]) -> None:
+    """
+    Executes DDL statements, dropping every trigger before it is created
+
+    CREATE TRIGGER has no OR REPLACE before PostgreSQL 14, functions are
+    replaced by their own CREATE OR REPLACE.
+    """
+    for statement in statements:
+        trigger = _TRIGGER.search(statement)
+        if trigger:
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger[1]} ON {trigger[2]}"))
+        await conn.execute(text(statement))
+
+
+async def current_version(engine: AsyncEngine) -> Optional[int]:
+    """Returns latest applied version or None for a database never migrated"""
+    async with engine.connect() as conn:
+        if not await conn.scalar(VERSION_TABLE_EXISTS):
+            return None
+        return await conn.scalar(CURRENT_VERSION)
+
+
+async def check_version(engine: AsyncEngine, migrations: list[Migration]) -> None:
+    """Raises SchemaOutdated unless all migrations are applied"""
+    expected = migrations[-1].version if migrations else None
+    version = await current_version(engine)
+    if expected is not None and (version is None or version < expected):
+        raise SchemaOutdated(
+            f"Database schema version is {version}, expected {expected}. "
+            "Run migrations: python -m API.app.jobs.migrate"
+        )
+    if version is not None and expected is not None and version > expected:
+        logging.warning(
+            "Database schema version %s is newer than expected %s", version, expected
+        )
+
+
+async def migrate(engine: AsyncEngine, migrations: list[Migration]) -> list[Migration]:
+    """Applies pending migrations and returns them"""
+    applied = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _LOCK_KEY})
+        await conn.commit()
+        try:
+            await conn.execute(CREATE_VERSION_TABLE)
+            done = set((await conn.scalars(text("SELECT version FROM schema_version"))).all())
+            await conn.commit()
+            for migration in migrations:
+                if migration.version in done:
+                    continue
+                logging.info("Applying migration %s %s", migration.version, migration.name)
+                await migration.upgrade(conn)
+                await conn.execute(
+                    text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                    {"version": migration.version, "name": migration.name},
+                )
+                await conn.commit()
+                applied.append(migration)
+        finally:
+            await conn.rollback()
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+            await conn.commit()
+    return applied
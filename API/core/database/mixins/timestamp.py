@@ -1,5 +1,6 @@
 """Timestamp mixin for models"""
 
+from sqlalchemy import DDL
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import func
@@ -16,6 +17,7 @@ class TimestampMixin:
         return Column(
             DateTime(timezone=True),
             default=func.now(),
+            server_default=func.now(),
             nullable=False,
         )
 
@@ -25,6 +27,37 @@ class TimestampMixin:
         return Column(
             DateTime(timezone=True),
             default=func.now(),  # pylint: disable=E1102
+            server_default=func.now(),  # pylint: disable=E1102
             onupdate=func.now(),  # pylint: disable=E1102
             nullable=False,
         )
+
+
+TOUCH_UPDATED_AT_FUNCTION = DDL(
+    """
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+
+def touch_updated_at_ddl(table: str) -> list[DDL]:
+    """
+    Returns DDL of trigger setting ``updated_at`` on every UPDATE of table
+
+    ``onupdate`` covers ORM writes only, the trigger also covers UPDATE
+    statements run by other triggers, jobs and migrations.
+    """
+    return [
+        TOUCH_UPDATED_AT_FUNCTION,
+        DDL(
+            f"CREATE TRIGGER {table}_touch_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION touch_updated_at()"
+        ),
+    ]
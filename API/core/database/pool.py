@@ -0,0 +1,55 @@
+"""Instrumented connection pool"""
+
+from time import perf_counter
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from API.core.metrics import POOL_CHECKED_OUT
+from API.core.metrics import POOL_OVERFLOW
+from API.core.metrics import POOL_SIZE
+from API.core.metrics import POOL_TIMEOUTS
+from API.core.metrics import POOL_WAIT
+from API.core.metrics import POOL_WAITING
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool which records checkout wait time and timeouts"""
+
+    metrics_name = "primary"
+    # Checkouts in progress, read by admission control
+    waiting = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start_time = perf_counter()
+        self.waiting += 1
+        POOL_WAITING.inc(self.metrics_name)
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(self.metrics_name)
+            raise
+        finally:
+            self.waiting -= 1
+            POOL_WAITING.dec(self.metrics_name)
+            POOL_WAIT.observe(perf_counter() - start_time, self.metrics_name)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def register_pool_metrics(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Adds gauges reading pool state of engine on scrape.
+
+    Gauges read ``engine.pool`` on every scrape because ``dispose()``
+    replaces the pool of the engine.
+    """
+    engine.pool.metrics_name = name
+    POOL_SIZE.set_function(lambda: engine.pool.size(), name)
+    POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout(), name)
+    POOL_OVERFLOW.set_function(lambda: engine.pool.overflow(), name)
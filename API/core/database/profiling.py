@@ -0,0 +1,151 @@
+"""Per-request SQL profiling and slow query capture"""
+
+import logging
+import re
+from contextvars import ContextVar
+from contextvars import Token
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_PARAMETER = r"(?:\$\d+|%\([^)]+\)s|\?)(?:::\w+(?:\[\])?)?"
+_PARAMETER_LISTS = re.compile(rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})+\s*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![\w$])\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+@dataclass
+class QueryStats:
+    """Statements executed during one request"""
+
+    statements: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class QueryShape:
+    """Aggregated timings of one normalized statement"""
+
+    sql: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def start_request_profile() -> tuple[QueryStats, Token]:
+    """Starts counting statements of current request"""
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def stop_request_profile(token: Token) -> None:
+    """Stops counting statements of current request"""
+    _request_stats.reset(token)
+
+
+def normalize_sql(statement: str) -> str:
+    """Returns statement shape with literals and parameter lists collapsed"""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PARAMETER_LISTS.sub("(...)", statement)
+    return _LITERALS.sub("?", statement)
+
+
+class SlowQueryLog:
+    """Slow query shapes of this process"""
+
+    def __init__(self, threshold_ms: float, explain: bool = False, max_shapes: int = 1000):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.max_shapes = max_shapes
+        self.shapes: dict[str, QueryShape] = {}
+
+    def record(self, statement: str, duration: float) -> Optional[str]:
+        """Records slow statement and returns its shape"""
+        sql = normalize_sql(statement)
+        shape = self.shapes.get(sql)
+        if shape is None:
+            if len(self.shapes) >= self.max_shapes:
+                return sql
+            shape = self.shapes[sql] = QueryShape(sql)
+        shape.count += 1
+        shape.total += duration
+        shape.max = max(shape.max, duration)
+        return sql
+
+    def top(self, limit: int = 10) -> list[dict]:
+        """Returns slowest shapes by max duration"""
+        shapes = sorted(self.shapes.values(), key=lambda shape: shape.max, reverse=True)
+        return [
+            {
+                "sql": shape.sql,
+                "count": shape.count,
+                "max_ms": round(shape.max * 1000, 3),
+                "mean_ms": round(shape.total / shape.count * 1000, 3),
+            }
+            for shape in shapes[:limit]
+        ]
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    Returns EXPLAIN output of statement using a separate cursor.
+
+    EXPLAIN runs inside a savepoint, so its failure can not abort the
+    transaction of the request.
+    """
+    if not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:  # pylint: disable=W0718
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logging.debug("EXPLAIN of slow query failed", exc_info=True)
+            return None
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception:  # pylint: disable=W0718
+        logging.debug("EXPLAIN of slow query failed", exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_log: SlowQueryLog) -> None:
+    """Adds statement timing to engine"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=W0613,R0913
+        conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # pylint: disable=W0613,R0913
+        duration = perf_counter() - conn.info["query_start_time"].pop()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.duration += duration
+        if duration < slow_query_log.threshold:
+            return
+        sql = slow_query_log.record(statement, duration)
+        plan = None
+        if slow_query_log.explain and not executemany:
+            plan = _explain(conn, statement, parameters)
+        logging.warning(
+            "Slow query %.1f ms: %s%s",
+            duration * 1000,
+            sql,
+            f"\n{plan}" if plan else "",
+        )
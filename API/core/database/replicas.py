@@ -0,0 +1,125 @@
+"""Read replica selection and health monitoring"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from API.core.metrics import REPLICA_HEALTHY
+from API.core.metrics import REPLICA_LAG
+
+# Lag is zero while replica has replayed everything it received, otherwise
+# it is the age of the last replayed transaction. On a server which is not
+# in recovery both functions return NULL.
+_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class Replica:
+    """Read replica engine with its last known state"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # None until first check
+        self.healthy: Optional[bool] = None
+        self.lag: Optional[float] = None
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def handle_error(context):
+            # Stop routing reads to replica until next successful check
+            if context.is_disconnect:
+                self.mark(healthy=False)
+
+    def mark(self, healthy: bool, lag: Optional[float] = None) -> None:
+        """Updates replica state"""
+        if healthy != self.healthy:
+            logging.warning(
+                "Replica %s is %s", self.name, "healthy" if healthy else "unhealthy"
+            )
+        self.healthy = healthy
+        self.lag = lag
+        REPLICA_HEALTHY.set(int(healthy), self.name)
+        if lag is not None:
+            REPLICA_LAG.set(lag, self.name)
+
+
+class ReplicaSet:
+    """
+    Replicas used for reads.
+
+    Replicas are checked every ``check_interval`` seconds once ``start()``
+    has been awaited. Reads go to the least busy healthy replica which lags
+    at most ``max_lag`` seconds, or to primary when there is none.
+    """
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        max_lag: float = 5.0,
+        check_interval: float = 5.0,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Returns replica engine for a read or None for primary"""
+        candidates = [
+            replica
+            for replica in self.replicas
+            if replica.healthy and replica.lag is not None and replica.lag <= self.max_lag
+        ]
+        if not candidates:
+            return None
+        replica = min(candidates, key=lambda replica: replica.engine.pool.checkedout())
+        return replica.engine
+
+    async def check(self) -> None:
+        """Updates health and lag of all replicas"""
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def start(self) -> None:
+        """Checks replicas and starts monitoring them"""
+        if not self.replicas or self._task is not None:
+            return
+        await self.check()
+        self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Stops monitoring and disposes replica engines"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _monitor(self) -> None:
+        """Checks replicas periodically"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    async def _check(self, replica: Replica) -> None:
+        """Updates health and lag of replica"""
+        try:
+            async with asyncio.timeout(self.check_interval):
+                async with replica.engine.connect() as conn:
+                    lag = await conn.scalar(_LAG_QUERY)
+        except Exception:  # pylint: disable=W0718
+            logging.debug("Replica %s check failed", replica.name, exc_info=True)
+            replica.mark(healthy=False)
+            return
+        replica.mark(healthy=True, lag=float(lag))
@@ -0,0 +1,56 @@
+"""Session routing reads to replicas"""
+
+from typing import Optional
+
+from sqlalchemy import Select
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session as SyncSession
+
+from API.core.database.replicas import ReplicaSet
+
+PIN_PRIMARY = "pin_primary"
+REPLICA_ENGINE = "replica_engine"
+# Bind arguments of reads which may go to a replica
+REPLICA = {"replica": True}
+
+
+class RoutingSession(SyncSession):
+    """
+    Session which sends reads marked with ``bind_arguments={"replica": True}``
+    to a replica.
+
+    Everything else goes to primary. Once the session flushes or executes
+    a statement other than SELECT it is pinned to primary, so later reads
+    of the same session see its own writes. A session keeps the replica it
+    has chosen first, so its reads do not jump between replicas with
+    different lag.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, replica: bool = False, **kwargs):
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info[PIN_PRIMARY] = True
+        elif (
+            replica
+            and self.replicas is not None
+            and not self.info.get(PIN_PRIMARY)
+            and clause is not None
+            and clause._for_update_arg is None  # pylint: disable=W0212
+        ):
+            engine = self.info.get(REPLICA_ENGINE) or self.replicas.choose()
+            if engine is not None:
+                self.info[REPLICA_ENGINE] = engine
+                return engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _eager_loads_follow_parent(orm_execute_state: ORMExecuteState) -> None:
+    """Sends selectin loads of a replica read to the same replica"""
+    parent = orm_execute_state.execution_options.get("sa_top_level_orm_context")
+    if parent is not None and parent.bind_arguments.get("replica"):
+        orm_execute_state.bind_arguments["replica"] = True
@@ -1,20 +1,61 @@
 """Database session and utils"""
 
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from API.core.config import config
-from API.core.database.jsonencoder import custom_serializer
-
-engine = create_async_engine(
-    config.db.url,
-    json_serializer=custom_serializer,
-    pool_size=25,  # Number of connections to keep in the pool
-    max_overflow=15,  # Additional connections allowed beyond pool_size
-    pool_timeout=30,  # Timeout for getting a connection from the pool
+from API.core.database.pool import InstrumentedQueuePool
+from API.core.database.pool import register_pool_metrics
+from API.core.database.profiling import SlowQueryLog
+from API.core.database.profiling import instrument_engine
+from API.core.database.replicas import Replica
+from API.core.database.replicas import ReplicaSet
+from API.core.database.routing import RoutingSession
+from API.core.serialization import dumps_str
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=config.profiling.slow_query_ms,
+    explain=config.profiling.explain_slow_queries,
+)
+
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """Returns instrumented engine for database url"""
+    engine_ = create_async_engine(
+        url,
+        json_serializer=dumps_str,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.db.pool_size,  # Number of connections to keep in the pool
+        max_overflow=config.db.max_overflow,  # Additional connections allowed beyond pool_size
+        pool_timeout=config.db.pool_timeout,  # Timeout for getting a connection from the pool
+        query_cache_size=config.db.query_cache_size,
+        connect_args={
+            "prepared_statement_cache_size": config.db.prepared_statement_cache_size,
+        },
+    )
+    instrument_engine(engine_, slow_query_log)
+    register_pool_metrics(engine_, name)
+    return engine_
+
+
+engine = create_engine(config.db.url, "primary")
+replica_set = ReplicaSet(
+    [
+        Replica(host, create_engine(url, f"replica:{host}"))
+        for host, url in zip(config.db.replica_hosts, config.db.replica_urls)
+    ],
+    max_lag=config.db.replica_max_lag,
+    check_interval=config.db.replica_check_interval,
+)
+Session = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set,
+    expire_on_commit=False,
 )
-Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_session():
@@ -9,6 +9,7 @@ class CustomException(Exception):
     code = HTTPStatus.BAD_GATEWAY
     error_code = HTTPStatus.BAD_GATEWAY
     message = HTTPStatus.BAD_GATEWAY.description
+    headers = None
 
     def __init__(self, message=None):
         if message:
@@ -69,3 +70,41 @@ class MethodNotImplementedException(CustomException):
     code = HTTPStatus.NOT_IMPLEMENTED
     error_code = HTTPStatus.NOT_IMPLEMENTED
     message = HTTPStatus.NOT_IMPLEMENTED.description
+
+
+class ServiceUnavailableException(CustomException):
+    """Service unavailable exception."""
+
+    code = HTTPStatus.SERVICE_UNAVAILABLE
+    error_code = HTTPStatus.SERVICE_UNAVAILABLE
+    message = HTTPStatus.SERVICE_UNAVAILABLE.description
+
+    def __init__(self, message=None, retry_after: int = 1):
+        super().__init__(message)
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+class DatabaseBusyException(ServiceUnavailableException):
+    """No database connection became free in time."""
+
+    message = "Database is busy, try again later"
+
+
+class ReadTimeoutException(ServiceUnavailableException):
+    """Shared read did not finish in time."""
+
+    message = "Read timed out, try again later"
+
+
+class PayloadTooLargeException(CustomException):
+    """Payload too large exception."""
+
+    code = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    error_code = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    message = HTTPStatus.REQUEST_ENTITY_TOO_LARGE.description
+
+
+class InvalidTokenException(UnauthorizedException):
+    """Access token is missing, invalid, expired or revoked."""
+
+    headers = {"WWW-Authenticate": "Bearer"}
@@ -0,0 +1,203 @@
+"""
+Non-blocking structured logging.
+
+Records are put into a bounded queue on the calling thread and formatted
+and written by a QueueListener thread, so a slow stdout or disk never blocks
+the event loop. Records which do not fit into the queue are dropped and
+counted. Sensitive fields are redacted by the formatter.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from datetime import timezone
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from typing import Any
+from typing import Optional
+
+REDACTED = "[REDACTED]"
+SENSITIVE_KEYS = frozenset(
+    {
+        "authorization",
+        "proxy-authorization",
+        "cookie",
+        "set-cookie",
+        "x-api-key",
+        "credit_card_number",
+        "password",
+        "secret_key",
+    }
+)
+_SENSITIVE_TEXT = (
+    (re.compile(r'("credit_card_number"\s*:\s*)"[^"]*"'), rf'\1"{REDACTED}"'),
+    (re.compile(r"(?i)(bearer|basic)\s+[\w.~+/=-]+"), rf"\1 {REDACTED}"),
+)
+# Attributes of every LogRecord, everything else was passed in ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+def redact(value: Any) -> Any:
+    """Returns value with sensitive fields replaced"""
+    if isinstance(value, Mapping):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8", errors="replace")
+    if isinstance(value, str):
+        for pattern, replacement in _SENSITIVE_TEXT:
+            value = pattern.sub(replacement, value)
+    return value
+
+
+def record_fields(record: logging.LogRecord) -> dict[str, Any]:
+    """Returns fields passed to a log call in ``extra``"""
+    return {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRIBUTES
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        entry.update(redact(record_fields(record)))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formats records as text followed by their redacted fields"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = redact(super().format(record))
+        fields = record_fields(record)
+        if fields:
+            text += " " + json.dumps(redact(fields), ensure_ascii=False, default=str)
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a share of records per level, e.g. {logging.INFO: 0.1}"""
+
+    def __init__(self, rates: dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler which drops records when the queue is full"""
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        # Level name -> records dropped
+        self.dropped: dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Args are rendered now, as they may change before the listener thread
+        # gets to them. Formatting and tracebacks are left to the listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class DrainingQueueListener(QueueListener):
+    """Queue listener which writes all queued records before it stops"""
+
+    def enqueue_sentinel(self) -> None:
+        # Blocks until the listener thread frees a place in a full queue
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+def parse_sample_rates(value: Optional[str]) -> dict[int, float]:
+    """
+    Returns sample rates of "DEBUG=0.1,INFO=0.5" by level number
+
+    :raises ValueError: Item is not LEVEL=rate, level is unknown or rate is
+        not between 0 and 1.
+    """
+    rates = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        level, separator, rate = item.partition("=")
+        number = logging.getLevelName(level.strip().upper())
+        if not separator or not isinstance(number, int):
+            raise ValueError(f"Invalid log sample rate {item.strip()!r}, expected LEVEL=rate")
+        rates[number] = float(rate)
+        if not 0 <= rates[number] <= 1:
+            raise ValueError(f"Log sample rate of {level.strip()} must be between 0 and 1")
+    return rates
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    json_format: bool = True,
+    queue_size: int = 10_000,
+    sample_rates: Optional[dict[int, float]] = None,
+) -> QueueListener:
+    """
+    Routes all records of the process through a bounded queue.
+
+    The listener is stopped at exit, writing records left in the queue.
+    """
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if json_format else TextFormatter())
+    handler = BoundedQueueHandler(queue_size)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+    root.setLevel(level)
+    listener = DrainingQueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def dropped_records(level: str) -> int:
+    """Returns records of level dropped by queue handlers of root logger"""
+    return sum(
+        getattr(handler, "dropped", {}).get(level, 0)
+        for handler in logging.getLogger().handlers
+    )
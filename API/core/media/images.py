@@ -0,0 +1,121 @@
+"""Content-addressed image variants on local disk"""
+
+import asyncio
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from typing import Optional
+
+from API.core.cache.singleflight import SingleFlight
+from API.core.config import config
+from API.core.exceptions.base import MethodNotImplementedException
+from API.core.exceptions.base import UnprocessableEntity
+from API.core.media import render
+
+# Name -> longest side in pixels, ordered from smallest
+IMAGE_SIZES = {"small": 160, "medium": 480, "large": 1080}
+URL_PREFIX = "/media/images"
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+def image_variants(image_url: Optional[str]) -> Optional[dict[str, str]]:
+    """Returns URLs of variants by size name of an uploaded image URL"""
+    if not image_url or not image_url.startswith(f"{URL_PREFIX}/"):
+        return None
+    return {name: f"{image_url}/{name}.{render.FORMAT}" for name in IMAGE_SIZES}
+
+
+class ImageStore:
+    """
+    Resized variants of uploaded images stored by SHA-256 of the upload.
+
+    Variants of an upload live in ``root/<2 hex>/<sha256>/<size>.webp`` and
+    never change, so an image uploaded again, or concurrently, is processed
+    once. Decoding and resizing run in a pool of spawned processes, off the
+    event loop and outside of the GIL.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        sizes: Optional[dict[str, int]] = None,
+        workers: int = 2,
+        max_pixels: Optional[int] = 40_000_000,
+    ):
+        self.root = root
+        self.sizes = sizes or IMAGE_SIZES
+        self.workers = workers
+        self.max_pixels = max_pixels
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._flight: SingleFlight = SingleFlight("images")
+
+    @staticmethod
+    def url(digest: str) -> str:
+        """Returns URL of image, variants are below it"""
+        return f"{URL_PREFIX}/{digest}"
+
+    def directory(self, digest: str) -> str:
+        """Returns directory of image variants"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def path(self, digest: str, variant: str) -> Optional[str]:
+        """Returns path of variant file such as ``small.webp`` or None"""
+        name, _, extension = variant.partition(".")
+        if (
+            not _DIGEST.fullmatch(digest)
+            or name not in self.sizes
+            or extension != render.FORMAT
+        ):
+            return None
+        return os.path.join(self.directory(digest), variant)
+
+    async def ingest(self, data: bytes) -> str:
+        """
+        Stores variants of image and returns its digest
+
+        :raises UnprocessableEntity: Data is not a supported image.
+        """
+        if not render.available():
+            raise MethodNotImplementedException("Image processing needs Pillow")
+        digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        await self._flight.do(digest, partial(self._render, digest, data))
+        return digest
+
+    def shutdown(self) -> None:
+        """Stops worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _render(self, digest: str, data: bytes) -> None:
+        """Renders variants unless they exist"""
+        directory = self.directory(digest)
+        # Variants are renamed into place in order, the last one marks completion
+        last = os.path.join(directory, f"{list(self.sizes)[-1]}.{render.FORMAT}")
+        if await asyncio.to_thread(os.path.exists, last):
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn")
+            )
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                render.render_variants,
+                data,
+                directory,
+                self.sizes,
+                self.max_pixels,
+            )
+        except ValueError as exc:
+            raise UnprocessableEntity(f"Not a supported image: {exc}") from exc
+
+
+image_store = ImageStore(
+    config.media.root,
+    workers=config.media.image_workers,
+    max_pixels=config.media.max_image_pixels,
+)
@@ -0,0 +1,68 @@
+"""
+Image decoding and resizing, run in worker processes.
+
+Imports nothing but Pillow, so spawned workers start quickly and do not
+read the app config.
+"""
+
+import io
+import os
+import tempfile
+from typing import Optional
+
+try:
+    from PIL import Image
+    from PIL import ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+FORMAT = "webp"
+
+
+def available() -> bool:
+    """Returns whether Pillow is installed"""
+    return Image is not None
+
+
+def render_variants(
+    data: bytes, directory: str, sizes: dict[str, int], max_pixels: Optional[int]
+) -> list[str]:
+    """
+    Writes variants of image scaled to fit ``sizes`` into directory
+
+    Images are never scaled up. Files are written to a temporary name and
+    renamed, so readers never see a partial file.
+
+    :return: Names of written sizes.
+    :raises ValueError: Data is not a supported image or has too many pixels.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            # Pillow only warns up to twice its limit, size is read from the
+            # header before any pixel is decoded
+            if max_pixels and original.width * original.height > max_pixels:
+                raise ValueError(
+                    f"Image has {original.width}x{original.height} pixels, "
+                    f"more than {max_pixels}"
+                )
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except (OSError, Image.DecompressionBombError) as exc:
+        # Pillow exceptions may not pickle back to the parent process
+        raise ValueError(str(exc)) from None
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    os.makedirs(directory, exist_ok=True)
+    for name, size in sizes.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+            try:
+                variant.save(file, FORMAT.upper(), quality=80, method=4)
+            except Exception:
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, os.path.join(directory, f"{name}.{FORMAT}"))
+    return list(sizes)
@@ -0,0 +1,38 @@
+"""File responses"""
+
+import os
+
+from starlette.responses import FileResponse
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+class PathSendFileResponse(FileResponse):
+    """
+    File response which hands whole files to the server.
+
+    With servers supporting the ASGI ``http.response.pathsend`` extension the
+    server sends the file itself (e.g. with sendfile) instead of the app
+    reading and sending it in chunks. Other servers and range requests get
+    the regular chunked response.
+    """
+
+    pathsend = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.pathsend = "http.response.pathsend" in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not self.pathsend or send_header_only:
+            await super()._handle_simple(send, send_header_only)
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
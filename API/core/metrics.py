@@ -0,0 +1,331 @@
+"""
+Prometheus metrics.
+
+Metrics are plain counters updated from the event loop thread without
+locks; the cost of a record on the hot path is a dict lookup and a few
+integer additions. Values are rendered in Prometheus text format on scrape.
+"""
+
+from abc import ABC
+from abc import abstractmethod
+from bisect import bisect_left
+from functools import partial
+from typing import Callable
+from typing import Iterable
+
+from API.core.logs import dropped_records
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    """Returns label value escaped for Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    """Returns labels in Prometheus text format"""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    """Base class for metrics"""
+
+    type_ = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        """Returns (suffix, labels, value) samples"""
+
+    def render(self) -> str:
+        """Returns metric in Prometheus text format"""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type_}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {value}" for suffix, labels, value in self.samples()
+        )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing counter"""
+
+    type_ = "counter"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        super().__init__(name, description, labels)
+        self.values: dict[tuple, float] = {}
+        self.callbacks: dict[tuple, Callable[[], float]] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        """Increments counter for label values"""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_function(self, callback: Callable[[], float], *labels) -> None:
+        """Reads counter kept elsewhere for label values on scrape"""
+        self.callbacks[labels] = callback
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        for labels, value in self.values.items():
+            yield "", _format_labels(self.labels, labels), value
+        for labels, callback in self.callbacks.items():
+            yield "", _format_labels(self.labels, labels), callback()
+
+
+class Gauge(Metric):
+    """Value which goes up and down or is read on scrape"""
+
+    type_ = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Iterable[str] = ()):
+        super().__init__(name, description, labels)
+        self.values: dict[tuple, float] = {}
+        self.callbacks: dict[tuple, Callable[[], float]] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        """Increments gauge for label values"""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        """Decrements gauge for label values"""
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels) -> None:
+        """Sets gauge for label values"""
+        self.values[labels] = value
+
+    def set_function(self, callback: Callable[[], float], *labels) -> None:
+        """Reads gauge for label values from callback on scrape"""
+        self.callbacks[labels] = callback
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        for labels, value in self.values.items():
+            yield "", _format_labels(self.labels, labels), value
+        for labels, callback in self.callbacks.items():
+            yield "", _format_labels(self.labels, labels), callback()
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets rendered on scrape"""
+
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        # labels -> [bucket counts..., +Inf count, sum]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        """Records observed value for label values"""
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        for labels, counts in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield "_bucket", _format_labels(self.labels + ("le",), labels + (le,)), cumulative
+            yield "_sum", _format_labels(self.labels, labels), counts[-1]
+            yield "_count", _format_labels(self.labels, labels), cumulative
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds metric to registry"""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Returns all metrics in Prometheus text format"""
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route",
+        labels=("method", "route"),
+    )
+)
+REQUESTS = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status",
+        labels=("method", "route", "status"),
+    )
+)
+REQUESTS_IN_FLIGHT = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being processed")
+)
+EXCEPTIONS = registry.register(
+    Counter(
+        "app_exceptions_total",
+        "Exceptions turned into error responses by error code",
+        labels=("error_code",),
+    )
+)
+POOL_WAIT = registry.register(
+    Histogram(
+        "db_pool_wait_seconds",
+        "Time spent waiting for a database connection",
+        labels=("pool",),
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+    )
+)
+POOL_WAITING = registry.register(
+    Gauge(
+        "db_pool_waiting",
+        "Requests waiting for a database connection",
+        labels=("pool",),
+    )
+)
+POOL_TIMEOUTS = registry.register(
+    Counter(
+        "db_pool_timeouts_total",
+        "Database connection checkout timeouts",
+        labels=("pool",),
+    )
+)
+POOL_SIZE = registry.register(
+    Gauge("db_pool_size", "Connections kept in the pool", labels=("pool",))
+)
+POOL_CHECKED_OUT = registry.register(
+    Gauge(
+        "db_pool_checked_out",
+        "Connections currently checked out of the pool",
+        labels=("pool",),
+    )
+)
+POOL_OVERFLOW = registry.register(
+    Gauge(
+        "db_pool_overflow",
+        "Connections opened beyond pool_size, negative while the pool is not full",
+        labels=("pool",),
+    )
+)
+REPLICA_HEALTHY = registry.register(
+    Gauge(
+        "db_replica_healthy",
+        "Whether replica is used for reads",
+        labels=("replica",),
+    )
+)
+REPLICA_LAG = registry.register(
+    Gauge(
+        "db_replica_lag_seconds",
+        "Replication lag of replica at last health check",
+        labels=("replica",),
+    )
+)
+STARTUP_DURATION = registry.register(
+    Gauge("app_startup_seconds", "Seconds from process start until startup finished")
+)
+COLD_START_DURATION = registry.register(
+    Gauge(
+        "app_cold_start_seconds",
+        "Seconds from process start until the first request was served",
+    )
+)
+ADMISSION_IN_FLIGHT = registry.register(
+    Gauge(
+        "admission_in_flight",
+        "Admitted requests being processed by route class",
+        labels=("route_class",),
+    )
+)
+ADMISSION_QUEUED = registry.register(
+    Gauge(
+        "admission_queued",
+        "Requests waiting for admission by route class",
+        labels=("route_class",),
+    )
+)
+ADMISSION_REJECTED = registry.register(
+    Counter(
+        "admission_rejected_total",
+        "Requests rejected with 503 by route class and reason",
+        labels=("route_class", "reason"),
+    )
+)
+SINGLEFLIGHT_CALLS = registry.register(
+    Counter(
+        "singleflight_calls_total",
+        "Calls made by single-flight groups",
+        labels=("group",),
+    )
+)
+SINGLEFLIGHT_COALESCED = registry.register(
+    Counter(
+        "singleflight_coalesced_total",
+        "Callers which shared the result of a call already in flight",
+        labels=("group",),
+    )
+)
+SINGLEFLIGHT_IN_FLIGHT = registry.register(
+    Gauge(
+        "singleflight_in_flight",
+        "Calls in flight of single-flight groups",
+        labels=("group",),
+    )
+)
+RESPONSE_CACHE_REQUESTS = registry.register(
+    Counter(
+        "response_cache_requests_total",
+        "Requests to response caches by result (hit or miss)",
+        labels=("cache", "result"),
+    )
+)
+RESPONSES_NOT_MODIFIED = registry.register(
+    Counter(
+        "http_not_modified_total",
+        "Responses answered with 304 Not Modified by cache",
+        labels=("cache",),
+    )
+)
+ID_SET_CACHE_REQUESTS = registry.register(
+    Counter(
+        "id_set_cache_requests_total",
+        "Lookups in id set caches by result (hit, miss or oversized)",
+        labels=("cache", "result"),
+    )
+)
+LOG_RECORDS_DROPPED = registry.register(
+    Counter(
+        "log_records_dropped_total",
+        "Log records dropped because the log queue was full",
+        labels=("level",),
+    )
+)
+for _level in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+    LOG_RECORDS_DROPPED.set_function(partial(dropped_records, _level), _level)
@@ -0,0 +1,193 @@
+"""Admission control middleware"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Callable
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from API.core.exceptions.base import CustomException
+from API.core.exceptions.base import DatabaseBusyException
+from API.core.exceptions.base import ServiceUnavailableException
+from API.core.metrics import ADMISSION_IN_FLIGHT
+from API.core.metrics import ADMISSION_QUEUED
+from API.core.metrics import ADMISSION_REJECTED
+from API.core.serialization import SerializedJSONResponse
+
+
+@dataclass
+class RouteClass:
+    """
+    Requests sharing a concurrency limit.
+
+    A request belongs to the first class whose path prefix and methods match.
+    """
+
+    name: str
+    limit: int
+    path_prefix: str = "/"
+    methods: frozenset[str] = field(default_factory=frozenset)
+
+    def matches(self, method: str, path: str) -> bool:
+        """Returns whether request belongs to class"""
+        return path.startswith(self.path_prefix) and (
+            not self.methods or method in self.methods
+        )
+
+
+class ConcurrencyLimiter:
+    """
+    Limit of concurrent requests with a bounded FIFO queue.
+
+    Runs on the event loop thread only, so it needs no locks. A released
+    slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        ADMISSION_IN_FLIGHT.set_function(lambda: self.in_flight, name)
+        ADMISSION_QUEUED.set_function(lambda: len(self.waiters), name)
+
+    async def acquire(self, deadline: float) -> Optional[str]:
+        """Takes a slot and returns None or reason of rejection"""
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return None
+        if len(self.waiters) >= self.queue_size:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), deadline)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Slot was handed over just as the deadline passed
+                return None
+            self.waiters.remove(waiter)
+            return "deadline"
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                self.waiters.remove(waiter)
+            raise
+        return None
+
+    def release(self) -> None:
+        """Frees a slot or hands it to the oldest waiter"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware which sheds load before it reaches the database.
+
+    Each route class has a concurrency limit. Requests over the limit wait
+    in a queue of the same size for at most ``queue_deadline`` seconds.
+    Requests are rejected with 503 and Retry-After when the queue is full,
+    the deadline passes, or more than ``max_pool_waiting`` checkouts are
+    already waiting for a database connection. Requests of no class pass
+    through.
+
+    A slot is held until the response is fully sent, streamed responses
+    included, so long streams should have a class of their own.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_classes: list[RouteClass],
+        queue_deadline: float = 0.2,
+        retry_after: int = 1,
+        pool_waiting: Optional[Callable[[], int]] = None,
+        max_pool_waiting: Optional[int] = None,
+    ):
+        self.app = app
+        self.route_classes = route_classes
+        self.limiters = {
+            route_class.name: ConcurrencyLimiter(
+                route_class.name, route_class.limit, route_class.limit
+            )
+            for route_class in route_classes
+        }
+        self.queue_deadline = queue_deadline
+        self.retry_after = retry_after
+        self.pool_waiting = pool_waiting
+        self.max_pool_waiting = max_pool_waiting
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = self._route_class(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if (
+            self.pool_waiting is not None
+            and self.max_pool_waiting is not None
+            and self.pool_waiting() > self.max_pool_waiting
+        ):
+            ADMISSION_REJECTED.inc(route_class.name, "pool")
+            await self._reject(scope, receive, send, DatabaseBusyException)
+            return
+        limiter = self.limiters[route_class.name]
+        reason = await limiter.acquire(self.queue_deadline)
+        if reason is not None:
+            ADMISSION_REJECTED.inc(route_class.name, reason)
+            await self._reject(scope, receive, send, ServiceUnavailableException)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    def _route_class(self, method: str, path: str) -> Optional[RouteClass]:
+        """Returns class of request"""
+        for route_class in self.route_classes:
+            if route_class.matches(method, path):
+                return route_class
+        return None
+
+    async def _reject(
+        self, scope: Scope, receive: Receive, send: Send, exception_class
+    ) -> None:
+        """Sends 503 response by the app's handler of the exception"""
+        exc = exception_class(retry_after=self.retry_after)
+        handler = self._exception_handler(scope, exc)
+        if handler is not None:
+            response = await handler(Request(scope, receive), exc)
+        else:
+            response = SerializedJSONResponse(
+                status_code=exc.code,
+                content={"error_code": exc.error_code, "message": exc.message},
+                headers=exc.headers,
+            )
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _exception_handler(scope: Scope, exc: CustomException) -> Optional[Callable]:
+        """Returns handler of exception registered on the app, if any"""
+        app = scope.get("app")
+        handlers = getattr(app, "exception_handlers", {})
+        for cls in type(exc).__mro__:
+            if cls in handlers:
+                return handlers[cls]
+        return None
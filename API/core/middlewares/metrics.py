@@ -0,0 +1,57 @@
+"""Request metrics middleware"""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from API.core.metrics import EXCEPTIONS
+from API.core.metrics import REQUEST_DURATION
+from API.core.metrics import REQUESTS
+from API.core.metrics import REQUESTS_IN_FLIGHT
+from API.core.startup import cold_start
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware which records request latency by route.
+
+    Routes are labelled by their path template, e.g. ``/api/posts/{post_id}``,
+    so the number of series does not grow with ids in URLs. Requests which
+    match no route are labelled ``unmatched``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            EXCEPTIONS.inc("unhandled")
+            raise
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            REQUEST_DURATION.observe(perf_counter() - start_time, method, route_path)
+            REQUESTS.inc(method, route_path, status_code)
+            cold_start.request_served()
@@ -0,0 +1,122 @@
+"""Process time middleware"""
+
+import logging
+import random
+from time import perf_counter
+
+from starlette.datastructures import Headers
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from API.core.database.profiling import start_request_profile
+from API.core.database.profiling import stop_request_profile
+
+
+class ProcessTimeMiddleware:
+    """
+    Pure ASGI middleware which sets X-Process-Time and Server-Timing headers.
+
+    Server-Timing reports the whole request as ``app`` and time spent in SQL
+    statements as ``db`` with the number of statements in its description.
+
+    The response body is passed through chunk by chunk, so streaming
+    responses stay streaming. Body logging is opt-in: only the first
+    ``body_limit`` bytes of a ``body_sample_rate`` share of responses are kept.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        log_body: bool = False,
+        body_limit: int = 1024,
+        body_sample_rate: float = 1.0,
+    ):
+        self.app = app
+        self.log_body = log_body
+        self.body_limit = body_limit
+        self.body_sample_rate = body_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = perf_counter()
+        client_host = scope["client"][0] if scope.get("client") else None
+        method = scope["method"]
+        path = scope["path"]
+        logging.info(
+            "Request %s %s",
+            method,
+            path,
+            extra={"client_host": client_host, "headers": Headers(scope=scope)},
+        )
+
+        query_stats, profile_token = start_request_profile()
+        capture_body = self.log_body and random.random() < self.body_sample_rate
+        captured = bytearray()
+        status_code = None
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                process_time = perf_counter() - start_time
+                headers["X-Process-Time"] = str(process_time)
+                headers.append("Server-Timing", f"app;dur={process_time * 1000:.3f}")
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={query_stats.duration * 1000:.3f};'
+                    f'desc="{query_stats.statements} queries"',
+                )
+            elif message["type"] == "http.response.body":
+                if capture_body and len(captured) < self.body_limit:
+                    chunk = message.get("body", b"")
+                    captured.extend(chunk[: self.body_limit - len(captured)])
+                if not message.get("more_body", False):
+                    self._log_response(
+                        client_host, status_code, method, path, captured, capture_body
+                    )
+            elif message["type"] == "http.response.pathsend":
+                # File sent by the server, there is no body to capture
+                self._log_response(client_host, status_code, method, path, captured, False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:  # pylint: disable=W0718
+            logging.exception("An exception occurred")
+            if response_started:
+                raise
+            process_time = perf_counter() - start_time
+            response = JSONResponse(
+                status_code=500,
+                content={"message": f"{exc.args}"},
+                headers={"X-Process-Time": str(process_time)},
+            )
+            await response(scope, receive, send)
+        finally:
+            stop_request_profile(profile_token)
+
+    def _log_response(
+        self,
+        client_host: str,
+        status_code: int,
+        method: str,
+        path: str,
+        body: bytearray,
+        with_body: bool,
+    ) -> None:
+        """Logs finished response, body is decoded by the log formatter"""
+        fields = {"client_host": client_host, "status_code": status_code}
+        if with_body:
+            fields["body"] = bytes(body)
+        logging.info("Response %s %s %s", status_code, method, path, extra=fields)
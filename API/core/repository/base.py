@@ -1,6 +1,8 @@
 """Base repository class"""
 
 from typing import Any
+from typing import AsyncIterator
+from typing import Callable
 from typing import Generic
 from typing import Optional
 from typing import Type
@@ -8,19 +10,61 @@ from typing import TypeVar
 from typing import Union
 
 from sqlalchemy import Select
+from sqlalchemy import bindparam
+from sqlalchemy import inspect
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import select
 
+from API.core.cache.entity import EntityCache
 from API.core.database.base import Base
+from API.core.database.routing import REPLICA
+from API.core.repository.bulk import copy_columns
+from API.core.repository.bulk import copy_records
+from API.core.repository.bulk import create_staging_table
+from API.core.repository.bulk import next_ids
+from API.core.repository.cursor import decode_cursor
+from API.core.repository.cursor import encode_cursor
+from API.core.repository.loading import LoadPlan
+from API.core.repository.loading import delete_cascade_options
+from API.core.repository.loading import load_options
 
 ModelType = TypeVar("ModelType", bound=Base)  # pylint: disable=C0103
 
 
 class BaseRepository(Generic[ModelType]):
-    """Base class for data repositories"""
+    """
+    Base class for data repositories
 
-    def __init__(self, model: Type[ModelType]):
+    Repositories of models whose old rows are moved to an archive table take
+    its model as ``archive``. Reads then skip archived rows unless called
+    with ``include_archived=True``; archived rows are instances of the
+    archive model, with the same columns and no relationships.
+
+    Only ``get_by`` and ``stream`` take ``include_archived``. ``get_all``,
+    ``get_page``, queries built with ``query()`` and reads of subclasses
+    (e.g. ``PostRepository.browse`` and ``search``) never see archived rows:
+    keyset pages over both tables would need a union on every page.
+    """
+
+    def __init__(
+        self,
+        model: Type[ModelType],
+        copy_threshold: int = 10_000,
+        cache: Optional[EntityCache] = None,
+        archive: Optional[Type[Base]] = None,
+    ):
         self.model_class: Type[ModelType] = model
+        self.copy_threshold = copy_threshold
+        self.cache = cache
+        self.archive = archive
+        mapper = inspect(model)
+        self.primary_key: list[str] = [
+            mapper.get_property_by_column(column).key for column in mapper.primary_key
+        ]
+        # Statement shape -> statement with bound parameters for values
+        self._statements: dict[tuple, Select] = {}
 
     async def create(
         self, session: AsyncSession, attributes: dict[str, Any] = None
@@ -42,13 +86,115 @@ class BaseRepository(Generic[ModelType]):
         merged_model = await session.merge(model)
         return merged_model
 
+    async def create_many(
+        self, session: AsyncSession, rows: list[dict[str, Any]]
+    ) -> list[Any]:
+        """
+        Inserts rows with multi-row INSERT statements.
+
+        Batches of ``copy_threshold`` rows and more are sent with binary COPY.
+        Neither path creates ORM instances or runs ORM events.
+
+        :return: Primary keys of inserted rows in the order of ``rows``.
+        """
+        if not rows:
+            return []
+        if len(rows) >= self.copy_threshold:
+            return await self._copy_create(session, rows)
+        query = insert(self.model_class).returning(
+            *self._primary_key_columns(), sort_by_parameter_order=True
+        )
+        result = await session.execute(query, rows)
+        return self._primary_keys(result.all())
+
+    async def upsert_many(
+        self,
+        session: AsyncSession,
+        rows: list[dict[str, Any]],
+        index_elements: Optional[list[str]] = None,
+    ) -> list[Any]:
+        """
+        Inserts rows or updates existing ones with INSERT ... ON CONFLICT.
+
+        Batches of ``copy_threshold`` rows and more are sent with binary COPY
+        into a temporary table and upserted from it with one statement.
+        Entity cache of the model is cleared, as old values are unknown.
+
+        :param index_elements: Conflict target, primary key by default.
+        :return: Primary keys of inserted or updated rows.
+        """
+        if not rows:
+            return []
+        index_elements = index_elements or self.primary_key
+        if self.cache is not None:
+            self.cache.clear()
+        if len(rows) >= self.copy_threshold:
+            return await self._copy_upsert(session, rows, index_elements)
+        query = self._on_conflict(insert(self.model_class), rows, index_elements)
+        query = query.returning(
+            *self._primary_key_columns(), sort_by_parameter_order=True
+        )
+        result = await session.execute(query, rows)
+        return self._primary_keys(result.all())
+
     async def get_all(
-        self, session: AsyncSession, skip: int = 0, limit: int = 100
+        self,
+        session: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        load: Optional[LoadPlan] = None,
     ) -> list[ModelType]:
         """Returns all instances of model class"""
-        query = self.query()
-        query = query.offset(skip).limit(limit)
-        return await self.all(session, query)
+        query = self._statement(
+            ("get_all", self._plan_key(load)),
+            lambda: self.query(load=load)
+            .offset(bindparam("skip"))
+            .limit(bindparam("limit")),
+        )
+        return await self.all(session, query, {"skip": skip, "limit": limit})
+
+    async def get_page(
+        self,
+        session: AsyncSession,
+        order_: Optional[dict] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        query: Optional[Select] = None,
+        load: Optional[LoadPlan] = None,
+    ) -> tuple[list[ModelType], Optional[str]]:
+        """
+        Returns page of instances using keyset pagination.
+
+        Rows are ordered by ``order_`` fields with primary key as a tiebreaker,
+        so sort fields should be NOT NULL and covered by a composite index
+        ending with primary key. Cursor is the value returned for previous page.
+
+        :param query: Filtered query built with ``self.query(order_, load)``.
+        :return: Page of instances and cursor of next page or None.
+        """
+        fields, descending = self._sort_fields(order_)
+        keys = fields + self.primary_key
+        if query is None:
+            query = self._statement(
+                ("get_page", self._order_key(order_), self._plan_key(load), bool(cursor)),
+                lambda: self._page_query(
+                    self.query(order_, load), keys, descending, bool(cursor)
+                ),
+            )
+        else:
+            query = self._page_query(query, keys, descending, bool(cursor))
+        params = {"page_limit": limit + 1}
+        if cursor:
+            values = decode_cursor(cursor, len(keys))
+            params.update((f"cursor_{i}", value) for i, value in enumerate(values))
+        items = await self.all(session, query, params)
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        next_cursor = encode_cursor(
+            tuple(getattr(items[-1], field) for field in fields + self.primary_key)
+        )
+        return items, next_cursor
 
     async def get_by(
         self,
@@ -56,40 +202,319 @@ class BaseRepository(Generic[ModelType]):
         field: str,
         value: Any,
         unique: bool = False,
+        load: Optional[LoadPlan] = None,
+        include_archived: bool = False,
     ) -> Union[ModelType, list[ModelType]]:
-        """Returns instance of model class by field"""
-        query = self.query()
-        query = await self._get_by(query, field, value)
+        """
+        Returns instance of model class by field
+
+        Unique lookups by cached fields without load plan go through cache.
+
+        :param include_archived: Archive is read too, for unique lookups only
+            when there is no row which is not archived. Load plan applies to
+            rows which are not archived.
+        """
+        query = self._get_by(field, load)
+        archived = self._get_archived_by(field) if include_archived else None
+        params = {"value": value}
         if unique:
-            return await self.one(session, query)
-        return await self.all(session, query)
+            if load is None and self._is_cached(field):
+                model = await self._cached_one(session, query, field, value)
+            else:
+                model = await self.one(session, query, params)
+            if model is None and archived is not None:
+                model = await self.one(session, archived, params)
+            return model
+        models = await self.all(session, query, params)
+        if archived is not None:
+            models += await self.all(session, archived, params)
+        return models
 
     async def delete(self, session: AsyncSession, model: ModelType) -> None:
         """Deletes model instance"""
+        cascade_options = delete_cascade_options(self.model_class)
+        if cascade_options:
+            # Loads cascaded relationships up front instead of lazy loading them
+            await session.execute(
+                select(self.model_class)
+                .where(
+                    *(
+                        getattr(self.model_class, field) == getattr(model, field)
+                        for field in self.primary_key
+                    )
+                )
+                .options(*cascade_options)
+                .execution_options(populate_existing=True)
+            )
         await session.delete(model)
 
     def query(
         self,
         order_: Optional[dict] = None,
+        load: Optional[LoadPlan] = None,
     ) -> Select:
-        """Returns query for model class"""
-        query = select(self.model_class)
-        query = self._maybe_ordered(query, order_)
-        return query
+        """
+        Returns query for model class
 
-    async def all(self, session: AsyncSession, query: Select) -> list[ModelType]:
-        """Returns all instances of model class by query"""
-        result = await session.execute(query)
-        return list(result.scalars().all())
+        Queries are built once per order and load plan and reused, as
+        statements are immutable.
 
-    async def one(self, session: AsyncSession, query: Select) -> ModelType:
-        """Returns one instance of model class by query"""
-        result = await session.execute(query)
-        return result.scalars().first()
+        :param load: Relationship loading plan, e.g. {"user": "joined"}.
+            Relationships outside of the plan raise on lazy load.
+        """
+        return self._statement(
+            ("query", self._order_key(order_), self._plan_key(load)),
+            lambda: self._maybe_ordered(
+                select(self.model_class).options(*load_options(self.model_class, load)),
+                order_,
+            ),
+        )
 
-    async def _get_by(self, query: Select, field: str, value: Any) -> Select:
-        """Returns query with filter by field"""
-        return query.where(getattr(self.model_class, field) == value)
+    async def all(
+        self,
+        session: AsyncSession,
+        query: Select,
+        params: Optional[dict[str, Any]] = None,
+        replica: bool = True,
+    ) -> list[ModelType]:
+        """
+        Returns all instances of model class by query
+
+        :param params: Values of bound parameters of query.
+        :param replica: Query may go to a replica unless session is pinned to primary.
+        """
+        result = await session.execute(
+            query, params, bind_arguments=REPLICA if replica else None
+        )
+        return list(result.unique().scalars().all())
+
+    async def one(
+        self,
+        session: AsyncSession,
+        query: Select,
+        params: Optional[dict[str, Any]] = None,
+        replica: bool = True,
+    ) -> ModelType:
+        """
+        Returns one instance of model class by query
+
+        :param params: Values of bound parameters of query.
+        :param replica: Query may go to a replica unless session is pinned to primary.
+        """
+        result = await session.execute(
+            query, params, bind_arguments=REPLICA if replica else None
+        )
+        return result.unique().scalars().first()
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        query: Optional[Select] = None,
+        params: Optional[dict[str, Any]] = None,
+        yield_per: int = 1000,
+        replica: bool = True,
+        include_archived: bool = False,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Yields instances of model class by query fetched with server-side cursor
+
+        Rows are fetched ``yield_per`` at a time, so memory does not grow with
+        the number of rows. Instances are not kept by the session after they
+        are dropped by the caller. Relationships can not be eager loaded with
+        ``selectin`` while streaming.
+
+        :param query: Query built with ``self.query()``, ordered by primary key by default.
+        :param params: Values of bound parameters of query.
+        :param replica: Query may go to a replica unless session is pinned to primary.
+        :param include_archived: Archived rows follow the others, ordered by
+            primary key. Only with the default query.
+        """
+        if query is None:
+            query = self._statement(
+                ("stream",),
+                lambda: self.query().order_by(*self._primary_key_columns()),
+            )
+        elif include_archived:
+            raise ValueError("Archived rows are streamed with the default query only")
+        queries = [query]
+        if include_archived:
+            queries.append(
+                self._statement(
+                    ("stream_archived",),
+                    lambda: select(self._archive()).order_by(
+                        *self._primary_key_columns(self._archive())
+                    ),
+                )
+            )
+        for query_ in queries:
+            result = await session.stream_scalars(
+                query_.execution_options(yield_per=yield_per),
+                params,
+                bind_arguments=REPLICA if replica else None,
+            )
+            try:
+                async for model in result:
+                    yield model
+            finally:
+                await result.close()
+
+    def _get_by(self, field: str, load: Optional[LoadPlan] = None) -> Select:
+        """Returns query filtered by field with value as ``value`` parameter"""
+        return self._statement(
+            ("get_by", field, self._plan_key(load)),
+            lambda: self.query(load=load).where(
+                getattr(self.model_class, field) == bindparam("value")
+            ),
+        )
+
+    def _get_archived_by(self, field: str) -> Select:
+        """Returns query of archive filtered by field with value as ``value`` parameter"""
+        return self._statement(
+            ("get_archived_by", field),
+            lambda: select(self._archive()).where(
+                getattr(self._archive(), field) == bindparam("value")
+            ),
+        )
+
+    def _archive(self) -> Type[Base]:
+        """Returns archive model"""
+        if self.archive is None:
+            raise ValueError(f"{self.model_class.__name__} has no archive")
+        return self.archive
+
+    def _statement(self, key: tuple, build: Callable[[], Select]) -> Select:
+        """
+        Returns statement of shape built on first use.
+
+        Reusing the statement skips building it and computing its cache key,
+        SQLAlchemy then finds compiled SQL in the engine's compiled cache.
+        Values are passed as bound parameters on execution.
+        """
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements[key] = build()
+        return statement
+
+    def _page_query(
+        self, query: Select, keys: list[str], descending: bool, with_cursor: bool
+    ) -> Select:
+        """Returns keyset page of query with cursor values as bound parameters"""
+        query = query.order_by(
+            *(
+                getattr(self.model_class, field).desc()
+                if descending
+                else getattr(self.model_class, field).asc()
+                for field in self.primary_key
+            )
+        )
+        if with_cursor:
+            columns = [getattr(self.model_class, field) for field in keys]
+            values = tuple_(
+                *(
+                    bindparam(f"cursor_{i}", type_=column.type)
+                    for i, column in enumerate(columns)
+                )
+            )
+            if descending:
+                query = query.where(tuple_(*columns) < values)
+            else:
+                query = query.where(tuple_(*columns) > values)
+        return query.limit(bindparam("page_limit"))
+
+    def _is_cached(self, field: str) -> bool:
+        """Returns whether lookups by field go through cache"""
+        return self.cache is not None and field in self.cache.fields
+
+    async def _cached_one(
+        self, session: AsyncSession, query: Select, field: str, value: Any
+    ) -> Optional[ModelType]:
+        """Returns one instance from cache or by query caching the result"""
+        values = await self.cache.get(field, value)
+        if values is not None:
+            return await self.cache.attach(session, values)
+        generation = self.cache.generation
+        # Reads primary, a lagging replica could put a stale row into cache
+        model = await self.one(session, query, {"value": value}, replica=False)
+        if model is not None:
+            await self.cache.store(model, generation)
+        return model
+
+    async def _copy_create(
+        self, session: AsyncSession, rows: list[dict[str, Any]]
+    ) -> list[Any]:
+        """Inserts rows with binary COPY"""
+        table = self.model_class.__table__
+        rows = [self._column_row(row) for row in rows]
+        primary_key = [column.name for column in table.primary_key.columns]
+        if len(primary_key) == 1 and primary_key[0] not in rows[0]:
+            ids = await next_ids(session, table, primary_key[0], len(rows))
+            for row, id_ in zip(rows, ids):
+                row[primary_key[0]] = id_
+        else:
+            # Starts transaction before COPY is sent on the raw connection
+            await session.execute(select(1))
+        columns = copy_columns(table, rows)
+        await copy_records(session, table.name, columns, rows)
+        return self._primary_keys(
+            [tuple(row[name] for name in primary_key) for row in rows]
+        )
+
+    async def _copy_upsert(
+        self,
+        session: AsyncSession,
+        rows: list[dict[str, Any]],
+        index_elements: list[str],
+    ) -> list[Any]:
+        """Upserts rows with binary COPY into temporary table"""
+        table = self.model_class.__table__
+        rows = [self._column_row(row) for row in rows]
+        columns = copy_columns(table, rows)
+        staging, staged_rows = await create_staging_table(session, table, columns)
+        await copy_records(session, staging.name, columns, rows)
+        query = insert(table).from_select(columns, staged_rows)
+        query = self._on_conflict(query, rows, index_elements)
+        result = await session.execute(query.returning(*table.primary_key.columns))
+        return self._primary_keys(result.all())
+
+    def _on_conflict(self, query, rows: list[dict[str, Any]], index_elements: list[str]):
+        """Adds ON CONFLICT clause updating every given field except conflict target"""
+        fields = [field for field in set().union(*rows) if field not in index_elements]
+        if not fields:
+            return query.on_conflict_do_nothing(index_elements=index_elements)
+        mapper = inspect(self.model_class)
+        set_ = {
+            mapper.columns[field].name: query.excluded[mapper.columns[field].name]
+            for field in sorted(fields)
+        }
+        for table_column in self.model_class.__table__.columns:
+            onupdate = table_column.onupdate
+            if onupdate is not None and onupdate.is_clause_element:
+                set_.setdefault(table_column.name, onupdate.arg)
+        return query.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+    def _column_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Returns row keyed by column names instead of attribute names"""
+        mapper = inspect(self.model_class)
+        return {mapper.columns[field].name: value for field, value in row.items()}
+
+    def _primary_key_columns(self, model: Optional[Type[Base]] = None) -> list:
+        """Returns primary key attributes of model class or of its archive model"""
+        return [getattr(model or self.model_class, field) for field in self.primary_key]
+
+    def _primary_keys(self, rows: list[tuple]) -> list[Any]:
+        """Returns scalar primary keys or tuples for composite primary key"""
+        if len(self.primary_key) == 1:
+            return [row[0] for row in rows]
+        return [tuple(row) for row in rows]
+
+    @staticmethod
+    def _sort_fields(order_: Optional[dict] = None) -> tuple[list[str], bool]:
+        """Returns sort fields and whether they are descending"""
+        if not order_:
+            return [], False
+        if order_.get("asc"):
+            return list(order_["asc"]), False
+        return list(order_.get("desc", [])), True
 
     def _maybe_ordered(self, query: Select, order_: Optional[dict] = None) -> Select:
         """Returns query with order by field"""
@@ -101,3 +526,15 @@ class BaseRepository(Generic[ModelType]):
                 for order in order_["desc"]:
                     query = query.order_by(getattr(self.model_class, order).desc())
         return query
+
+    @staticmethod
+    def _order_key(order_: Optional[dict] = None) -> tuple:
+        """Returns hashable key of order"""
+        if not order_:
+            return ()
+        return tuple(order_.get("asc") or ()), tuple(order_.get("desc") or ())
+
+    @staticmethod
+    def _plan_key(load: Optional[LoadPlan] = None) -> tuple:
+        """Returns hashable key of load plan"""
+        return tuple(sorted(load.items())) if load else ()
@@ -0,0 +1,90 @@
+"""Bulk loading helpers built on asyncpg binary COPY"""
+
+import enum
+from typing import Any
+from typing import Iterable
+from uuid import uuid4
+
+from sqlalchemy import Table
+from sqlalchemy import column
+from sqlalchemy import select
+from sqlalchemy import table
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from API.core.database.routing import PIN_PRIMARY
+
+
+def copy_value(value: Any) -> Any:
+    """Converts python value into value accepted by asyncpg COPY"""
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (list, tuple)):
+        return [copy_value(item) for item in value]
+    return value
+
+
+def copy_columns(table_: Table, rows: list[dict[str, Any]]) -> list[str]:
+    """Returns columns to COPY, filling missing scalar defaults into rows"""
+    keys = set().union(*rows)
+    for table_column in table_.columns:
+        default = table_column.default
+        if table_column.name in keys or default is None or not default.is_scalar:
+            continue
+        keys.add(table_column.name)
+        for row in rows:
+            row.setdefault(table_column.name, default.arg)
+    return [table_column.name for table_column in table_.columns if table_column.name in keys]
+
+
+async def next_ids(
+    session: AsyncSession, table_: Table, column_name: str, count: int
+) -> list[int]:
+    """Allocates ``count`` values of serial column sequence in one round-trip"""
+    result = await session.execute(
+        text(
+            "SELECT nextval(pg_get_serial_sequence(:table, :column)) "
+            "FROM generate_series(1, :count)"
+        ),
+        {"table": table_.name, "column": column_name, "count": count},
+    )
+    return list(result.scalars().all())
+
+
+async def copy_records(
+    session: AsyncSession,
+    table_name: str,
+    columns: list[str],
+    rows: Iterable[dict[str, Any]],
+) -> None:
+    """
+    Sends rows to table with asyncpg binary COPY.
+
+    COPY runs on the session connection, so it is a part of the current
+    transaction as long as the session has already executed a statement in it.
+    The session is pinned to primary first, as COPY is not seen by its
+    routing and later replica reads would miss the copied rows.
+    """
+    session.sync_session.info[PIN_PRIMARY] = True
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table_name,
+        records=[tuple(copy_value(row.get(name)) for name in columns) for row in rows],
+        columns=columns,
+    )
+
+
+async def create_staging_table(
+    session: AsyncSession, table_: Table, columns: list[str]
+):
+    """Creates temporary table shaped like ``table_`` dropped on commit"""
+    name = f"tmp_{table_.name}_{uuid4().hex[:12]}"
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE {name} "
+            f"(LIKE {table_.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    staging = table(name, *(column(name_) for name_ in columns))
+    return staging, select(*(staging.c[name_] for name_ in columns))
@@ -0,0 +1,62 @@
+"""Opaque cursors for keyset pagination"""
+
+import enum
+import json
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from API.core.exceptions.base import BadRequestException
+
+
+class InvalidCursorException(BadRequestException):
+    """Invalid cursor exception."""
+
+    message = "Invalid pagination cursor"
+
+
+def _dump_value(value: Any) -> Any:
+    """Returns JSON-compatible representation of sort key value"""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
+
+
+def _load_value(value: Any) -> Any:
+    """Restores sort key value from its JSON representation"""
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise ValueError(value)
+    return value
+
+
+def encode_cursor(values: tuple) -> str:
+    """Encodes last seen sort key values into opaque cursor"""
+    payload = json.dumps([_dump_value(value) for value in values], separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> tuple:
+    """Decodes cursor into sort key values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != length:
+            raise ValueError(values)
+        return tuple(_load_value(value) for value in values)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorException() from exc
@@ -0,0 +1,65 @@
+"""Relationship loading plans for repository queries"""
+
+from typing import Optional
+from typing import Type
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import defaultload
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import lazyload
+from sqlalchemy.orm import raiseload
+from sqlalchemy.orm import selectinload
+
+from API.core.database.base import Base
+
+# Relationship path -> strategy, e.g. {"user": "joined", "reviews.user": "selectin"}
+LoadPlan = dict[str, str]
+
+LOADERS = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "lazy": lazyload,
+    "raise": raiseload,
+}
+
+
+def load_options(model: Type[Base], plan: Optional[LoadPlan] = None) -> list:
+    """
+    Returns loader options for plan.
+
+    Every relationship which is not a part of the plan is loaded with
+    raiseload, so lazy loads which would emit SQL fail loudly instead of
+    silently running a query per row.
+    """
+    options = [raiseload("*", sql_only=True)]
+    for path, strategy in (plan or {}).items():
+        if strategy not in LOADERS:
+            raise ValueError(f"Unknown loading strategy {strategy} for {path}")
+        option = None
+        entity = model
+        parts = path.split(".")
+        for depth, name in enumerate(parts):
+            attribute = getattr(entity, name)
+            loader = LOADERS.get((plan or {}).get(".".join(parts[: depth + 1])))
+            if option is None:
+                option = (loader or defaultload)(attribute)
+            else:
+                option = getattr(option, (loader or defaultload).__name__)(attribute)
+            entity = attribute.property.mapper.class_
+        if strategy != "raise":
+            option = option.raiseload("*", sql_only=True)
+        options.append(option)
+    return options
+
+
+def delete_cascade_options(model: Type[Base], _seen: frozenset = frozenset()) -> list:
+    """Returns selectinload options for every relationship cascading deletes"""
+    options = []
+    for relationship in inspect(model).relationships:
+        target = relationship.mapper.class_
+        if not relationship.cascade.delete or target in _seen:
+            continue
+        attribute = getattr(model, relationship.key)
+        nested = delete_cascade_options(target, _seen | {model})
+        options.append(selectinload(attribute).options(*nested))
+    return options
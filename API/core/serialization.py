@@ -0,0 +1,146 @@
+"""
+JSON serialization of API responses and database JSON columns.
+
+The backend is orjson when it is installed and stdlib ``json`` otherwise,
+chosen by JSON_BACKEND. Both produce compact UTF-8 bytes. Pydantic models
+are serialized by their own compiled serializer. Types JSON has no notation
+for are converted by encoders looked up once per type:
+
+- Enum: its value
+- datetime, date, time: ISO 8601
+- Decimal, UUID: string, so no precision is lost
+- set, frozenset, tuple: list
+
+Other types raise TypeError instead of being written as null.
+
+Only responses rendered here skip FastAPI's ``jsonable_encoder``: responses
+of ResponseCache and ``SerializedJSONResponse`` returned by a route. A route
+returning a model for its ``response_model`` is still validated and turned
+into dicts by FastAPI first, so hot routes return ``SerializedJSONResponse``
+of the model themselves.
+"""
+
+import json
+from dataclasses import asdict
+from dataclasses import is_dataclass
+from datetime import date
+from datetime import datetime
+from datetime import time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from typing import Callable
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from API.core.config import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+Encoder = Callable[[Any], Any]
+
+# Type -> encoder of its instances, filled on first use
+_encoders: dict[type, Encoder] = {}
+
+
+def _encoder(type_: type) -> Optional[Encoder]:
+    """Returns encoder of type or None"""
+    if issubclass(type_, BaseModel):
+        to_python = type_.__pydantic_serializer__.to_python
+        return lambda obj: to_python(obj, mode="json")
+    if issubclass(type_, Enum):
+        return lambda obj: obj.value
+    if issubclass(type_, (datetime, date, time)):
+        return type_.isoformat
+    if issubclass(type_, (Decimal, UUID)):
+        return str
+    if issubclass(type_, (set, frozenset, tuple)):
+        return list
+    if is_dataclass(type_):
+        return asdict
+    return None
+
+
+def default(obj: Any) -> Any:
+    """Returns JSON compatible value of obj, used as ``default`` of backends"""
+    type_ = type(obj)
+    encoder = _encoders.get(type_)
+    if encoder is None:
+        encoder = _encoder(type_)
+        if encoder is None:
+            raise TypeError(f"Object of type {type_.__name__} is not JSON serializable")
+        _encoders[type_] = encoder
+    return encoder(obj)
+
+
+def _with_str_keys(obj: Any) -> Any:
+    """Returns obj with dict keys converted like values, for stdlib json"""
+    if isinstance(obj, dict):
+        return {
+            key if isinstance(key, str) else default(key): _with_str_keys(value)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_with_str_keys(item) for item in obj]
+    return obj
+
+
+_stdlib_encoder = json.JSONEncoder(
+    default=default, ensure_ascii=False, separators=(",", ":")
+)
+
+
+def stdlib_dumps(obj: Any) -> bytes:
+    """Serializes obj with stdlib json"""
+    try:
+        return _stdlib_encoder.encode(obj).encode()
+    except TypeError:
+        # Keys which are not str, e.g. enums in facet counts
+        return _stdlib_encoder.encode(_with_str_keys(obj)).encode()
+
+
+def orjson_dumps(obj: Any) -> bytes:
+    """Serializes obj with orjson"""
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+BACKENDS: dict[str, Callable[[Any], bytes]] = {"stdlib": stdlib_dumps}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson_dumps
+
+
+def backend(name: str = "auto") -> Callable[[Any], bytes]:
+    """Returns serializer of backend, "auto" prefers orjson"""
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name} is not available")
+    return BACKENDS[name]
+
+
+_dumps = backend(config.backend.json_backend)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes obj to JSON bytes"""
+    if isinstance(obj, BaseModel):
+        return obj.__pydantic_serializer__.to_json(obj)
+    return _dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serializes obj to JSON string, as database drivers expect"""
+    return dumps(obj).decode()
+
+
+class SerializedJSONResponse(JSONResponse):
+    """JSON response rendered by the configured backend"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,45 @@
+"""Cold start timing"""
+
+import logging
+from os import getenv
+from time import time
+
+from API.core.metrics import COLD_START_DURATION
+from API.core.metrics import STARTUP_DURATION
+
+# Set by main.py before anything is imported, so worker processes measure
+# from the start of the server process
+PROCESS_START_ENV = "APP_PROCESS_START"
+
+
+class ColdStartTimer:
+    """
+    Measures time from process start to finished startup and first response.
+
+    Without ``APP_PROCESS_START`` in environment time is measured from import
+    of this module, which misses interpreter start and earlier imports.
+    """
+
+    def __init__(self):
+        self.started_at = (
+            float(getenv(PROCESS_START_ENV)) if getenv(PROCESS_START_ENV) else time()
+        )
+        self.served = False
+
+    def startup_finished(self) -> None:
+        """Records time until startup handlers finished"""
+        duration = time() - self.started_at
+        STARTUP_DURATION.set(duration)
+        logging.info("Startup finished in %.3f s", duration)
+
+    def request_served(self) -> None:
+        """Records time until first response, once"""
+        if self.served:
+            return
+        self.served = True
+        duration = time() - self.started_at
+        COLD_START_DURATION.set(duration)
+        logging.info("Cold start: first request served %.3f s after process start", duration)
+
+
+cold_start = ColdStartTimer()
@@ -0,0 +1,66 @@
+"""
+Streaming response bodies.
+
+Encoders take an async iterator of pydantic models and yield bytes in chunks
+of about ``chunk_size``, so a response of any size is held in memory one
+chunk at a time.
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator
+from typing import Sequence
+
+from pydantic import BaseModel
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def ndjson_chunks(
+    items: AsyncIterator[BaseModel], chunk_size: int = CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yields models as newline delimited JSON"""
+    buffer = bytearray()
+    async for item in items:
+        buffer += item.model_dump_json().encode()
+        buffer += b"\n"
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def csv_chunks(
+    items: AsyncIterator[BaseModel],
+    fields: Sequence[str],
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yields models as CSV with header row, lists are written as JSON"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for item in items:
+        row = item.model_dump(mode="json", include=set(fields))
+        writer.writerow(
+            json.dumps(value) if isinstance(value, (list, dict)) else value
+            for value in (row.get(field) for field in fields)
+        )
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yields chunks compressed as one gzip stream"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,15 +1,27 @@
 """Main module to run from"""
 
 import logging
+import os
+from time import time
 
-from uvicorn import run
+# Cold start is measured from here, see core/startup.py. Worker processes
+# import this module again when they are spawned and record their own start.
+os.environ["APP_PROCESS_START"] = str(time())
 
-from core.config import config
+from uvicorn import run  # pylint: disable=C0413
 
-if __name__ == "__main__":
-    logging.basicConfig(
+from core.config import config  # pylint: disable=C0413
+from core.logs import configure_logging as configure_queue_logging  # pylint: disable=C0413
+from core.logs import parse_sample_rates  # pylint: disable=C0413
+
+
+def configure_logging() -> None:
+    """Configures logging of current process"""
+    configure_queue_logging(
         level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(message)s",
+        json_format=config.backend.log_format == "json",
+        queue_size=config.backend.log_queue_size,
+        sample_rates=parse_sample_rates(config.backend.log_sample_rates),
     )
     for logger_name in ("sqlalchemy", "sqlalchemy.engine", "uvicorn.access"):
         logger = logging.getLogger(logger_name)
@@ -21,9 +33,24 @@ if __name__ == "__main__":
             else logging.CRITICAL
         )
 
+
+# Runs in the supervisor and in every spawned worker
+configure_logging()
+
+if __name__ == "__main__":
+    # With WEB_CONCURRENCY > 1 uvicorn supervises worker processes and
+    # restarts crashed ones. On SIGTERM workers stop accepting connections,
+    # wait up to GRACEFUL_SHUTDOWN_TIMEOUT for running requests and then run
+    # the shutdown handlers.
     run(
         app="server.app:app",
         host=config.backend.host,
         port=config.backend.port,
+        workers=config.backend.workers,
+        loop="auto",  # uvloop when installed
+        http="auto",  # httptools when installed
+        timeout_graceful_shutdown=config.backend.graceful_shutdown_timeout,
         log_level=logging.WARNING,
+        # uvicorn loggers propagate to the queue handler of root logger
+        log_config=None,
     )
@@ -1,23 +1,42 @@
 import logging
-import random
-from time import time
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
-
-from API.app import models
-from API.app.models.posts import Post, HandicraftCategory, PostStatus, Review
-from API.app.models.users import User, Favorite
-from API.core.database.base import Base
-from API.core.database.session import engine, get_session, Session
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from API.app import models  # pylint: disable=W0611
+from API.app.auth import revocations
+from API.app.jobs.migrate import MIGRATIONS_PACKAGE
+from API.app.routers import debug
+from API.app.routers import images
+from API.app.routers import metrics
+from API.app.routers import router
+from API.app.routers.favorites import favorite_set_refresher
+from API.core.config import config
+from API.core.database.migrations import check_version
+from API.core.database.migrations import load_migrations
+from API.core.database.migrations import migrate
+from API.core.database.session import engine, replica_set
 from API.core.exceptions.base import CustomException
+from API.core.exceptions.base import DatabaseBusyException
+from API.core.media.images import image_store
+from API.core.metrics import EXCEPTIONS
+from API.core.middlewares.admission import AdmissionMiddleware
+from API.core.middlewares.admission import RouteClass
+from API.core.middlewares.metrics import MetricsMiddleware
+from API.core.middlewares.process_time import ProcessTimeMiddleware
+from API.core.serialization import SerializedJSONResponse
+from API.core.startup import cold_start
 
 
 def init_routers(app_: FastAPI) -> None:
     """Initialize routers."""
-    #app_.include_router(router, prefix="/api")
+    app_.include_router(router, prefix="/api")
+    app_.include_router(metrics.router)
+    app_.include_router(images.media_router)
+    if config.backend.logging_level == "DEBUG":
+        app_.include_router(debug.router, prefix="/api")
 
 
 def init_listeners(app_: FastAPI) -> None:
@@ -25,85 +44,69 @@ def init_listeners(app_: FastAPI) -> None:
 
     @app_.exception_handler(CustomException)
     async def custom_exception_handler(request: Request, exc: CustomException):
-        request_url = str(request.url)
-        client_host = request.client.host
-        method = request.method
-        headers = dict(request.headers)
         logging.error(
-            "Exception occurred! Request info: %s %s from %s. Headers: %s. "
-            "Error details: Code: %s, Error code: %s, Message: %s",
-            method,
-            request_url,
-            client_host,
-            headers,
-            exc.code,
+            "Exception occurred! Request info: %s %s. Error code: %s, Message: %s",
+            request.method,
+            request.url.path,
             exc.error_code,
             exc.message,
+            extra={
+                "client_host": request.client.host if request.client else None,
+                "query": request.url.query,
+                "headers": request.headers,
+                "code": exc.code,
+            },
         )
-        return JSONResponse(
+        EXCEPTIONS.inc(exc.error_code)
+        return SerializedJSONResponse(
             status_code=exc.code,
             content={"error_code": exc.error_code, "message": exc.message},
+            headers=exc.headers,
+        )
+
+    @app_.exception_handler(PoolTimeoutError)
+    async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+        return await custom_exception_handler(
+            request, DatabaseBusyException(retry_after=config.admission.retry_after)
         )
 
 
 def init_middlewares(app_: FastAPI) -> None:
     """Initialize middlewares."""
-
-    @app_.middleware("http")
-    async def add_process_time_header(request: Request, call_next):
-        start_time = time()
-        client_host = request.client.host
-
-        # Отримання методу, шляхів, заголовків і тіла запиту
-        logging.log(
-            20,
-            "Request host: %s Request method: %s Request URL: %s Request headers: %s",
-            client_host,
-            request.method,
-            request.url,
-            request.headers,
+    if config.admission.enabled:
+        app_.add_middleware(
+            AdmissionMiddleware,
+            route_classes=[
+                RouteClass("search", config.admission.search_limit, "/api/posts/search"),
+                RouteClass("export", config.admission.export_limit, "/api/posts/export"),
+                RouteClass(
+                    "write",
+                    config.admission.write_limit,
+                    "/api",
+                    frozenset({"POST", "PUT", "PATCH", "DELETE"}),
+                ),
+                RouteClass("read", config.admission.read_limit, "/api"),
+            ],
+            queue_deadline=config.admission.queue_deadline_ms / 1000,
+            retry_after=config.admission.retry_after,
+            pool_waiting=lambda: engine.pool.waiting,
+            max_pool_waiting=config.admission.max_pool_waiting,
         )
-        try:
-            response = await call_next(request)
-            process_time = time() - start_time
-            response.headers["X-Process-Time"] = str(process_time)
-
-            response_body = b""
-            async for chunk in response.body_iterator:
-                response_body += chunk
-            logging.log(
-                20,
-                "Response receiver: %s Response status_code: %s Request URL: %s "
-                "Response headers: %s Response body: %s",
-                client_host,
-                response.status_code,
-                request.url,
-                response.raw_headers,
-                response_body.decode("utf-8"),
-            )
-            process_time = time() - start_time
-            new_response = Response(
-                content=response_body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-            )
-            new_response.headers["X-Process-Time"] = str(process_time)
-
-            return new_response
-        except Exception as exc:  # pylint: disable=W0718
-            logging.exception("An exception occurred")
-            logging.log(20, "Fatal error")
-            process_time = time() - start_time
-            return JSONResponse(
-                status_code=500,
-                content={"message": f"{exc.args}"},
-                headers={"X-Process-Time": str(process_time)},
-            )
+    app_.add_middleware(MetricsMiddleware)
+    app_.add_middleware(
+        ProcessTimeMiddleware,
+        log_body=config.backend.log_response_body,
+        body_limit=config.backend.log_body_limit,
+        body_sample_rate=config.backend.log_body_sample_rate,
+    )
 
 
 def create_app() -> FastAPI:
     """Create FastAPI app."""
-    app_ = FastAPI(openapi_url="/docs/openapi.json")
+    app_ = FastAPI(
+        openapi_url="/docs/openapi.json",
+        default_response_class=SerializedJSONResponse,
+    )
     init_routers(app_)
     init_listeners(app_)
     init_middlewares(app_)
@@ -111,7 +114,7 @@ def create_app() -> FastAPI:
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
-        allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["*"],
     )
     return app_
@@ -119,90 +122,34 @@ def create_app() -> FastAPI:
 
 app = create_app()
 
-async def create_test_data():
-    async with Session() as session:
-        # Створюємо 10 юзерів
-        users = []
-        for i in range(10):
-            user = User(
-                google_id=f"google_{i}",
-                phone_number=f"+3805012345{i:02d}",
-                email=f"user{i}@example.com",
-                name=f"User {i}",
-                avatar_url=f"https://example.com/avatar{i}.png"
-            )
-            session.add(user)
-            users.append(user)
-
-        await session.flush()
-
-        # Створюємо 30 постів
-        posts = []
-        for i in range(30):
-            user = random.choice(users)
-            post = Post(
-                user_id=user.id,
-                title=f"Пост {i} від {user.name}",
-                content="Опис виробу ручної роботи",
-                image_url=f"https://example.com/post{i}.jpg",
-                categories=[
-                    random.choice(list(HandicraftCategory)).name,  # <- тут .name дає 'CANDLE_MAKING'
-                    random.choice(list(HandicraftCategory)).name
-                ],
-                credit_card_number="1234567890123456",
-                status=random.choice(list(PostStatus))
-            )
-            session.add(post)
-            posts.append(post)
-
-        await session.flush()
-
-        # Створюємо 30 відгуків
-        for i in range(30):
-            review = Review(
-                user_id=random.choice(users).id,
-                post_id=random.choice(posts).id,
-                message=random.choice([
-                    "Супер!", "Гарно зроблено", "Дуже сподобалося", "Рекомендую!", "Якість на висоті"
-                ]),
-                rating=random.randint(3, 5)
-            )
-            session.add(review)
-
-        # Додаємо 30 обраних постів (favorites)
-        favorites_set = set()
-        while len(favorites_set) < 30:
-            user = random.choice(users)
-            post = random.choice(posts)
-            key = (user.id, post.id)
-            if key not in favorites_set:
-                favorites_set.add(key)
-                favorite = Favorite(
-                    user_id=user.id,
-                    post_id=post.id
-                )
-                session.add(favorite)
-
-        await session.commit()
-        print("✅ Тестові дані успішно додано (10 юзерів, 30 постів, 30 відгуків, 30 обраних)")
-
-async def init_models():
-    """Initialize models."""
-    logging.log(20, "Initialising models: %s", models)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
 async def init_database():
     """Initialize database"""
-    await init_models()
+    migrations = load_migrations(MIGRATIONS_PACKAGE)
+    if config.backend.startup_mode == "production":
+        # Migrations run as a separate step, boot only checks schema version
+        await check_version(engine, migrations)
+    else:
+        await migrate(engine, migrations)
 
 
 @app.on_event("startup")
 async def on_startup():
     """Startup event."""
     await init_database()
-    await create_test_data()
+    await replica_set.start()
+    await revocations.start()
+    if favorite_set_refresher is not None:
+        await favorite_set_refresher.start()
+    cold_start.startup_finished()
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    """Shutdown event."""
\ No newline at end of file
+    """Shutdown event."""
+    # Runs after uvicorn has drained running requests
+    await revocations.stop()
+    if favorite_set_refresher is not None:
+        await favorite_set_refresher.stop()
+    await replica_set.stop()
+    image_store.shutdown()
+    await engine.dispose()
+    logging.info("Database connections closed")
\ No newline at end of file
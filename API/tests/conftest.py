@@ -0,0 +1,27 @@
+"""Fixtures shared by tests"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def database():
+    """Returns the engine of the database from .env, skips test when it is unreachable"""
+    try:
+        from API.core.database.session import engine  # pylint: disable=C0415
+    except Exception as exc:  # pylint: disable=W0718
+        pytest.skip(f"No database config: {exc}")
+
+    async def ping():
+        try:
+            async with engine.connect():
+                pass
+        finally:
+            await engine.dispose()
+
+    try:
+        asyncio.run(ping())
+    except Exception as exc:  # pylint: disable=W0718
+        pytest.skip(f"Database unreachable: {exc}")
+    return engine
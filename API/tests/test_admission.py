@@ -0,0 +1,117 @@
+"""Tests of admission control"""
+
+import asyncio
+from http import HTTPStatus
+
+from API.core.exceptions.base import CustomException
+from API.core.middlewares.admission import AdmissionMiddleware
+from API.core.middlewares.admission import ConcurrencyLimiter
+from API.core.middlewares.admission import RouteClass
+from API.core.serialization import SerializedJSONResponse
+
+
+def test_limiter_queues_then_sheds():
+    async def main():
+        limiter = ConcurrencyLimiter("test_shed", limit=1, queue_size=1)
+        assert await limiter.acquire(1) is None
+        waiting = asyncio.ensure_future(limiter.acquire(1))
+        await asyncio.sleep(0)
+        assert len(limiter.waiters) == 1
+        assert await limiter.acquire(1) == "queue_full"
+        limiter.release()
+        assert await waiting is None
+        assert limiter.in_flight == 1
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_limiter_deadline():
+    async def main():
+        limiter = ConcurrencyLimiter("test_deadline", limit=1, queue_size=1)
+        await limiter.acquire(1)
+        assert await limiter.acquire(0.01) == "deadline"
+        assert not limiter.waiters
+
+    asyncio.run(main())
+
+
+def test_middleware_rejects_with_503():
+    release = asyncio.Event()
+    statuses = []
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def call(middleware):
+        scope = {"type": "http", "method": "GET", "path": "/api/posts", "headers": []}
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await middleware(scope, receive, send)
+
+    async def main():
+        middleware = AdmissionMiddleware(
+            app, [RouteClass("test_middleware", limit=1)], queue_deadline=1
+        )
+        calls = [asyncio.ensure_future(call(middleware)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert statuses == [503]
+        release.set()
+        await asyncio.gather(*calls)
+
+    asyncio.run(main())
+    assert sorted(statuses) == [200, 200, 503]
+
+
+def test_rejection_goes_through_app_exception_handler():
+    handled = []
+
+    class App:
+        async def custom_exception_handler(self, request, exc):
+            handled.append(exc.error_code)
+            return SerializedJSONResponse(
+                status_code=exc.code, content={"handled": True}, headers=exc.headers
+            )
+
+        def __init__(self):
+            self.exception_handlers = {CustomException: self.custom_exception_handler}
+
+    messages = []
+
+    async def main():
+        middleware = AdmissionMiddleware(
+            None,
+            [RouteClass("test_handler", limit=1)],
+            pool_waiting=lambda: 1,
+            max_pool_waiting=0,
+        )
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/posts",
+            "headers": [],
+            "app": App(),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, receive, send)
+
+    asyncio.run(main())
+    assert handled == [HTTPStatus.SERVICE_UNAVAILABLE]
+    assert messages[0]["status"] == 503
+    assert (b"retry-after", b"1") in messages[0]["headers"]
+    assert messages[1]["body"] == b'{"handled":true}'
@@ -0,0 +1,36 @@
+"""Tests of pagination cursors"""
+
+from datetime import datetime
+from datetime import timezone
+from decimal import Decimal
+
+import pytest
+
+from API.core.repository.cursor import InvalidCursorException
+from API.core.repository.cursor import decode_cursor
+from API.core.repository.cursor import encode_cursor
+
+
+def test_round_trip():
+    values = (datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc), Decimal("4.50"), 42, "a")
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor((1, 2))[:-2],
+        encode_cursor((1, 2)) + "x",
+        "eyJhIjoxfQ",  # {"a":1}
+        "W3siZm9vIjoxfSwxXQ",  # [{"foo":1},1]
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, 2)
+
+
+def test_length_must_match():
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(encode_cursor((1, 2, 3)), 2)
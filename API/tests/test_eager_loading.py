@@ -0,0 +1,59 @@
+"""Tests of load plans of BaseRepository, need the database from .env"""
+
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+POSTS = 100
+PLAN = {"user": "joined", "reviews": "selectin"}
+
+
+@contextmanager
+def count_statements(engine):
+    """Counts statements sent to database inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):  # pylint: disable=W0613
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_listing_with_load_plan_takes_two_statements(database):
+    # pylint: disable=C0415
+    from API.app import models  # pylint: disable=W0611
+    from API.app.models.posts import Post
+    from API.benchmarks.eager_loading import seed
+    from API.core.database.session import Session
+    from API.core.repository.base import BaseRepository
+
+    async def main():
+        try:
+            async with Session() as session:
+                post_ids = await seed(session, POSTS)
+                repository = BaseRepository(Post)
+                query = repository.query(load=PLAN).where(Post.id.in_(post_ids))
+                with count_statements(database) as statements:
+                    posts = await repository.all(session, query)
+                    listing = [
+                        (post.user.name, [review.rating for review in post.reviews])
+                        for post in posts
+                    ]
+                assert len(listing) == POSTS
+                assert all(len(reviews) == 3 for _, reviews in listing)
+                assert len(statements) == 2, statements
+                # Relationships outside of the plan raise instead of lazy loading
+                with pytest.raises(InvalidRequestError):
+                    _ = posts[0].favorites
+                await session.rollback()
+        finally:
+            await database.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""Tests of log sampling config and queue handler"""
+
+import logging
+
+import pytest
+
+from API.core.logs import BoundedQueueHandler
+from API.core.logs import parse_sample_rates
+
+
+@pytest.mark.parametrize("value", [None, "", " "])
+def test_empty(value):
+    assert parse_sample_rates(value) == {}
+
+
+def test_levels_by_number():
+    assert parse_sample_rates("debug=0.01, INFO=0.1") == {
+        logging.DEBUG: 0.01,
+        logging.INFO: 0.1,
+    }
+
+
+@pytest.mark.parametrize(
+    "value", ["DEBUG", "VERBOSE=0.1", "INFO=x", "INFO=1.5", "#e.g. DEBUG=0.01"]
+)
+def test_invalid(value):
+    with pytest.raises(ValueError):
+        parse_sample_rates(value)
+
+
+def test_queued_message_is_rendered_by_caller():
+    handler = BoundedQueueHandler(maxsize=1)
+    items = ["a"]
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "items %s", (items,), None)
+    handler.handle(record)
+    items.append("b")
+    queued = handler.queue.get_nowait()
+    assert queued.getMessage() == "items ['a']"
+    assert queued.args is None
@@ -0,0 +1,79 @@
+"""Tests of single-flight call coalescing"""
+
+import asyncio
+
+import pytest
+
+from API.core.cache.singleflight import SingleFlight
+from API.core.exceptions.base import ReadTimeoutException
+
+
+def test_concurrent_callers_share_one_call():
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        flight = SingleFlight("test_shared")
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+        assert not flight.calls
+        return results, await flight.do("key", load)
+
+    results, later = asyncio.run(main())
+    assert results == [1] * 5
+    # Finished calls are not reused
+    assert later == 2
+
+
+def test_different_keys_do_not_share():
+    async def main():
+        flight = SingleFlight("test_keys")
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, "a")),
+            flight.do("b", lambda: asyncio.sleep(0, "b")),
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_error_reaches_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight = SingleFlight("test_error")
+        results = await asyncio.gather(
+            *(flight.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert not flight.calls
+        return results
+
+    results = asyncio.run(main())
+    assert len({id(result) for result in results}) == 1
+    assert isinstance(results[0], RuntimeError)
+
+
+def test_cancelled_caller_does_not_cancel_call():
+    async def main():
+        flight = SingleFlight("test_cancel")
+        first = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0.02, "done")))
+        second = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0, "other")))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_timeout():
+    async def main():
+        flight = SingleFlight("test_timeout", timeout=0.01)
+        await flight.do("key", lambda: asyncio.sleep(1))
+
+    with pytest.raises(ReadTimeoutException):
+        asyncio.run(main())
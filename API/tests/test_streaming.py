@@ -0,0 +1,88 @@
+"""Tests of streaming export encoders"""
+
+import asyncio
+import zlib
+
+import pytest
+from pydantic import BaseModel
+
+from API.core.streaming import csv_chunks
+from API.core.streaming import gzip_chunks
+from API.core.streaming import ndjson_chunks
+
+CHUNK_SIZE = 1024
+ROWS = 10_000
+
+
+class Item(BaseModel):
+    """Exported row"""
+
+    id: int
+    title: str
+    tags: list[str]
+
+
+class Source:
+    """Async iterator of ROWS items counting how many were pulled"""
+
+    def __init__(self, rows: int = ROWS):
+        self.rows = rows
+        self.pulled = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Item:
+        if self.pulled == self.rows:
+            raise StopAsyncIteration
+        self.pulled += 1
+        return Item(id=self.pulled, title=f"Post {self.pulled}", tags=["a", "b"])
+
+
+def _encoders():
+    return [
+        lambda items: ndjson_chunks(items, chunk_size=CHUNK_SIZE),
+        lambda items: csv_chunks(items, ["id", "title", "tags"], chunk_size=CHUNK_SIZE),
+    ]
+
+
+@pytest.mark.parametrize("encode", _encoders(), ids=["ndjson", "csv"])
+def test_rows_are_pulled_lazily(encode):
+    async def main():
+        source = Source()
+        chunks = encode(source)
+        first = await anext(chunks)
+        await chunks.aclose()
+        return source.pulled, first
+
+    pulled, first = asyncio.run(main())
+    # One chunk worth of rows, not the whole source
+    assert pulled < 100
+    assert CHUNK_SIZE <= len(first) < 2 * CHUNK_SIZE
+
+
+@pytest.mark.parametrize("encode", _encoders(), ids=["ndjson", "csv"])
+def test_chunks_stay_bounded(encode):
+    async def main():
+        return [len(chunk) async for chunk in encode(Source())]
+
+    sizes = asyncio.run(main())
+    assert len(sizes) > ROWS * 20 // CHUNK_SIZE
+    assert max(sizes) < 2 * CHUNK_SIZE
+
+
+def test_gzip_is_one_stream_of_all_chunks():
+    async def main():
+        plain = b"".join([chunk async for chunk in ndjson_chunks(Source(), CHUNK_SIZE)])
+        source = Source()
+        compressed = []
+        async for chunk in gzip_chunks(ndjson_chunks(source, CHUNK_SIZE)):
+            compressed.append(chunk)
+            if len(compressed) == 1:
+                # Compression does not read ahead of the encoder
+                assert source.pulled < ROWS
+        return plain, b"".join(compressed)
+
+    plain, compressed = asyncio.run(main())
+    assert zlib.decompress(compressed, 16 + zlib.MAX_WBITS) == plain
+    assert plain.count(b"\n") == ROWS
@@ -0,0 +1,92 @@
+"""Tests of signed access tokens and revocations"""
+
+import asyncio
+
+import pytest
+
+from API.core.auth import tokens
+from API.core.auth.tokens import Revocation
+from API.core.auth.tokens import RevocationList
+from API.core.auth.tokens import TokenSigner
+from API.core.exceptions.base import InvalidTokenException
+
+
+def test_issue_and_verify():
+    signer = TokenSigner("secret", ttl=60)
+    principal = signer.verify(signer.issue(7, claims={"role": "admin"}))
+    assert principal.user_id == 7
+    assert principal.claims == {"role": "admin"}
+    assert principal.expires_at - principal.issued_at == 60
+
+
+def test_ttl_is_capped():
+    signer = TokenSigner("secret", ttl=60)
+    principal = signer.verify(signer.issue(7, ttl=3600))
+    assert principal.expires_at - principal.issued_at == 60
+
+
+def test_reserved_claims_are_refused():
+    with pytest.raises(ValueError):
+        TokenSigner("secret").issue(7, claims={"sub": 8})
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    [
+        lambda token: token[:-1] + ("A" if token[-1] != "A" else "B"),
+        lambda token: "x" + token,
+        lambda token: token.partition(".")[0],
+        lambda token: TokenSigner("other").issue(7),
+        lambda token: "",
+    ],
+)
+def test_tampered_token_is_rejected(tamper):
+    signer = TokenSigner("secret")
+    with pytest.raises(InvalidTokenException):
+        signer.verify(tamper(signer.issue(7)))
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    signer = TokenSigner("secret", ttl=60)
+    token = signer.issue(7)
+    now = tokens.time()
+    monkeypatch.setattr(tokens, "time", lambda: now + 61)
+    with pytest.raises(InvalidTokenException):
+        signer.verify(token)
+
+
+def test_revocation_of_token_and_user():
+    signer = TokenSigner("secret")
+    first = signer.verify(signer.issue(7))
+    second = signer.verify(signer.issue(7))
+    revocations = RevocationList(load=None)
+    revocations.add(Revocation(id=1, expires_at=tokens.time() + 60, token_id=first.token_id))
+    assert revocations.revoked(first)
+    assert not revocations.revoked(second)
+    revocations.add(
+        Revocation(
+            id=2, expires_at=tokens.time() + 60, user_id=7, issued_until=second.issued_at
+        )
+    )
+    assert revocations.revoked(second)
+    assert not revocations.revoked(signer.verify(signer.issue(8)))
+
+
+def test_refresh_loads_revocations_and_forgets_expired():
+    now = tokens.time()
+    stored = [
+        Revocation(id=1, expires_at=now - 1, token_id="expired"),
+        Revocation(id=2, expires_at=now + 60, token_id="revoked"),
+    ]
+    asked = []
+
+    async def load(last_id):
+        asked.append(last_id)
+        return [revocation for revocation in stored if revocation.id > last_id]
+
+    revocations = RevocationList(load, lookback=1)
+    asyncio.run(revocations.refresh())
+    asyncio.run(revocations.refresh())
+    assert asked == [0, 1]
+    assert revocations.last_id == 2
+    assert len(revocations) == 1